@@ -1,28 +1,200 @@
+import os
+import time
 import numpy as np
 from collections import deque
+from . import history as _history
+from . import oracle as _oracle
+from . import jit as _jit
+from . import checkpoint as _checkpoint
+from .utils import rownorm, rowdot
 
 class LineSearchOptimizer(object):
-    def __init__(self, f, grad, step_size, memory_size=1, **kwargs):
-        self.convergence = []
-        self._f = f
-        self._grad = grad
+    # Solvers supporting batched solve of independent problems with x0 of shape (N, n)
+    _batch_support = False
+    # Solvers able to work with preallocated iterate buffers in the in-place mode
+    _in_place_support = False
+    # Solvers having the compiled loop in liboptpy.jit
+    _jit_support = False
+    # Attributes of the method kept between iterations, they are saved in the state of solve
+    _state_attrs = ()
+    
+    def __init__(self, f, grad, step_size, memory_size=1, history=None, in_place=False, callbacks=None, jit=None, 
+                 checkpoint=None, checkpoint_every=100, dtype=None, accumulate=None, **kwargs):
+        if in_place and not self._in_place_support:
+            raise NotImplementedError("{} does not support in-place mode".format(type(self).__name__))
+        if history is None:
+            history = _history.FullHistory()
+        self._history = history
+        if isinstance(f, _oracle.Oracle):
+            self._oracle = f
+        else:
+            self._oracle = _oracle.Oracle(f, grad)
+        self._f = self._oracle.f
+        self._grad = self._oracle.grad
+        # Working precision of iterates, gradients and directions, by default it is the type of initial point.
+        # Dot products of curvature updates and step size tests are accumulated in the precision accumulate
+        self._dtype = None if dtype is None else np.dtype(dtype)
+        self._acc_dtype = None if accumulate is None else np.dtype(accumulate)
+        self._work_dtype = None
         if step_size is not None:
-            step_size.assign_function(f, grad, self._f_update_x_next)
+            if self._acc_dtype is None:
+                step_size.assign_function(self._f, self._grad, self._f_trial_x_next, self._oracle.f_many)
+            else:
+                step_size.assign_function(self._f, self._grad, self._f_trial_x_next, self._oracle.f_many, 
+                                          accumulate=self._acc_dtype)
         self._step_size = step_size
         self._par = kwargs
         self._grad_mem = deque(maxlen=memory_size)
+        self._x_mem = deque(maxlen=2)
+        self._converged_rows = None
+        self._failed_rows = None
+        self._in_place = in_place
+        self._x_bufs = None
+        self._h_buf = None
+        self._x_trial = None
+        if callbacks is None:
+            callbacks = []
+        elif callable(callbacks):
+            callbacks = [callbacks]
+        self._callbacks = list(callbacks)
+        # None means that the compiled loop is used whenever it is applicable
+        self._jit = jit
+        self._checkpoint = checkpoint
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_files = []
+        
+    @property
+    def convergence(self):
+        return self._history.get()
         
     def get_convergence(self):
-        return self.convergence
+        return self._history.get()
+    
+    def get_oracle(self):
+        return self._oracle
+    
+    def add_callback(self, callback):
+        '''
+        Callback is called after every iteration with the dictionary of iteration number, 
+        new iterate x, its function value f if it has been computed (None otherwise),
+        norm of gradient grad_norm in the previous iterate, step size alpha, number of function values
+        requested by step size rule ls_trials, cumulative numbers of evaluations f_evals and grad_evals and 
+        times of phases t_direction (direction and convergence check), t_step_size and t_update.
+        If callback has method reset, it is called in the beginning of every solve
+        '''
+        self._callbacks.append(callback)
     
     def solve(self, x0, max_iter=100, tol=1e-6, disp=False):
-        self.convergence = []
-        self._x_current = x0.copy()
-        self.convergence.append(self._x_current)
+        self._oracle.clear()
+        self._oracle.reset_counters()
+        self._x_current = x0.copy() if self._dtype is None else x0.astype(self._dtype)
+        self._set_precision()
+        self._x_mem.clear()
+        self._x_mem.append(self._x_current)
+        self._num_iter = 1
+        self._converged_rows = None
+        self._failed_rows = None
+        if self._in_place:
+            self._allocate_buffers(self._x_current)
+        # Iterates live in the reused buffers, so history has to copy them
+        self._history.copy = self._in_place
+        self._history.reset(self._x_current, max_iter, self)
         iteration = 0
         self._current_grad = None
+        if x0.ndim == 2:
+            if not self._batch_support:
+                raise NotImplementedError("{} does not support batched solve".format(type(self).__name__))
+            return self._solve_batch(max_iter, tol, disp)
+        if self._use_jit(x0, disp):
+            return self._solve_jit(max_iter, tol)
+        for callback in self._callbacks:
+            if hasattr(callback, "reset"):
+                callback.reset()
+        return self._run(max_iter, tol, disp, iteration)
+    
+    def resume(self, state, max_iter=100, tol=1e-6, disp=False):
+        '''
+        Continue solve from the state given by get_state or from the checkpoint file
+        until the total number of iterations reaches max_iter. History of the resumed solve starts in the restored point
+        '''
+        if isinstance(state, str):
+            state = _checkpoint.load(state)
+        self.set_state(state)
+        if np.ndim(self._x_current) == 2:
+            raise NotImplementedError("Batched solve can not be resumed")
+        self._set_precision()
+        self._oracle.clear()
+        if self._in_place:
+            self._allocate_buffers(self._x_current)
+        self._history.copy = self._in_place
+        self._history.reset(self._x_current, max_iter, self)
+        iteration = self._num_iter - 1
+        if iteration >= max_iter:
+            self._history.finalize()
+            return self._get_result_x()
+        return self._run(max_iter, tol, disp, iteration)
+    
+    def get_state(self, copy=True):
+        '''
+        Dictionary of arrays and scalars describing solve after the last iteration: iterates, gradients,
+        counters of oracle, attributes of the method and state of step size rule
+        '''
+        state = {"num_iter": self._num_iter, "x_current": self._x_current, "x_mem": list(self._x_mem),
+                 "grad_mem": list(self._grad_mem), "current_grad": self._current_grad,
+                 "h": getattr(self, "_h", None), "alpha": getattr(self, "_alpha", None),
+                 "step_size_alpha": getattr(self._step_size, "_alpha", None)}
+        state.update(("oracle_" + key, value) for key, value in self._oracle.get_stats().items())
+        for attr in self._state_attrs:
+            value = getattr(self, attr, None)
+            state[attr] = list(value) if isinstance(value, deque) else value
+        if copy:
+            state = {key: [np.copy(v) for v in value] if isinstance(value, list) else 
+                     (np.copy(value) if isinstance(value, np.ndarray) else value) for key, value in state.items()}
+        return state
+    
+    def set_state(self, state):
+        self._num_iter = int(state["num_iter"])
+        self._x_current = state["x_current"]
+        self._x_mem.clear()
+        self._x_mem.extend(state["x_mem"])
+        self._grad_mem.clear()
+        self._grad_mem.extend(state["grad_mem"])
+        self._current_grad = state.get("current_grad")
+        self._h = state.get("h")
+        self._alpha = state.get("alpha")
+        if state.get("step_size_alpha") is not None:
+            self._step_size._alpha = state["step_size_alpha"]
+        self._oracle.num_f_evals = state.get("oracle_f_evals", 0)
+        self._oracle.num_grad_evals = state.get("oracle_grad_evals", 0)
+        self._oracle.num_f_saved = state.get("oracle_f_saved", 0)
+        self._oracle.num_grad_saved = state.get("oracle_grad_saved", 0)
+        for attr in self._state_attrs:
+            value = state.get(attr)
+            current = getattr(self, attr, None)
+            if isinstance(current, deque):
+                current.clear()
+                current.extend(value if value is not None else [])
+            else:
+                setattr(self, attr, value)
+    
+    def save_checkpoint(self, filename, mmap_threshold=2**26):
+        '''
+        Save the state of solve to .npz file, arrays larger than mmap_threshold bytes are saved to separate .npy files
+        '''
+        files = _checkpoint.save(self.get_state(copy=False), filename, mmap_threshold)
+        # Separate files of the previous checkpoint are not referenced anymore
+        for old in self._checkpoint_files:
+            if old not in files and os.path.exists(old):
+                os.remove(old)
+        self._checkpoint_files = files
+    
+    def _run(self, max_iter, tol, disp, iteration):
+        # Timings and counters are collected only if somebody listens
+        instrument = len(self._callbacks) > 0
         while True:
-            self._h = self.get_direction(self._x_current)
+            if instrument:
+                t_start = time.perf_counter()
+            self._h = self._cast(self.get_direction(self._x_current))
             if self._current_grad is None:
                 raise ValueError("Variable self._current_grad has to be initialized in method get_direction()!")
             self._grad_mem.append(self._current_grad)
@@ -32,13 +204,30 @@ class LineSearchOptimizer(object):
                 break
             if disp > 1:
                 print("Iteration {}/{}".format(iteration, max_iter))
-                print("Current function val =", self._f(self._x_current))
+                # Function value is printed only if it has been computed already, so verbose mode costs no evaluations
+                print("Current function val =", self._oracle.peek_f(self._x_current))
                 self._print_info()
-            self._alpha = self.get_stepsize()
+            if instrument:
+                t_direction = time.perf_counter()
+                num_f_queries = self._oracle.num_f_evals + self._oracle.num_f_saved
+            self._alpha = self._cast(self.get_stepsize())
+            if instrument:
+                t_step_size = time.perf_counter()
+                ls_trials = self._oracle.num_f_evals + self._oracle.num_f_saved - num_f_queries
             self._update_x_next()
             self._update_x_current()
             self._append_conv()
             iteration += 1
+            if instrument:
+                t_update = time.perf_counter()
+                self._emit({"iteration": iteration, "x": self._x_next, "f": self._oracle.peek_f(self._x_next),
+                            "grad_norm": np.linalg.norm(self._grad_mem[-1]), "alpha": self._alpha,
+                            "ls_trials": ls_trials, "f_evals": self._oracle.num_f_evals, 
+                            "grad_evals": self._oracle.num_grad_evals,
+                            "t_direction": t_direction - t_start, "t_step_size": t_step_size - t_direction,
+                            "t_update": t_update - t_step_size})
+            if self._checkpoint is not None and iteration % self._checkpoint_every == 0:
+                self.save_checkpoint(self._checkpoint)
             if iteration >= max_iter:
                 if disp > 0:
                     print("Maximum iteration exceeds!")
@@ -47,8 +236,133 @@ class LineSearchOptimizer(object):
             print("Convergence in {} iterations".format(iteration))
             print("Function value = {}".format(self._f(self._x_current)))
             self._print_info()
+        self._history.finalize()
         return self._get_result_x()
     
+    def _set_precision(self):
+        # Precision policy is applied only if it is given, otherwise types follow the arithmetic
+        if self._dtype is None and self._acc_dtype is None:
+            self._work_dtype = None
+        else:
+            self._work_dtype = self._x_current.dtype
+        self._oracle.dtype = self._work_dtype
+    
+    def _cast(self, a):
+        # Directions, step sizes and scalars accumulated in higher precision are returned to the working precision
+        if self._work_dtype is None or a is None or getattr(a, "dtype", None) == self._work_dtype:
+            return a
+        if np.ndim(a) == 0:
+            return self._work_dtype.type(a)
+        return np.asarray(a, dtype=self._work_dtype)
+    
+    def _dot(self, a, b):
+        return rowdot(a, b, self._acc_dtype)
+    
+    def _emit(self, event):
+        for callback in self._callbacks:
+            callback(event)
+    
+    def _solve_batch(self, max_iter, tol, disp):
+        # Rows of x are independent problems, f returns vector of function values and grad returns matrix of gradients.
+        # Step sizes are scalars or columns of shape (N, 1), converged rows and rows
+        # where step size search fails (non-finite step size) are frozen
+        active = np.ones(self._x_current.shape[0], dtype=bool)
+        failed = np.zeros(self._x_current.shape[0], dtype=bool)
+        iteration = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            while True:
+                self._h = self._cast(self.get_direction(self._x_current))
+                self._grad_mem.append(self._current_grad)
+                active &= ~np.ravel(self.check_convergence(tol))
+                if not np.any(active):
+                    if disp > 0:
+                        print("Required tolerance achieved for all problems!")
+                    break
+                if disp > 1:
+                    print("Iteration {}/{}, active problems {}".format(iteration, max_iter, np.sum(active)))
+                mask = active[:, np.newaxis]
+                self._h = np.where(mask, self._h, 0)
+                self._alpha = self._cast(self.get_stepsize())
+                if np.ndim(self._alpha) == 2:
+                    stalled = active & ~np.isfinite(np.ravel(self._alpha))
+                    if np.any(stalled):
+                        failed |= stalled
+                        active &= ~stalled
+                        mask = active[:, np.newaxis]
+                        self._alpha = np.where(mask, self._alpha, 0)
+                        self._h = np.where(mask, self._h, 0)
+                x_frozen = self._x_current
+                self._update_x_next()
+                self._x_next = np.where(mask, self._x_next, x_frozen)
+                self._update_x_current()
+                self._x_current = np.where(mask, self._x_current, x_frozen)
+                self._append_conv()
+                iteration += 1
+                if iteration >= max_iter:
+                    if disp > 0:
+                        print("Maximum iteration exceeds!")
+                    break
+        if disp:
+            print("Converged {}/{} problems in {} iterations, failed {}".format(
+                np.sum(~active & ~failed), active.shape[0], iteration, np.sum(failed)))
+        self._converged_rows = ~active & ~failed
+        self._failed_rows = failed
+        self._history.finalize()
+        return self._get_result_x()
+    
+    def _use_jit(self, x0, disp):
+        if self._jit is False:
+            return False
+        if self._jit and not _jit.available:
+            raise ImportError("Compiled loop requires numba")
+        usable = (self._jit_support and self._jit_params() is not None 
+                  and _jit.can_run(self, x0, disp, self._jit_functions()))
+        if self._jit and not usable:
+            raise ValueError("Compiled loop requires jitted functions, constant step size or Armijo rule, "
+                             "full or no history and no callbacks")
+        return usable
+    
+    def _jit_functions(self):
+        return [self._oracle._f_fun, self._oracle._grad_fun]
+    
+    def _jit_params(self):
+        return _jit.step_size_params(self._step_size)
+    
+    def _jit_store(self):
+        return isinstance(self._history, _history.FullHistory)
+    
+    def _solve_jit(self, max_iter, tol):
+        raise NotImplementedError("{} has no compiled loop".format(type(self).__name__))
+    
+    def _finish_jit(self, x, num_iter, hist, num_f, num_grad):
+        if self._jit_store():
+            for i in range(1, num_iter + 1):
+                self._history.append(hist[i], self)
+        self._oracle.num_f_evals += num_f
+        self._oracle.num_grad_evals += num_grad
+        self._x_current = x
+        self._num_iter = num_iter + 1
+        self._history.finalize()
+        return self._get_result_x()
+    
+    def get_converged_rows(self):
+        return self._converged_rows
+    
+    def get_failed_rows(self):
+        return self._failed_rows
+    
+    def _allocate_buffers(self, x):
+        # Three buffers for iterates rotate, since two last iterates are kept in self._x_mem,
+        # direction and trial point of step size rules have their own buffers
+        self._x_bufs = [np.empty_like(x) for _ in range(3)]
+        self._x_buf_idx = 0
+        self._h_buf = np.empty_like(x)
+        self._x_trial = np.empty_like(x)
+    
+    def _next_x_buffer(self):
+        self._x_buf_idx = (self._x_buf_idx + 1) % 3
+        return self._x_bufs[self._x_buf_idx]
+    
     def get_direction(self, x):
         raise NotImplementedError("You have to provide method for finding direction!")
         
@@ -56,13 +370,26 @@ class LineSearchOptimizer(object):
         self._x_current = self._x_next
         
     def _update_x_next(self):
-        self._x_next = self._f_update_x_next(self._x_current, self._alpha, self._h)
+        if self._in_place:
+            self._x_next = self._f_update_x_next(self._x_current, self._alpha, self._h, out=self._next_x_buffer())
+        else:
+            self._x_next = self._f_update_x_next(self._x_current, self._alpha, self._h)
         
-    def _f_update_x_next(self, x, alpha, h):
-        return x + alpha * h
+    def _f_update_x_next(self, x, alpha, h, out=None):
+        if out is None:
+            return x + alpha * h
+        np.multiply(h, alpha, out=out)
+        out += x
+        return out
+    
+    def _f_trial_x_next(self, x, alpha, h):
+        # Trial points of step size rules are written to the single reused buffer in the in-place mode
+        if self._in_place:
+            return self._f_update_x_next(x, alpha, h, out=self._x_trial)
+        return self._f_update_x_next(x, alpha, h)
         
     def check_convergence(self, tol):
-        return np.linalg.norm(self._current_grad) < tol
+        return rownorm(self._current_grad) < tol
         
     def get_stepsize(self):
         raise NotImplementedError("You have to provide method for finding step size!")
@@ -71,11 +398,256 @@ class LineSearchOptimizer(object):
         print("Norm of gradient = {}".format(np.linalg.norm(self._current_grad)))
     
     def _append_conv(self):
-        self.convergence.append(self._x_next)
+        self._x_mem.append(self._x_next)
+        self._num_iter += 1
+        self._history.append(self._x_next, self)
         
     def _get_result_x(self):
         return self._x_current
-    
+
+class StochasticOptimizer(LineSearchOptimizer):
+    '''
+    Base class of stochastic methods for finite sums given by liboptpy.finite_sum.FiniteSum.
+    Every iteration takes the minibatch of batch_size indices, sampling is "shuffle" (new permutation in every epoch),
+    "shuffle_once", "cyclic" or "uniform" (with replacement). Epoch is ceil(m / batch_size) iterations and
+    convergence is checked in the beginning of every epoch by the norm of full gradient (epoch_check="grad")
+    or by the norm of change of x during the last epoch (epoch_check="step"), epoch_check=None turns the check off.
+    Step size rules evaluating f, e.g. backtracking, make a full pass over the data
+    '''
+    _state_attrs = ("_perm", "_pos", "_epoch", "_rng_state", "_x_epoch")
+
+    def __init__(self, problem, step_size, batch_size=1, sampling="shuffle", epoch_check="grad", seed=None, **kwargs):
+        if sampling not in ("shuffle", "shuffle_once", "cyclic", "uniform"):
+            raise ValueError("Available sampling strategies are 'shuffle', 'shuffle_once', 'cyclic' and 'uniform'")
+        if epoch_check not in ("grad", "step", None):
+            raise ValueError("Available epoch checks are 'grad', 'step' and None")
+        super().__init__(problem.f, problem.grad, step_size, **kwargs)
+        self._problem = problem
+        self._batch_size = min(batch_size, problem.num_samples)
+        self._sampling = sampling
+        self._epoch_check = epoch_check
+        self._seed = seed
+        self._rng = None
+        self._perm = None
+        self._pos = 0
+        self._epoch = 0
+        self._x_epoch = None
+        self._new_epoch = False
+
+    def get_num_epochs(self):
+        return self._epoch
+
+    def get_problem(self):
+        return self._problem
+
+    def solve(self, x0, max_iter=100, tol=1e-6, disp=False):
+        m = self._problem.num_samples
+        self._rng = np.random.RandomState(self._seed)
+        self._perm = None
+        if self._sampling != "uniform":
+            # Permutation is shuffled in place, 32-bit indices halve its memory for large data sets
+            self._perm = np.arange(m, dtype=np.int32 if m < 2**31 else np.int64)
+            if self._sampling == "shuffle_once":
+                self._rng.shuffle(self._perm)
+        self._pos = 0
+        self._epoch = 0
+        self._x_epoch = None
+        self._problem.reset_counters()
+        return super().solve(x0, max_iter, tol, disp)
+
+    def get_state(self, copy=True):
+        self._rng_state = self._rng.get_state()
+        return super().get_state(copy)
+
+    def set_state(self, state):
+        super().set_state(state)
+        self._rng = np.random.RandomState()
+        self._rng.set_state(tuple(self._rng_state))
+
+    def _next_batch(self):
+        m = self._problem.num_samples
+        self._new_epoch = self._pos == 0
+        if self._new_epoch and self._sampling == "shuffle":
+            self._rng.shuffle(self._perm)
+        if self._sampling == "uniform":
+            idx = self._rng.randint(m, size=min(self._batch_size, m - self._pos))
+        else:
+            idx = self._perm[self._pos:self._pos + self._batch_size]
+        self._pos += self._batch_size
+        if self._pos >= m:
+            self._pos = 0
+            self._epoch += 1
+        return idx
+
+    def check_convergence(self, tol):
+        # Batch for the current iteration has been taken in get_direction, the first one starts the epoch
+        if not self._new_epoch or self._num_iter == 1 or self._epoch_check is None:
+            if self._new_epoch:
+                self._x_epoch = self._x_current
+            return False
+        if self._epoch_check == "grad":
+            converged = np.linalg.norm(self._epoch_grad()) < tol
+        else:
+            converged = np.linalg.norm(self._x_current - self._x_epoch) < tol
+        self._x_epoch = self._x_current
+        return converged
+
+    def _epoch_grad(self):
+        return self._grad(self._x_current)
+
+    def get_stepsize(self):
+        return self._step_size.get_stepsize(self._h, self._x_current, self._num_iter)
+
 class TrustRegionOptimizer(object):
-    def __init__(self):
-        raise NotImplementedError("Trust region methods are not implemented yet")
\ No newline at end of file
+    '''
+    Base class of trust-region methods. Step p approximately minimizes the model g^T p + p^T B p / 2 
+    subject to ||p|| <= radius, it is accepted if the ratio of actual and predicted reductions of f exceeds eta.
+    Radius is reduced to ||p|| / 4 if the ratio is less than 1/4 and doubled up to max_radius if the ratio
+    is larger than 3/4 and the step is on the boundary. Model is rebuilt only in accepted points,
+    so rejected steps cost one function evaluation. Callbacks get the same events as callbacks of LineSearchOptimizer,
+    alpha is 1 for accepted and 0 for rejected steps, t_direction is the time of the subproblem solve.
+    Precision policy, in-place mode, compiled loop and checkpoints are not supported, their arguments raise TypeError
+    '''
+    def __init__(self, f, grad, init_radius=1., max_radius=1e4, eta=0.1, min_radius=1e-12, history=None, callbacks=None,
+                 **kwargs):
+        if kwargs:
+            raise TypeError("{} got unexpected keyword arguments: {}".format(type(self).__name__, ", ".join(kwargs)))
+        if not 0 <= eta < 0.25:
+            raise ValueError("Trust region requires 0 <= eta < 1/4")
+        if history is None:
+            history = _history.FullHistory()
+        self._history = history
+        if isinstance(f, _oracle.Oracle):
+            self._oracle = f
+        else:
+            self._oracle = _oracle.Oracle(f, grad)
+        self._f = self._oracle.f
+        self._grad = self._oracle.grad
+        self._init_radius = init_radius
+        self._max_radius = max_radius
+        self._min_radius = min_radius
+        self._eta = eta
+        if callbacks is None:
+            callbacks = []
+        elif callable(callbacks):
+            callbacks = [callbacks]
+        self._callbacks = list(callbacks)
+        self._radius = init_radius
+        self._num_rejected = 0
+        # Gradient in the previous iterate and step size (1 for accepted and 0 for rejected step) for history
+        self._grad_mem = deque(maxlen=1)
+        self._alpha = None
+    
+    @property
+    def convergence(self):
+        return self._history.get()
+        
+    def get_convergence(self):
+        return self._history.get()
+    
+    def get_oracle(self):
+        return self._oracle
+    
+    def get_radius(self):
+        return self._radius
+    
+    def get_num_rejected(self):
+        return self._num_rejected
+    
+    def add_callback(self, callback):
+        self._callbacks.append(callback)
+    
+    def solve(self, x0, max_iter=100, tol=1e-6, disp=False):
+        self._oracle.clear()
+        self._oracle.reset_counters()
+        self._x_current = x0.copy()
+        self._num_iter = 1
+        self._radius = self._init_radius
+        self._num_rejected = 0
+        self._history.copy = False
+        self._history.reset(self._x_current, max_iter, self)
+        self._reset_model(self._x_current)
+        f_x = self._f(self._x_current)
+        self._current_grad = self._grad(self._x_current)
+        self._set_model(self._x_current)
+        for callback in self._callbacks:
+            if hasattr(callback, "reset"):
+                callback.reset()
+        instrument = len(self._callbacks) > 0
+        iteration = 0
+        while True:
+            if instrument:
+                t_start = time.perf_counter()
+            if np.linalg.norm(self._current_grad) < tol:
+                if disp > 0:
+                    print("Required tolerance achieved!")
+                break
+            self._grad_mem.append(self._current_grad)
+            p, Bp = self.solve_subproblem(self._current_grad, self._radius)
+            predicted = -(self._current_grad.dot(p) + 0.5 * p.dot(Bp))
+            if instrument:
+                t_direction = time.perf_counter()
+            x_trial = self._x_current + p
+            f_trial = self._f(x_trial)
+            noise = 10 * np.finfo(float).eps * max(1, abs(f_x))
+            if predicted > 0 and np.isfinite(f_trial):
+                # Reductions at the level of rounding errors of f say nothing about the model, so the step is taken
+                ratio = 1. if predicted < noise and abs(f_x - f_trial) < noise else (f_x - f_trial) / predicted
+            else:
+                ratio = -np.inf
+            p_norm = np.linalg.norm(p)
+            if ratio < 0.25:
+                self._radius = 0.25 * p_norm
+            elif ratio > 0.75 and p_norm >= 0.99 * self._radius:
+                self._radius = min(2 * self._radius, self._max_radius)
+            accepted = ratio > self._eta
+            self._alpha = 1. if accepted else 0.
+            if instrument:
+                t_step_size = time.perf_counter()
+            self._update_model(p, x_trial, accepted)
+            if accepted:
+                self._x_current = x_trial
+                f_x = f_trial
+                self._current_grad = self._grad(x_trial)
+                self._set_model(x_trial)
+            else:
+                self._num_rejected += 1
+            iteration += 1
+            self._num_iter += 1
+            self._history.append(self._x_current, self)
+            if instrument:
+                t_update = time.perf_counter()
+                for callback in self._callbacks:
+                    callback({"iteration": iteration, "x": self._x_current, "f": f_x,
+                              "grad_norm": np.linalg.norm(self._grad_mem[-1]), "alpha": self._alpha, "ls_trials": 1,
+                              "f_evals": self._oracle.num_f_evals, "grad_evals": self._oracle.num_grad_evals,
+                              "t_direction": t_direction - t_start, "t_step_size": t_step_size - t_direction,
+                              "t_update": t_update - t_step_size})
+            if disp > 1:
+                print("Iteration {}/{}, f = {}, radius = {}, ratio = {}".format(iteration, max_iter, f_x, 
+                                                                              self._radius, ratio))
+            if iteration >= max_iter:
+                if disp > 0:
+                    print("Maximum iteration exceeds!")
+                break
+            if self._radius < self._min_radius:
+                if disp > 0:
+                    print("Trust region radius is too small!")
+                break
+        if disp:
+            print("Convergence in {} iterations".format(iteration))
+            print("Function value = {}".format(f_x))
+        self._history.finalize()
+        return self._x_current
+    
+    def _reset_model(self, x):
+        pass
+    
+    def _set_model(self, x):
+        raise NotImplementedError("You have to provide method for building the model!")
+    
+    def solve_subproblem(self, g, radius):
+        raise NotImplementedError("You have to provide method for solving the trust-region subproblem!")
+    
+    def _update_model(self, s, x_trial, accepted):
+        pass
\ No newline at end of file
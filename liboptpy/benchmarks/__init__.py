@@ -0,0 +1,8 @@
+from ._problems import Problem, quadratic, rosenbrock, logistic_regression, lasso
+from ._problems import simplex_least_squares, box_least_squares, get_problems
+from ._runner import default_solvers, run, save, load, compare
+from ._overhead import jit_solvers, jit_overhead
+
+__all__ = ["Problem", "quadratic", "rosenbrock", "logistic_regression", "lasso",
+           "simplex_least_squares", "box_least_squares", "get_problems",
+           "default_solvers", "run", "save", "load", "compare", "jit_solvers", "jit_overhead"]
@@ -0,0 +1,24 @@
+import argparse
+from . import get_problems, run, save, load, compare, jit_overhead
+
+parser = argparse.ArgumentParser(description="Benchmark of liboptpy solvers on the catalog of test problems")
+parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100])
+parser.add_argument("--max_iter", type=int, default=1000)
+parser.add_argument("--tol", type=float, default=1e-6)
+parser.add_argument("--repeat", type=int, default=1)
+parser.add_argument("--no_memory", action="store_true", help="Skip tracing of peak memory")
+parser.add_argument("--output", default="benchmark.json")
+parser.add_argument("--baseline", default=None, help="JSON file of previous run to compare time with")
+parser.add_argument("--jit", action="store_true", help="Compare the Python loop with the compiled loops instead")
+args = parser.parse_args()
+
+if args.jit:
+    jit_overhead(args.sizes, max_iter=args.max_iter, tol=args.tol, repeat=max(args.repeat, 3), disp=True)
+    raise SystemExit
+
+results = run(get_problems(args.sizes), max_iter=args.max_iter, tol=args.tol, repeat=args.repeat,
+              memory=not args.no_memory, disp=True)
+save(results, args.output)
+if args.baseline is not None:
+    for r in compare(load(args.baseline), results):
+        print("{:<24} {:>6} {:<24} {:>6.2f}x".format(r["problem"], r["n"], r["solver"], r["ratio"]))
@@ -0,0 +1,87 @@
+import copy
+import time
+from .. import history as _history
+from .. import jit as _jit
+from .. import step_size as _ss
+from .. import unconstr_solvers as _us
+from .. import constr_solvers as _cs
+from ._problems import quadratic, box_least_squares
+
+__all__ = ["jit_solvers", "jit_overhead"]
+
+def _armijo():
+    return _ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+def jit_solvers():
+    '''
+    List of (name, kind of problems, factory) for solvers having the compiled loop
+    '''
+    fo = _us.fo
+    return [
+        ("GD/Armijo", "smooth", lambda p, **kw: fo.GradientDescent(p.f, p.grad, _armijo(), **kw)),
+        ("GD/constant", "smooth", 
+         lambda p, **kw: fo.GradientDescent(p.f, p.grad, _ss.ConstantStepSize(1. / p.lipschitz), **kw)),
+        ("AGD/constant", "smooth", 
+         lambda p, **kw: fo.AcceleratedGD(p.f, p.grad, _ss.ConstantStepSize(1. / p.lipschitz), **kw)),
+        ("BB", "smooth", 
+         lambda p, **kw: fo.BarzilaiBorweinMethod(p.f, p.grad, init_alpha=1. / p.lipschitz, type=1, **kw)),
+        ("LBFGS/Armijo", "smooth", lambda p, **kw: fo.LBFGS(p.f, p.grad, _armijo(), **kw)),
+        ("ProjectedGD/constant", "constrained", 
+         lambda p, **kw: _cs.ProjectedGD(p.f, p.grad, p.projector, _ss.ConstantStepSize(1. / p.lipschitz), **kw)),
+    ]
+
+def _jitted(problem):
+    import numba
+    problem = copy.copy(problem)
+    problem.f = numba.njit(problem.f)
+    problem.grad = numba.njit(problem.grad)
+    if problem.projector is not None:
+        problem.projector = numba.njit(problem.projector)
+    return problem
+
+def _best_time(solver, x0, max_iter, tol, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solver.solve(x0, max_iter, tol)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def jit_overhead(sizes=(10, 100, 1000), max_iter=1000, tol=1e-6, repeat=3, disp=False):
+    '''
+    Wall time (the best of repeat runs) of the common Python loop and of the compiled loop
+    on quadratic and box-constrained least squares problems with numba-jitted functions, requires numba.
+    Compilation is excluded by the warm-up run
+    '''
+    if not _jit.available:
+        raise ImportError("Benchmark of compiled loops requires numba")
+    results = []
+    for n in sizes:
+        for problem in [quadratic(n, cond=1e2), box_least_squares(n // 2 + 1, n)]:
+            jitted = _jitted(problem)
+            for name, kind, make_solver in jit_solvers():
+                if problem.kind != kind:
+                    continue
+                python = make_solver(problem, history=_history.NoHistory(), jit=False)
+                compiled = make_solver(jitted, history=_history.NoHistory(), jit=True)
+                record = {"problem": problem.name, "n": n, "solver": name}
+                try:
+                    # The first run compiles the loop
+                    compiled.solve(problem.x0, max_iter, tol)
+                    record["time_python"] = _best_time(python, problem.x0, max_iter, tol, repeat)
+                    record["time_jit"] = _best_time(compiled, problem.x0, max_iter, tol, repeat)
+                except Exception as e:
+                    record["error"] = "{}: {}".format(type(e).__name__, e)
+                else:
+                    # History is not kept, so the number of iterations is taken from the solver
+                    record["iterations"] = python._num_iter - 1
+                    record["speedup"] = record["time_python"] / record["time_jit"]
+                if disp:
+                    head = "{:<24} {:>6} {:<24}".format(problem.name, n, name)
+                    if "error" in record:
+                        print(head, record["error"])
+                    else:
+                        print(head, "{:>10.2e}s {:>10.2e}s {:>8.1f}x".format(record["time_python"], record["time_jit"], 
+                                                                           record["speedup"]))
+                results.append(record)
+    return results
@@ -0,0 +1,135 @@
+import numpy as np
+import scipy.special as spspec
+from .. import lmo as _lmo
+from .. import prox as _prox
+
+__all__ = ["Problem", "quadratic", "rosenbrock", "logistic_regression", "lasso",
+           "simplex_least_squares", "box_least_squares", "get_problems"]
+
+class Problem(object):
+    '''
+    Class represents test problem: objective with its gradient (subgradient for nonsmooth problems),
+    optional hessian, initial point, optimal value and Lipschitz constant of gradient if they are known.
+    Feasible set of constrained problems is given by projector and linear minimization oracle lmo(g) = argmin_{x in C} g^T x
+    '''
+    def __init__(self, name, kind, f, grad, x0, hess=None, f_opt=None, lipschitz=None, convex=True,
+                 projector=None, lmo=None):
+        self.name = name
+        self.kind = kind
+        self.f = f
+        self.grad = grad
+        self.x0 = x0
+        self.hess = hess
+        self.f_opt = f_opt
+        self.lipschitz = lipschitz
+        self.convex = convex
+        self.projector = projector
+        self.lmo = lmo
+        
+    @property
+    def n(self):
+        return self.x0.shape[0]
+
+def _orthogonal(n, rng):
+    Q, _ = np.linalg.qr(rng.randn(n, n))
+    return Q
+
+def quadratic(n, cond=1e3, seed=0):
+    rng = np.random.RandomState(seed)
+    Q = _orthogonal(n, rng)
+    A = (Q * np.logspace(0, np.log10(cond), n)).dot(Q.T)
+    A = 0.5 * (A + A.T)
+    b = rng.randn(n)
+    return Problem("quadratic_cond{:.0e}".format(cond), "smooth",
+                   lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x),
+                   lambda x: A.dot(x) - b,
+                   np.zeros(n), hess=lambda x: A, 
+                   f_opt=-0.5 * b.dot(np.linalg.solve(A, b)), lipschitz=cond)
+
+def rosenbrock(n):
+    def f(x):
+        return np.sum(100 * (x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2)
+    
+    def grad(x):
+        g = np.zeros_like(x)
+        d = x[1:] - x[:-1]**2
+        g[:-1] = -400 * x[:-1] * d - 2 * (1 - x[:-1])
+        g[1:] += 200 * d
+        return g
+    
+    def hess(x):
+        H = np.zeros((n, n))
+        H[np.arange(n - 1), np.arange(1, n)] = H[np.arange(1, n), np.arange(n - 1)] = -400 * x[:-1]
+        diag = np.zeros_like(x)
+        diag[:-1] = 1200 * x[:-1]**2 - 400 * x[1:] + 2
+        diag[1:] += 200
+        H[np.diag_indices(n)] = diag
+        return H
+    
+    x0 = np.ones(n)
+    x0[::2] = -1.2
+    return Problem("rosenbrock", "smooth", f, grad, x0, hess=hess, f_opt=0., convex=False)
+
+def logistic_regression(m, n, lam=1e-2, seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.randn(m, n)
+    y = np.sign(X.dot(rng.randn(n)) + 0.5 * rng.randn(m))
+    
+    def f(w):
+        return np.mean(np.logaddexp(0, -y * X.dot(w))) + 0.5 * lam * w.dot(w)
+    
+    def grad(w):
+        return -X.T.dot(y * spspec.expit(-y * X.dot(w))) / m + lam * w
+    
+    def hess(w):
+        s = spspec.expit(y * X.dot(w))
+        return (X.T * (s * (1 - s))).dot(X) / m + lam * np.eye(n)
+    
+    # Optimal value is found by Newton method, since the objective is strongly convex
+    w = np.zeros(n)
+    for _ in range(50):
+        g = grad(w)
+        if np.linalg.norm(g) < 1e-12:
+            break
+        w -= np.linalg.solve(hess(w), g)
+    return Problem("logistic_regression", "smooth", f, grad, np.zeros(n), hess=hess, f_opt=f(w),
+                   lipschitz=np.linalg.norm(X, 2)**2 / (4 * m) + lam)
+
+def lasso(m, n, lam=0.1, seed=0):
+    rng = np.random.RandomState(seed)
+    A = rng.randn(m, n) / np.sqrt(m)
+    x_true = rng.randn(n) * (rng.rand(n) < 0.1)
+    b = A.dot(x_true) + 0.01 * rng.randn(m)
+    return Problem("lasso", "nonsmooth",
+                   lambda x: 0.5 * np.sum((A.dot(x) - b)**2) + lam * np.sum(np.abs(x)),
+                   lambda x: A.T.dot(A.dot(x) - b) + lam * np.sign(x),
+                   np.zeros(n))
+
+def _least_squares(m, n, seed):
+    rng = np.random.RandomState(seed)
+    A = rng.randn(m, n)
+    b = A.dot(rng.rand(n) / n) + 0.01 * rng.randn(m)
+    f = lambda x: 0.5 * np.sum((A.dot(x) - b)**2)
+    grad = lambda x: A.T.dot(A.dot(x) - b)
+    return f, grad, np.linalg.norm(A, 2)**2
+
+def simplex_least_squares(m, n, seed=0):
+    f, grad, L = _least_squares(m, n, seed)
+    return Problem("simplex_least_squares", "constrained", f, grad, np.full(n, 1. / n), lipschitz=L,
+                   projector=_prox.project_simplex, lmo=_lmo.Simplex())
+
+def box_least_squares(m, n, seed=0):
+    f, grad, L = _least_squares(m, n, seed)
+    return Problem("box_least_squares", "constrained", f, grad, np.full(n, 0.5), lipschitz=L,
+                   projector=lambda y: np.clip(y, 0, 1), lmo=_lmo.Box(0., 1.))
+
+def get_problems(sizes=(10, 100)):
+    '''
+    Catalog of test problems of every kind for the given sizes
+    '''
+    problems = []
+    for n in sizes:
+        problems += [quadratic(n, cond=1e2), quadratic(n, cond=1e4), rosenbrock(n),
+                     logistic_regression(4 * n, n), lasso(n // 2 + 1, n),
+                     simplex_least_squares(n // 2 + 1, n), box_least_squares(n // 2 + 1, n)]
+    return problems
@@ -0,0 +1,184 @@
+import copy
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+from .. import history as _history
+from .. import step_size as _ss
+from .. import unconstr_solvers as _us
+from .. import constr_solvers as _cs
+
+__all__ = ["default_solvers", "run", "save", "load", "compare"]
+
+def _armijo():
+    return _ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+def default_solvers():
+    '''
+    List of (name, kinds of problems, required attributes of problem, factory) for every solver
+    and step size combination in the benchmark. Factory takes problem and keyword arguments of solver and returns solver
+    '''
+    fo, so = _us.fo, _us.so
+    return [
+        ("GD/Armijo", ("smooth",), (), lambda p, **kw: fo.GradientDescent(p.f, p.grad, _armijo(), **kw)),
+        ("GD/Goldstein", ("smooth",), (), 
+         lambda p, **kw: fo.GradientDescent(p.f, p.grad, _ss.Backtracking("Goldstein", rho=0.5, beta=0.25, init_alpha=1.), **kw)),
+        ("GD/MoreThuente", ("smooth",), (), lambda p, **kw: fo.GradientDescent(p.f, p.grad, _ss.MoreThuente(c2=0.1), **kw)),
+        ("GD/constant", ("smooth",), ("lipschitz",), 
+         lambda p, **kw: fo.GradientDescent(p.f, p.grad, _ss.ConstantStepSize(1. / p.lipschitz), **kw)),
+        ("AGD/constant", ("smooth",), ("lipschitz",), 
+         lambda p, **kw: fo.AcceleratedGD(p.f, p.grad, _ss.ConstantStepSize(1. / p.lipschitz), **kw)),
+        ("BB1", ("smooth",), (), lambda p, **kw: fo.BarzilaiBorweinMethod(p.f, p.grad, init_alpha=1e-3, type=1, **kw)),
+        ("CG-FR/MoreThuente", ("smooth",), (), lambda p, **kw: fo.ConjugateGradientFR(p.f, p.grad, **kw)),
+        ("CG-PR/MoreThuente", ("smooth",), (), lambda p, **kw: fo.ConjugateGradientPR(p.f, p.grad, **kw)),
+        ("BFGS/MoreThuente", ("smooth",), (), lambda p, **kw: fo.BFGS(p.f, p.grad, **kw)),
+        ("BFGS/Armijo", ("smooth",), (), lambda p, **kw: fo.BFGS(p.f, p.grad, _armijo(), **kw)),
+        ("LBFGS/MoreThuente", ("smooth",), (), lambda p, **kw: fo.LBFGS(p.f, p.grad, **kw)),
+        ("DFP/MoreThuente", ("smooth",), (), lambda p, **kw: fo.DFP(p.f, p.grad, **kw)),
+        ("Newton/Armijo", ("smooth",), ("hess",), lambda p, **kw: so.NewtonMethod(p.f, p.grad, p.hess, _armijo(), **kw)),
+        ("InexactNewton/Armijo", ("smooth",), ("hess",), 
+         lambda p, **kw: so.InexactNewtonMethod(p.f, p.grad, p.hess, _armijo(), **kw)),
+        ("Subgrad/InvSqrootIter", ("nonsmooth",), (), 
+         lambda p, **kw: fo.SubgradientMethod(p.f, p.grad, _ss.InvSqrootIterStepSize(), **kw)),
+        ("DualAveraging/InvIter", ("nonsmooth",), (), 
+         lambda p, **kw: fo.DualAveraging(p.f, p.grad, _ss.InvIterStepSize(), _ss.ScaledConstantStepSize(1.), **kw)),
+        ("ProjectedGD/Armijo", ("constrained",), (), lambda p, **kw: _cs.ProjectedGD(p.f, p.grad, p.projector, _armijo(), **kw)),
+        ("ProjectedGD/constant", ("constrained",), ("lipschitz",), 
+         lambda p, **kw: _cs.ProjectedGD(p.f, p.grad, p.projector, _ss.ConstantStepSize(1. / p.lipschitz), **kw)),
+        ("FrankWolfe/Armijo", ("constrained",), (), lambda p, **kw: _cs.FrankWolfe(p.f, p.grad, p.lmo, _armijo(), **kw)),
+        ("FrankWolfe-away/Armijo", ("constrained",), (), 
+         lambda p, **kw: _cs.FrankWolfe(p.f, p.grad, p.lmo, _armijo(), variant="away", **kw)),
+    ]
+
+class _Counter(object):
+    def __init__(self, fun):
+        self.fun = fun
+        self.calls = 0
+    
+    def __call__(self, *args):
+        self.calls += 1
+        return self.fun(*args)
+
+class _Tracker(_history.History):
+    '''
+    History policy counting iterations and recording time and number of iteration when
+    the gap f(x_k) - f* falls below f_tol. Time spent in the tracker is excluded
+    '''
+    def __init__(self, f, f_opt, f_tol):
+        super().__init__()
+        self._f = f
+        self._f_opt = f_opt
+        self._f_tol = f_tol
+    
+    def reset(self, x0, max_iter, optimizer):
+        self.num_iter = 0
+        self.time_to_tol = None
+        self.iter_to_tol = None
+        self._overhead = 0.
+        self._start = time.perf_counter()
+        self._check(x0)
+    
+    def append(self, x, optimizer):
+        self.num_iter += 1
+        self._check(x)
+    
+    def _check(self, x):
+        t = time.perf_counter()
+        if self._f_opt is not None and self.time_to_tol is None:
+            if self._f(x) - self._f_opt <= self._f_tol * max(1., abs(self._f_opt)):
+                self.time_to_tol = t - self._start - self._overhead
+                self.iter_to_tol = self.num_iter
+        self._overhead += time.perf_counter() - t
+
+def _run_one(problem, name, make_solver, max_iter, tol, f_tol, repeat, memory):
+    problem = copy.copy(problem)
+    if problem.hess is not None:
+        problem.hess = _Counter(problem.hess)
+    record = {"problem": problem.name, "kind": problem.kind, "n": problem.n, "solver": name}
+    times = []
+    try:
+        for _ in range(repeat):
+            tracker = _Tracker(problem.f, problem.f_opt, f_tol)
+            solver = make_solver(problem, history=tracker)
+            if problem.hess is not None:
+                problem.hess.calls = 0
+            start = time.perf_counter()
+            x = solver.solve(problem.x0, max_iter, tol)
+            times.append(time.perf_counter() - start - tracker._overhead)
+        hess_evals = 0 if problem.hess is None else problem.hess.calls
+        if memory:
+            solver_mem = make_solver(problem, history=_history.NoHistory())
+            tracemalloc.start()
+            solver_mem.solve(problem.x0, max_iter, tol)
+            record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    except Exception as e:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        record["error"] = "{}: {}".format(type(e).__name__, e)
+        return record
+    stats = solver.get_oracle().get_stats()
+    f_val = float(problem.f(x))
+    record.update({"time": min(times), "iterations": tracker.num_iter, 
+                   "f": f_val, "f_gap": None if problem.f_opt is None else f_val - problem.f_opt,
+                   "f_evals": stats["f_evals"], "grad_evals": stats["grad_evals"],
+                   "hess_evals": hess_evals,
+                   "time_to_tol": tracker.time_to_tol, "iter_to_tol": tracker.iter_to_tol})
+    return record
+
+def run(problems, solvers=None, max_iter=1000, tol=1e-6, f_tol=1e-6, repeat=1, memory=True, disp=False):
+    '''
+    Run every solver on every problem of the suitable kind and return the list of records with
+    wall time (the best of repeat runs), number of iterations, final function value, numbers of evaluations of 
+    f, grad and hessian, peak memory traced by tracemalloc in the separate run and time to relative tolerance f_tol
+    in function value for problems with known optimal value. Failed runs have error field instead
+    '''
+    if solvers is None:
+        solvers = default_solvers()
+    results = []
+    for problem in problems:
+        for name, kinds, requires, make_solver in solvers:
+            if problem.kind not in kinds or not all(getattr(problem, attr) for attr in requires):
+                continue
+            record = _run_one(problem, name, make_solver, max_iter, tol, f_tol, repeat, memory)
+            if disp:
+                print(format_record(record))
+            results.append(record)
+    return results
+
+def format_record(record):
+    head = "{:<24} {:>6} {:<24}".format(record["problem"], record["n"], record["solver"])
+    if "error" in record:
+        return head + " " + record["error"]
+    return head + " {:>10.2e}s {:>6} it {:>6} f {:>6} g {:>5} H".format(record["time"], record["iterations"], 
+                                                                  record["f_evals"], record["grad_evals"], 
+                                                                  record["hess_evals"])
+
+def save(results, filename):
+    '''
+    Save records to JSON file together with versions of Python and numpy
+    '''
+    data = {"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                     "platform": platform.platform(), "date": time.strftime("%Y-%m-%d %H:%M:%S")},
+            "results": results}
+    with open(filename, "w") as fp:
+        json.dump(data, fp, indent=1)
+
+def load(filename):
+    with open(filename) as fp:
+        return json.load(fp)["results"]
+
+def compare(old, new, key="time"):
+    '''
+    Ratios new / old of the field key for runs present in both lists of records
+    '''
+    old_map = {(r["problem"], r["n"], r["solver"]): r for r in old}
+    ratios = []
+    for r in new:
+        r_old = old_map.get((r["problem"], r["n"], r["solver"]))
+        if r_old is None or r.get(key) is None or r_old.get(key) is None:
+            continue
+        ratios.append({"problem": r["problem"], "n": r["n"], "solver": r["solver"],
+                       "old": r_old[key], "new": r[key], "ratio": r[key] / r_old[key] if r_old[key] else np.inf})
+    return ratios
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+
+__all__ = ["save", "load"]
+
+def save(state, filename, mmap_threshold=2**26):
+    '''
+    Save state of solver given by get_state to .npz file, which is replaced atomically.
+    Lists are saved item by item, None values are skipped. Arrays larger than mmap_threshold bytes,
+    e.g. dense approximations of the hessian, are saved to separate .npy files next to the checkpoint
+    and loaded as memory maps. Names of separate files are returned
+    '''
+    arrays = {}
+    files = []
+    for key, value in state.items():
+        items = [(key, value)]
+        if isinstance(value, (list, tuple)):
+            arrays[key + "/len"] = len(value)
+            items = [("{}/{}".format(key, i), v) for i, v in enumerate(value)]
+        for name, v in items:
+            if v is None:
+                continue
+            v = np.asanyarray(v)
+            if v.nbytes > mmap_threshold:
+                # Iteration is a part of the name, so the files of the previous checkpoint stay valid until it is replaced
+                side = "{}.{}.{}.npy".format(filename, name.replace("/", "_"), state.get("num_iter", 0))
+                _replace(side, lambda fp: np.save(fp, v))
+                arrays[name + "@file"] = os.path.basename(side)
+                files.append(side)
+            else:
+                arrays[name] = v
+    _replace(filename, lambda fp: np.savez(fp, **arrays))
+    return files
+
+def _replace(filename, write):
+    tmp = filename + ".tmp"
+    with open(tmp, "wb") as fp:
+        write(fp)
+    os.replace(tmp, filename)
+
+def load(filename, mmap=True):
+    '''
+    Load state saved by save. Arrays from separate files are memory-mapped in copy-on-write mode if mmap is True
+    '''
+    state = {}
+    lists = {}
+    folder = os.path.dirname(filename)
+    with np.load(filename, allow_pickle=False) as data:
+        for name in data.files:
+            value = data[name]
+            if name.endswith("/len"):
+                lists[name[:-4]] = int(value)
+                continue
+            if name.endswith("@file"):
+                name = name[:-5]
+                value = np.load(os.path.join(folder, str(value)), mmap_mode="c" if mmap else None)
+            elif value.ndim == 0:
+                value = value.item()
+            state[name] = value
+    for key, length in lists.items():
+        state[key] = [state.pop("{}/{}".format(key, i), None) for i in range(length)]
+    return state
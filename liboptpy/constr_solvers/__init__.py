@@ -1,2 +1,5 @@
 from ._frank_wolfe import FrankWolfe
-from ._proj_gd import ProjectedGD
\ No newline at end of file
+from ._proj_gd import ProjectedGD
+from ._fista import FISTA
+from ._interior_point import BarrierMethod, PrimalDualInteriorPoint
+from ._admm import ADMM, AugmentedLagrangian
\ No newline at end of file
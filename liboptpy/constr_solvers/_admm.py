@@ -0,0 +1,165 @@
+import numpy as np
+import scipy.sparse as sp
+from ..base_optimizer import LineSearchOptimizer
+from .. import kkt as _kkt
+from .. import prox as _prox
+
+class ADMM(LineSearchOptimizer):
+    '''
+    Class represents alternating direction method of multipliers for min x^T P x / 2 + q^T x + g(z) s.t. A x = z,
+    A is the identity if it is None. prox(v, alpha) is the proximal operator of alpha * g from liboptpy.prox
+    or projector(v) as ProjectedGD accepts it. Matrix P + rho A^T A of x-update is factorized by liboptpy.kkt.KKTSolver
+    (dense Cholesky or sparse factorization) only when rho changes, so the iteration costs two triangular solves.
+    relax in (0, 2) is the over-relaxation parameter. If adaptive is True, rho is multiplied (divided) by tau when
+    the primal residual ||A x - z|| is mu times larger (smaller) than the dual residual ||rho A^T (z - z_prev)||,
+    at most once in adapt_every iterations. Solve stops when the norms of residuals are less than
+    sqrt(dimension) * tol + rel_tol * (scale of the corresponding variables)
+    '''
+    _state_attrs = ("_z", "_u", "_rho", "_x_last", "_last_adapt", "_num_adapts")
+
+    def __init__(self, P, q, prox, A=None, rho=1., relax=1., adaptive=True, mu=10., tau=2., adapt_every=1,
+                 rel_tol=0., kkt_solver=None, **kwargs):
+        if not 0 < relax < 2:
+            raise ValueError("Over-relaxation parameter has to be in (0, 2)")
+        super().__init__(lambda x: 0.5 * x.dot(P.dot(x)) + q.dot(x), lambda x: P.dot(x) + q, None, **kwargs)
+        self._P = P
+        self._q = q
+        self._A = A
+        self._prox = _prox.as_prox(prox)
+        self._rho0 = rho
+        self._rho = rho
+        self._relax = relax
+        self._adaptive = adaptive
+        self._mu = mu
+        self._tau = tau
+        self._adapt_every = adapt_every
+        self._rel_tol = rel_tol
+        self._kkt = _kkt.KKTSolver() if kkt_solver is None else kkt_solver
+        self._factor_rho = None
+        self._num_adapts = 0
+
+    def get_kkt_solver(self):
+        return self._kkt
+
+    def get_rho(self):
+        return self._rho
+
+    def get_num_adapts(self):
+        return self._num_adapts
+
+    def get_z(self):
+        return self._z
+
+    def get_dual(self):
+        '''
+        Multipliers of A x = z, the method keeps them scaled by 1 / rho
+        '''
+        return self._rho * self._u
+
+    def get_residuals(self):
+        return self._r_norm, self._s_norm
+
+    def set_state(self, state):
+        super().set_state(state)
+        self._factor_rho = None
+
+    def _matvec(self, x):
+        return x if self._A is None else self._A.dot(x)
+
+    def _rmatvec(self, y):
+        return y if self._A is None else self._A.T.dot(y)
+
+    def _factorize(self):
+        n = self._q.shape[0]
+        if self._A is None:
+            AtA = sp.identity(n, format="csr") if sp.issparse(self._P) else np.eye(n)
+        else:
+            AtA = self._A.T.dot(self._A)
+        if sp.issparse(self._P) != sp.issparse(AtA):
+            AtA = sp.csr_matrix(AtA) if sp.issparse(self._P) else AtA.toarray()
+        self._kkt.factorize(self._P + self._rho * AtA)
+        self._factor_rho = self._rho
+
+    def _init_z(self, x):
+        return self._matvec(x)
+
+    def get_direction(self, x):
+        if self._num_iter == 1:
+            self._rho = self._rho0
+            self._z = self._init_z(x)
+            self._u = np.zeros_like(self._z)
+            self._last_adapt = 0
+            self._num_adapts = 0
+        if self._factor_rho != self._rho:
+            self._factorize()
+        z_prev = self._z
+        x_next, _ = self._kkt.solve_factorized(-self._q + self._rho * self._rmatvec(self._z - self._u))
+        Ax = self._matvec(x_next)
+        x_hat = self._relax * Ax + (1 - self._relax) * z_prev
+        self._z = self._prox(x_hat + self._u, 1. / self._rho)
+        self._u = self._u + x_hat - self._z
+        s = self._rho * self._rmatvec(self._z - z_prev)
+        self._r_norm = np.linalg.norm(Ax - self._z)
+        self._s_norm = np.linalg.norm(s)
+        self._eps_pri = self._rel_tol * max(np.linalg.norm(Ax), np.linalg.norm(self._z))
+        self._eps_dual = self._rel_tol * np.linalg.norm(self._rho * self._rmatvec(self._u)) if self._rel_tol > 0 else 0.
+        self._current_grad = s
+        self._x_last = x_next
+        if self._adaptive and self._num_iter - self._last_adapt >= self._adapt_every:
+            self._adapt()
+        return x_next - x
+
+    def _adapt(self):
+        # Residual balancing, scaled multipliers keep the unscaled ones
+        if self._r_norm > self._mu * self._s_norm:
+            scale = self._tau
+        elif self._s_norm > self._mu * self._r_norm:
+            scale = 1. / self._tau
+        else:
+            return
+        self._rho *= scale
+        self._u = self._u / scale
+        self._last_adapt = self._num_iter
+        self._num_adapts += 1
+
+    def check_convergence(self, tol):
+        return (self._r_norm <= np.sqrt(self._z.shape[0]) * tol + self._eps_pri and
+                self._s_norm <= np.sqrt(self._q.shape[0]) * tol + self._eps_dual)
+
+    def get_stepsize(self):
+        return 1.
+
+    def _f_update_x_next(self, x, alpha, h):
+        return self._x_last
+
+    def _get_result_x(self):
+        return self._x_last
+
+    def _print_info(self):
+        print("Primal residual = {}, dual residual = {}, rho = {}".format(self._r_norm, self._s_norm, self._rho))
+
+class AugmentedLagrangian(ADMM):
+    '''
+    Class represents method of multipliers for min x^T P x / 2 + q^T x s.t. C x = d. It is ADMM with z fixed to d,
+    so x-update minimizes the augmented Lagrangian exactly with the cached factorization of P + rho C^T C and the multipliers
+    are updated by rho (C x - d). If adaptive is True, rho is multiplied by tau when the primal residual
+    decreases less than by the factor 1 / 4, solve stops when the primal residual is less than sqrt(dimension) * tol
+    '''
+    _state_attrs = ADMM._state_attrs + ("_r_prev",)
+
+    def __init__(self, P, q, C, d, rho=1., adaptive=True, tau=10., **kwargs):
+        super().__init__(P, q, lambda v, alpha: d, A=C, rho=rho, adaptive=adaptive, tau=tau, **kwargs)
+        self._d = d
+        self._r_prev = np.inf
+
+    def _init_z(self, x):
+        self._r_prev = np.inf
+        return self._d
+
+    def _adapt(self):
+        if self._r_norm > 0.25 * self._r_prev:
+            self._rho *= self._tau
+            self._u = self._u / self._tau
+            self._last_adapt = self._num_iter
+            self._num_adapts += 1
+        self._r_prev = self._r_norm
@@ -0,0 +1,75 @@
+import numpy as np
+from ..base_optimizer import LineSearchOptimizer
+
+class FISTA(LineSearchOptimizer):
+
+    '''
+    Class represents accelerated proximal gradient method (FISTA) for minimization of f(x) + g(x) with smooth f.
+    prox(x, alpha) is the proximal operator of alpha * g, e.g. operator from liboptpy.prox or projection
+    onto the feasible set. Step size is constant 1 / L or Backtracking("Lipschitz"), which tests the prox step.
+    Momentum is restarted when the step goes against the previous one (restart="gradient"),
+    when f(x) + g(x) increases (restart="function", prox has to provide value(x)) or never (restart=None).
+    Solve stops when the norm of the gradient mapping (y - x_next) / alpha is less than tol
+    '''
+    _state_attrs = ("_t", "_F_prev", "_grad_map_norm", "_num_restarts")
+
+    def __init__(self, f, grad, prox, step_size, restart="gradient", **kwargs):
+        super().__init__(f, grad, step_size, **kwargs)
+        if restart not in (None, "gradient", "function"):
+            raise ValueError("Available restarts are 'gradient', 'function' and None")
+        if restart == "function" and not hasattr(prox, "value"):
+            raise ValueError("Function restart requires method value of prox")
+        self._prox = prox
+        self._restart = restart
+        self._t = 1.
+        self._num_restarts = 0
+
+    def get_num_restarts(self):
+        return self._num_restarts
+
+    def get_direction(self, x):
+        if self._num_iter == 1:
+            self._t = 1.
+            self._F_prev = None
+            self._grad_map_norm = np.inf
+            self._num_restarts = 0
+        self._current_grad = self._grad(x)
+        return -self._current_grad
+
+    def _f_update_x_next(self, x, alpha, h, out=None):
+        return self._prox(x + alpha * h, alpha)
+
+    def check_convergence(self, tol):
+        return self._grad_map_norm < tol
+
+    def get_stepsize(self):
+        return self._step_size.get_stepsize(self._h, self._x_current, self._num_iter)
+
+    def _update_x_current(self):
+        # Current point is the extrapolated one, the last iterate is kept in self._x_mem
+        y = self._x_current
+        x = self._x_next
+        x_prev = self._x_mem[-1]
+        self._grad_map_norm = np.linalg.norm(y - x) / self._alpha
+        restart = False
+        if self._restart == "gradient":
+            restart = (y - x).dot(x - x_prev) > 0
+        elif self._restart == "function":
+            F = self._f(x) + self._prox.value(x)
+            restart = self._F_prev is not None and F > self._F_prev
+            self._F_prev = F
+        if restart:
+            self._t = 1.
+            self._num_restarts += 1
+            self._x_current = x
+            return
+        # Python floats keep the type of iterates
+        t_next = (1 + (1 + 4 * self._t**2) ** 0.5) / 2.
+        self._x_current = x + (self._t - 1) / t_next * (x - x_prev)
+        self._t = t_next
+
+    def _get_result_x(self):
+        return self._x_mem[-1]
+
+    def _print_info(self):
+        print("Norm of gradient mapping = {}".format(self._grad_map_norm))
@@ -2,33 +2,100 @@ import numpy as np
 from ..base_optimizer import LineSearchOptimizer
 
 class FrankWolfe(LineSearchOptimizer):
-    
+
     '''
-    Class represents conditional gradient descent method aka Frank Wolfe algorithm
+    Class represents conditional gradient descent method aka Frank Wolfe algorithm.
+    linsolver(g) returns vertex s of the feasible set minimizing g^T s, e.g. oracle from liboptpy.lmo.
+    Variants "away" and "pairwise" keep the iterate as convex combination of vertices (active set)
+    and move weight from the worst vertex, that gives linear convergence on polytopes for strongly convex f.
+    Directions are scaled so that step size 1 is the largest feasible step, larger step sizes are clipped.
+    Solve stops when the Frank-Wolfe gap g^T (x - s), the upper bound of f(x) - f*, is less than tol
     '''
-    
-    def __init__(self, f, grad, linsolver, step_size):
-        super().__init__(f, grad, step_size)
+    _state_attrs = ("_gap", "_atoms", "_weights")
+
+    def __init__(self, f, grad, linsolver, step_size, variant="standard", **kwargs):
+        super().__init__(f, grad, step_size, **kwargs)
+        if variant not in ("standard", "away", "pairwise"):
+            raise ValueError("Available variants are 'standard', 'away' and 'pairwise'")
         self._linsolver = linsolver
+        self._variant = variant
         self._h = None
-        
+        self._atoms = None
+        self._weights = None
+
+    def get_gap(self):
+        return self._gap
+
+    def get_active_set(self):
+        '''
+        Vertices as rows and their weights in the current iterate, None for the standard variant
+        '''
+        return self._atoms, self._weights
+
     def get_direction(self, x):
-        s = self._linsolver(self._grad(x))
+        if self._num_iter == 1 and self._variant != "standard":
+            # Initial point is the first atom
+            self._atoms = x[np.newaxis].copy()
+            self._weights = np.ones(1)
         self._current_grad = self._grad(x)
-        self._h = s - x
+        g = self._current_grad
+        self._s = self._linsolver(g)
+        self._gap = self._dot(g, x - self._s)
+        self._h = self._s - x
+        self._step = "fw"
+        self._max_step = 1.
+        if self._variant != "standard":
+            scores = self._atoms.dot(g)
+            self._away = np.argmax(scores)
+            v = self._atoms[self._away]
+            w = self._weights[self._away]
+            if self._variant == "pairwise":
+                self._h = self._s - v
+                self._step = "pairwise"
+                self._max_step = w
+            elif scores[self._away] - g.dot(x) > self._gap:
+                self._h = x - v
+                self._step = "away"
+                self._max_step = w / (1 - w)
+            self._h = self._h * self._max_step
         return self._h
-    
+
     def check_convergence(self, tol):
-        if len(self.convergence) == 1:
-            return False
-        if self._f(self.convergence[-2]) - self._f(self.convergence[-1]) < tol:
-            return True
-        else:
-            return False
-        
+        return self._gap < tol
+
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
-    
+        return min(self._step_size.get_stepsize(self._h, self._x_current, self._num_iter), 1.)
+
+    def _update_x_current(self):
+        super()._update_x_current()
+        if self._variant != "standard":
+            self._update_active_set()
+
+    def _update_active_set(self):
+        gamma = self._alpha * self._max_step
+        if self._step == "away":
+            self._weights *= 1 + gamma
+            self._weights[self._away] -= gamma
+        else:
+            if self._step == "fw":
+                self._weights *= 1 - gamma
+            else:
+                self._weights[self._away] -= gamma
+            found = np.nonzero(np.all(self._atoms == self._s, axis=1))[0]
+            if found.size > 0:
+                self._weights[found[0]] += gamma
+            else:
+                self._atoms = np.vstack([self._atoms, self._s])
+                self._weights = np.append(self._weights, gamma)
+        if self._step != "fw" and self._alpha >= 1:
+            # Drop step, the whole weight of the away vertex is moved
+            self._weights[self._away] = 0
+        keep = self._weights > 0
+        if not np.all(keep):
+            self._atoms = self._atoms[keep]
+            self._weights = self._weights[keep]
+
     def _print_info(self):
-        print("Difference in function values = {}".format(self._f(self.convergence[-2]) - self._f(self.convergence[-1])))
-        print("Difference in argument = {}".format(np.linalg.norm(self.convergence[-1] - self.convergence[-2])))
+        print("Frank-Wolfe gap = {}".format(self._gap))
+        if self._atoms is not None:
+            print("Number of active vertices = {}".format(self._atoms.shape[0]))
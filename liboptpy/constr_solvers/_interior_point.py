@@ -0,0 +1,205 @@
+import numpy as np
+import scipy.sparse as sp
+from ..unconstr_solvers.so import NewtonMethod
+from .. import step_size as _ss
+from .. import kkt as _kkt
+
+def _weighted_gram(J, d):
+    # J^T diag(d) J for dense or sparse Jacobian J
+    if sp.issparse(J):
+        return J.T.dot(sp.diags(d).dot(J))
+    return (J.T * d).dot(J)
+
+def _add(H, B):
+    # Sum is sparse only if both terms are sparse
+    if B is None:
+        return H
+    if sp.issparse(H) and sp.issparse(B):
+        return H + B
+    return (H.toarray() if sp.issparse(H) else H) + (B.toarray() if sp.issparse(B) else B)
+
+class BarrierMethod(NewtonMethod):
+    '''
+    Class represents log-barrier method for min f(x) s.t. c(x) <= 0, A x = b with inequalities given by
+    liboptpy.constraints, x0 has to satisfy inequalities strictly and equalities. Centering problems
+    min t f(x) - sum_i log(-c_i(x)) s.t. A x = b are solved by Newton method with KKT systems, t is multiplied by mu
+    when half of the squared Newton decrement is less than inner_tol and solve stops when the duality gap m / t is less than tol.
+    Solver works with the objective divided by t, so rounding errors of the line search do not grow with t.
+    Default step size rule is FractionToBoundary with Armijo backtracking, so the barrier is never evaluated outside the domain.
+    If the Newton decrement is less than 1/4, full Newton steps are taken, since they are in the domain and converge quadratically
+    '''
+    _state_attrs = ("_t", "_nu")
+
+    def __init__(self, f, grad, hess, ineq, A=None, b=None, step_size=None, t0=1., mu=10., inner_tol=1e-8,
+                 kkt_solver=None, **kwargs):
+        is_feasible = lambda x: np.all(ineq(x) < 0)
+        if step_size is None:
+            step_size = _ss.FractionToBoundary(ineq.max_step, is_feasible=is_feasible)
+        self._boundary = _ss.FractionToBoundary(ineq.max_step, is_feasible=is_feasible)
+        self._obj_f = f
+        self._obj_grad = grad
+        self._ineq = ineq
+        self._t0 = t0
+        self._t = t0
+        super().__init__(self._barrier_f, self._barrier_grad, hess, step_size, **kwargs)
+        self._A = A
+        self._b = b
+        self._mu = mu
+        self._inner_tol = inner_tol
+        self._kkt = _kkt.KKTSolver() if kkt_solver is None else kkt_solver
+        self._nu = None
+
+    def get_kkt_solver(self):
+        return self._kkt
+
+    def get_dual(self):
+        '''
+        Dual variables of inequalities 1 / (-t c(x)) and of equalities
+        '''
+        return -1. / (self._t * self._ineq(self._x_current)), self._nu
+
+    def get_gap(self):
+        return self._num_ineq / self._t
+
+    def _barrier_f(self, x):
+        c = self._ineq(x)
+        if np.any(c >= 0):
+            return np.inf
+        return self._obj_f(x) - np.sum(np.log(-c)) / self._t
+
+    def _barrier_grad(self, x):
+        return self._obj_grad(x) + self._ineq.jac(x).T.dot(-1. / (self._t * self._ineq(x)))
+
+    def get_direction(self, x):
+        c = self._ineq(x)
+        if self._num_iter == 1:
+            if np.any(c >= 0):
+                raise ValueError("Initial point has to satisfy inequality constraints strictly!")
+            if self._A is not None and not np.allclose(self._A.dot(x), self._b):
+                raise ValueError("Initial point has to satisfy equality constraints!")
+            self._t = self._t0
+            self._num_ineq = c.shape[0]
+        self._current_grad = self._grad(x)
+        H = _add(_add(self._hess(x), _weighted_gram(self._ineq.jac(x), 1. / (self._t * c**2))),
+                 self._ineq.hess(x, -1. / (self._t * c)))
+        # Right-hand side of equalities removes rounding errors accumulated in A x
+        r2 = None if self._A is None else self._b - self._A.dot(x)
+        h, self._nu = self._kkt.solve(H, self._A, -self._current_grad, r2)
+        # Decrement of t f(x) - sum_i log(-c_i(x))
+        self._decrement = self._t * h.dot(H.dot(h))
+        return h
+
+    def check_convergence(self, tol):
+        # Outer iteration: the centering problem is solved, so t increases and the direction is recomputed
+        while self._decrement / 2 <= self._inner_tol:
+            if self._num_ineq / self._t < tol:
+                return True
+            self._t *= self._mu
+            self._oracle.clear()
+            self._h = self._cast(self.get_direction(self._x_current))
+            self._grad_mem[-1] = self._current_grad
+        return False
+
+    def get_stepsize(self):
+        # Sufficient decrease near the center is below rounding errors of f, so backtracking is not used there
+        if self._decrement < 0.0625:
+            return self._boundary.get_boundary_step(self._h, self._x_current)
+        return super().get_stepsize()
+
+    def _print_info(self):
+        print("Duality gap = {}, t = {}".format(self._num_ineq / self._t, self._t))
+
+class PrimalDualInteriorPoint(NewtonMethod):
+    '''
+    Class represents primal-dual interior-point method for min f(x) s.t. c(x) <= 0, A x = b with inequalities given by
+    liboptpy.constraints, x0 has to satisfy inequalities strictly, equalities may be violated. Newton steps for the modified
+    KKT conditions with t = mu m / eta, where eta = -c^T lam is the surrogate duality gap, are found from the reduced KKT system
+    with matrix hess f + sum_i lam_i hess c_i + J^T diag(lam / -c) J. Step size is the fraction tau of the largest step
+    keeping lam positive and x strictly feasible, it is multiplied by rho until the norm of residual decreases by the factor
+    1 - beta * alpha. Solve stops when eta is less than tol and the norms of primal and dual residuals are less than feas_tol
+    '''
+    _state_attrs = ("_lam", "_nu")
+
+    def __init__(self, f, grad, hess, ineq, A=None, b=None, mu=10., tau=0.99, beta=0.01, rho=0.5, feas_tol=1e-8,
+                 kkt_solver=None, **kwargs):
+        super().__init__(f, grad, hess, None, **kwargs)
+        self._ineq = ineq
+        self._A = A
+        self._b = b
+        self._mu = mu
+        self._tau = tau
+        self._beta = beta
+        self._rho = rho
+        self._feas_tol = feas_tol
+        self._boundary = _ss.FractionToBoundary(ineq.max_step, tau=tau, is_feasible=lambda x: np.all(ineq(x) < 0))
+        self._kkt = _kkt.KKTSolver() if kkt_solver is None else kkt_solver
+        self._lam = None
+        self._nu = None
+
+    def get_kkt_solver(self):
+        return self._kkt
+
+    def get_dual(self):
+        return self._lam, self._nu
+
+    def get_gap(self):
+        return self._eta
+
+    def _residuals(self, x, lam, nu, t):
+        c = self._ineq(x)
+        J = self._ineq.jac(x)
+        r_dual = self._grad(x) + J.T.dot(lam)
+        r_pri = np.zeros(0)
+        if self._A is not None:
+            r_dual = r_dual + self._A.T.dot(nu)
+            r_pri = self._A.dot(x) - self._b
+        return r_dual, -lam * c - 1. / t, r_pri, c, J
+
+    def get_direction(self, x):
+        if self._num_iter == 1:
+            c = self._ineq(x)
+            if np.any(c >= 0):
+                raise ValueError("Initial point has to satisfy inequality constraints strictly!")
+            self._lam = -1. / c
+            self._nu = None if self._A is None else np.zeros(self._A.shape[0])
+        self._eta = -self._ineq(x).dot(self._lam)
+        self._t = self._mu * self._lam.shape[0] / self._eta
+        r_dual, r_cent, r_pri, c, J = self._residuals(x, self._lam, self._nu, self._t)
+        self._res = (r_dual, r_cent, r_pri)
+        self._current_grad = r_dual
+        H = _add(_add(self._hess(x), self._ineq.hess(x, self._lam)), _weighted_gram(J, self._lam / -c))
+        dx, self._dnu = self._kkt.solve(H, self._A, -r_dual - J.T.dot(r_cent / c),
+                                        None if self._A is None else -r_pri)
+        self._dlam = (r_cent - self._lam * J.dot(dx)) / c
+        return dx
+
+    def check_convergence(self, tol):
+        r_dual, _, r_pri = self._res
+        return (self._eta < tol and np.linalg.norm(r_dual) <= self._feas_tol
+                and np.linalg.norm(r_pri) <= self._feas_tol)
+
+    def get_stepsize(self):
+        x = self._x_current
+        neg = self._dlam < 0
+        alpha = 1. if not np.any(neg) else min(1., self._tau * np.min(-self._lam[neg] / self._dlam[neg]))
+        alpha = min(alpha, self._boundary.get_boundary_step(self._h, x))
+        res_norm = np.sqrt(sum(r.dot(r) for r in self._res))
+        while True:
+            nu = None if self._nu is None else self._nu + alpha * self._dnu
+            res = self._residuals(x + alpha * self._h, self._lam + alpha * self._dlam, nu, self._t)[:3]
+            if np.sqrt(sum(r.dot(r) for r in res)) <= (1 - self._beta * alpha) * res_norm:
+                return alpha
+            alpha *= self._rho
+            if alpha < 1e-16:
+                raise ValueError("Step size is too small!")
+
+    def _update_x_current(self):
+        self._x_current = self._x_next
+        self._lam = self._lam + self._alpha * self._dlam
+        if self._nu is not None:
+            self._nu = self._nu + self._alpha * self._dnu
+
+    def _print_info(self):
+        r_dual, _, r_pri = self._res
+        print("Surrogate gap = {}, dual residual = {}, primal residual = {}".format(
+            self._eta, np.linalg.norm(r_dual), np.linalg.norm(r_pri)))
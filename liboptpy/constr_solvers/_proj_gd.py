@@ -1,14 +1,19 @@
 import numpy as np
+from collections import deque
 from ..base_optimizer import LineSearchOptimizer
+from .. import jit as _jit
 
 class ProjectedGD(LineSearchOptimizer):
     
     '''
     Class represents projected gradient method
     '''
+    _state_attrs = ("_f_mem",)
+    _jit_support = True
     
-    def __init__(self, f, grad, projector, step_size):
-        super().__init__(f, grad, step_size)
+    def __init__(self, f, grad, projector, step_size, **kwargs):
+        super().__init__(f, grad, step_size, **kwargs)
+        self._f_mem = deque(maxlen=2)
         self._projector = projector
         
     def get_direction(self, x):
@@ -19,16 +24,28 @@ class ProjectedGD(LineSearchOptimizer):
         return self._projector(x + alpha * h)
     
     def check_convergence(self, tol):
-        if len(self.convergence) == 1:
+        if self._num_iter == 1:
+            self._f_mem.clear()
+        self._f_mem.append(self._f(self._x_mem[-1]))
+        if len(self._f_mem) == 1:
             return False
-        if self._f(self.convergence[-2]) - self._f(self.convergence[-1]) < tol:
+        if self._f_mem[-2] - self._f_mem[-1] < tol:
             return True
         else:
             return False
         
     def get_stepsize(self):
-        return self._step_size.get_stepsize(-self._grad_mem[-1], self.convergence[-1], len(self.convergence))
+        return self._step_size.get_stepsize(-self._grad_mem[-1], self._x_mem[-1], self._num_iter)
     
     def _print_info(self):
-        print("Difference in function values = {}".format(self._f(self.convergence[-2]) - self._f(self.convergence[-1])))
-        print("Difference in argument = {}".format(np.linalg.norm(self.convergence[-1] - self.convergence[-2])))
+        print("Difference in function values = {}".format(self._f_mem[-2] - self._f_mem[-1]))
+        print("Difference in argument = {}".format(np.linalg.norm(self._x_mem[-1] - self._x_mem[-2])))
+    
+    def _jit_functions(self):
+        return super()._jit_functions() + [self._projector]
+    
+    def _solve_jit(self, max_iter, tol):
+        rule, alpha, rho, beta = self._jit_params()
+        return self._finish_jit(*_jit.pgd_loop(self._oracle._f_fun, self._oracle._grad_fun, self._projector, 
+                                               self._x_current, max_iter, tol, rule, alpha, rho, beta, 
+                                               self._jit_store()))
@@ -0,0 +1,62 @@
+import numpy as np
+import scipy.sparse as sp
+
+__all__ = ["Inequalities", "LinearInequalities", "Bounds"]
+
+class Inequalities(object):
+    '''
+    Inequality constraints c(x) <= 0 given by fun(x) -> c(x), jac(x) -> Jacobian of c (dense or sparse matrix)
+    and hess(x, w) -> sum_i w_i hess c_i(x), hess is None for affine constraints.
+    max_step(x, d) is the largest step alpha such that x + alpha d is feasible, it is infinity if the ray is feasible
+    and None if it is unknown
+    '''
+    def __init__(self, fun, jac, hess=None):
+        self._fun = fun
+        self._jac = jac
+        self._hess = hess
+
+    def __call__(self, x):
+        return self._fun(x)
+
+    def jac(self, x):
+        return self._jac(x)
+
+    def hess(self, x, w):
+        if self._hess is None:
+            return None
+        return self._hess(x, w)
+
+    def max_step(self, x, d):
+        return None
+
+class LinearInequalities(Inequalities):
+    '''
+    Constraints G x <= h with dense or sparse G, the largest feasible step is computed exactly
+    '''
+    def __init__(self, G, h):
+        self.G = G
+        self.h = h
+        super().__init__(lambda x: self.G.dot(x) - self.h, lambda x: self.G)
+
+    def max_step(self, x, d):
+        Gd = self.G.dot(d)
+        slack = self.h - self.G.dot(x)
+        mask = Gd > 0
+        if not np.any(mask):
+            return np.inf
+        return np.min(slack[mask] / Gd[mask])
+
+class Bounds(LinearInequalities):
+    '''
+    Constraints lb <= x <= ub, infinite bounds are skipped. Matrix of constraints is sparse
+    '''
+    def __init__(self, lb, ub, n=None):
+        if n is None:
+            n = np.broadcast(lb, ub).shape[0]
+        lb = np.broadcast_to(lb, (n,))
+        ub = np.broadcast_to(ub, (n,))
+        upper = np.flatnonzero(np.isfinite(ub))
+        lower = np.flatnonzero(np.isfinite(lb))
+        eye = sp.identity(n, format="csr")
+        super().__init__(sp.vstack([eye[upper], -eye[lower]], format="csr"),
+                         np.concatenate([ub[upper], -lb[lower]]))
@@ -0,0 +1,106 @@
+import numpy as np
+import scipy.special as spspec
+
+__all__ = ["FiniteSum", "LinearModelSum", "logistic_regression", "least_squares"]
+
+class FiniteSum(object):
+    '''
+    Objective f(x) = 1/m sum_i f_i(x) given by minibatch oracles: f_batch(x, idx) and grad_batch(x, idx)
+    are means of f_i(x) and of gradients of f_i over indices idx. Full f and grad are computed by passes
+    over chunks of chunk_size samples, so memory does not grow with the number of samples m.
+    grad_samples(x, idx) returns gradients of f_i as rows, it is used only for the gradient table of SAGA
+    and by default grad_batch is called for every index. Number of computed gradients of f_i is counted
+    '''
+    def __init__(self, f_batch, grad_batch, num_samples, grad_samples=None, chunk_size=2**16):
+        self._f_batch = f_batch
+        self._grad_batch = grad_batch
+        self._grad_samples = grad_samples
+        self.num_samples = num_samples
+        self.chunk_size = chunk_size
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.num_sample_grads = 0
+
+    def get_num_passes(self):
+        return self.num_sample_grads / self.num_samples
+
+    def chunks(self):
+        for start in range(0, self.num_samples, self.chunk_size):
+            yield np.arange(start, min(start + self.chunk_size, self.num_samples))
+
+    def f_batch(self, x, idx):
+        return self._f_batch(x, idx)
+
+    def grad_batch(self, x, idx):
+        self.num_sample_grads += len(idx)
+        return self._grad_batch(x, idx)
+
+    def grad_samples(self, x, idx):
+        if self._grad_samples is None:
+            return np.array([self.grad_batch(x, idx[i:i + 1]) for i in range(len(idx))])
+        self.num_sample_grads += len(idx)
+        return self._grad_samples(x, idx)
+
+    def f(self, x):
+        return sum(len(idx) * self.f_batch(x, idx) for idx in self.chunks()) / self.num_samples
+
+    def grad(self, x):
+        return sum(len(idx) * self.grad_batch(x, idx) for idx in self.chunks()) / self.num_samples
+
+class LinearModelSum(FiniteSum):
+    '''
+    Finite sum of linear models f_i(x) = loss(a_i^T x, b_i) + lam ||x||^2 / 2, where a_i are rows
+    of dense or sparse matrix A. Gradient of f_i is dloss(a_i^T x, b_i) a_i + lam x, so the sample part
+    is given by the scalar coefficient and stochastic methods keep m scalars instead of m gradients
+    '''
+    def __init__(self, A, b, loss, dloss, lam=0., chunk_size=2**16):
+        super().__init__(self._f_linear, self._grad_linear, A.shape[0], chunk_size=chunk_size)
+        self.A = A
+        self.b = b
+        self.lam = lam
+        self._loss = loss
+        self._dloss = dloss
+
+    def _f_linear(self, x, idx):
+        return np.mean(self._loss(self.A[idx].dot(x), self.b[idx])) + 0.5 * self.lam * x.dot(x)
+
+    def _grad_linear(self, x, idx):
+        return self.grad_from_coef(idx, self._dloss(self.A[idx].dot(x), self.b[idx])) + self.lam * x
+
+    def coef(self, x, idx):
+        '''
+        Derivatives of loss in a_i^T x for indices idx
+        '''
+        self.num_sample_grads += len(idx)
+        return self._dloss(self.A[idx].dot(x), self.b[idx])
+
+    def grad_from_coef(self, idx, c):
+        '''
+        Sample part of the mean gradient over idx with coefficients c, i.e. without regularization
+        '''
+        return self.A[idx].T.dot(c) / len(idx)
+
+    def full_coef(self, x, dtype=None):
+        '''
+        Coefficients of all samples and full gradient in one pass
+        '''
+        c = np.empty(self.num_samples, dtype=np.result_type(x) if dtype is None else dtype)
+        g = self.lam * x
+        for idx in self.chunks():
+            c[idx] = self.coef(x, idx)
+            g = g + len(idx) * self.grad_from_coef(idx, c[idx]) / self.num_samples
+        return c, g
+
+def logistic_regression(A, y, lam=0., chunk_size=2**16):
+    '''
+    Logistic loss log(1 + exp(-y_i a_i^T x)) with labels y_i in {-1, 1}
+    '''
+    return LinearModelSum(A, y, lambda z, y: np.logaddexp(0, -y * z), lambda z, y: -y * spspec.expit(-y * z),
+                          lam, chunk_size)
+
+def least_squares(A, b, lam=0., chunk_size=2**16):
+    '''
+    Squared loss (a_i^T x - b_i)^2 / 2
+    '''
+    return LinearModelSum(A, b, lambda z, b: 0.5 * (z - b)**2, lambda z, b: z - b, lam, chunk_size)
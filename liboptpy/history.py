@@ -0,0 +1,191 @@
+import io
+import numpy as np
+from collections import deque
+
+__all__ = ["FullHistory", "NoHistory", "LastIterates", "SubsampledIterates",
+           "ScalarTrace", "CallbackHistory", "MemmapHistory"]
+
+class History(object):
+    '''
+    Base class for policies defining what is kept in the convergence history of a solver
+    '''
+    def __init__(self):
+        self.copy = False
+
+    def reset(self, x0, max_iter, optimizer):
+        pass
+
+    def append(self, x, optimizer):
+        pass
+
+    def finalize(self):
+        pass
+
+    def get(self):
+        return []
+
+    def _store(self, x):
+        # Optimizers working with reusable buffers set copy to True
+        if self.copy:
+            return x.copy()
+        return x
+
+class FullHistory(History):
+    '''
+    Class keeps every iterate in memory
+    '''
+    def __init__(self):
+        super().__init__()
+        self._hist = []
+
+    def reset(self, x0, max_iter, optimizer):
+        self._hist = [self._store(x0)]
+
+    def append(self, x, optimizer):
+        self._hist.append(self._store(x))
+
+    def get(self):
+        return self._hist
+
+class NoHistory(History):
+    '''
+    Class keeps nothing
+    '''
+    pass
+
+class LastIterates(History):
+    '''
+    Class keeps the last k iterates in a ring buffer
+    '''
+    def __init__(self, k):
+        super().__init__()
+        self._k = k
+        self._hist = deque(maxlen=k)
+
+    def reset(self, x0, max_iter, optimizer):
+        self._hist = deque([self._store(x0)], maxlen=self._k)
+
+    def append(self, x, optimizer):
+        self._hist.append(self._store(x))
+
+    def get(self):
+        return list(self._hist)
+
+class SubsampledIterates(History):
+    '''
+    Class keeps the initial point and every n-th iterate
+    '''
+    def __init__(self, every):
+        super().__init__()
+        self._every = every
+        self._hist = []
+        self._idx = []
+
+    def reset(self, x0, max_iter, optimizer):
+        self._hist = [self._store(x0)]
+        self._idx = [0]
+        self._num_iter = 0
+
+    def append(self, x, optimizer):
+        self._num_iter += 1
+        if self._num_iter % self._every == 0:
+            self._hist.append(self._store(x))
+            self._idx.append(self._num_iter)
+
+    def get(self):
+        return self._hist
+
+    def get_indices(self):
+        return self._idx
+
+class ScalarTrace(History):
+    '''
+    Class keeps only scalar traces: function value in every iterate and
+    norm of gradient in the previous iterate and step size used to get this iterate from the previous one
+    '''
+    def __init__(self, f=True):
+        super().__init__()
+        self._record_f = f
+        self._f_val = []
+        self._grad_norm = []
+        self._alpha = []
+
+    def reset(self, x0, max_iter, optimizer):
+        self._f_val = []
+        self._grad_norm = []
+        self._alpha = []
+        if self._record_f:
+            self._f_val.append(optimizer._f(x0))
+
+    def append(self, x, optimizer):
+        if self._record_f:
+            self._f_val.append(optimizer._f(x))
+        # Gradient in the previous iterate is stored by the optimizer before the iterate is updated
+        self._grad_norm.append(np.linalg.norm(optimizer._grad_mem[-1]))
+        self._alpha.append(optimizer._alpha)
+
+    def get(self):
+        return {"f": np.array(self._f_val),
+                "grad_norm": np.array(self._grad_norm),
+                "alpha": np.array(self._alpha)}
+
+class CallbackHistory(History):
+    '''
+    Class streams every iterate to callback(x, num_iter) and keeps nothing
+    '''
+    def __init__(self, callback):
+        super().__init__()
+        self._callback = callback
+
+    def reset(self, x0, max_iter, optimizer):
+        self._num_iter = 0
+        self._callback(x0, self._num_iter)
+
+    def append(self, x, optimizer):
+        self._num_iter += 1
+        self._callback(x, self._num_iter)
+
+class MemmapHistory(History):
+    '''
+    Class streams iterates to the memory-mapped .npy file on disk.
+    The file is preallocated for max_iter iterates and truncated to the stored ones after solve
+    '''
+    def __init__(self, filename, every=1):
+        super().__init__()
+        self._filename = filename
+        self._every = every
+        self._hist = []
+
+    def reset(self, x0, max_iter, optimizer):
+        num_rows = max_iter // self._every + 1
+        self._hist = np.lib.format.open_memmap(self._filename, mode="w+", dtype=x0.dtype,
+                                               shape=(num_rows,) + x0.shape)
+        self._hist[0] = x0
+        self._num_rows = 1
+        self._num_iter = 0
+
+    def append(self, x, optimizer):
+        self._num_iter += 1
+        if self._num_iter % self._every == 0:
+            self._hist[self._num_rows] = x
+            self._num_rows += 1
+
+    def finalize(self):
+        self._hist.flush()
+        shape = (self._num_rows,) + self._hist.shape[1:]
+        dtype = self._hist.dtype
+        offset = self._hist.offset
+        del self._hist
+        header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape}
+        # Header of .npy file reserves space for the growth of the first dimension, so it is rewritten in place
+        buf = io.BytesIO()
+        np.lib.format.write_array_header_1_0(buf, header)
+        if buf.tell() != offset:
+            raise RuntimeError("Header of {} can not be rewritten in place".format(self._filename))
+        with open(self._filename, "r+b") as fp:
+            fp.write(buf.getvalue())
+            fp.truncate(offset + int(np.prod(shape)) * dtype.itemsize)
+        self._hist = np.load(self._filename, mmap_mode="r")
+
+    def get(self):
+        return self._hist
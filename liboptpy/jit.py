@@ -0,0 +1,287 @@
+'''
+Compiled iteration loops of first-order methods. If numba is installed and f, grad (and projector)
+given to GradientDescent, AcceleratedGD, BarzilaiBorweinMethod, LBFGS or ProjectedGD are numba-jitted functions,
+the whole solve with constant step size or Armijo rule runs in the compiled loop,
+otherwise solvers use the common Python loop. Without numba the loops below are plain Python functions
+'''
+import numpy as np
+from . import history as _history
+from . import step_size as _ss
+
+try:
+    import numba
+    from numba.extending import is_jitted
+except ImportError:
+    numba = None
+
+    def is_jitted(fun):
+        return False
+
+__all__ = ["available", "is_jitted", "step_size_params"]
+
+available = numba is not None
+
+def _njit(fun):
+    if numba is None:
+        return fun
+    return numba.njit(fun)
+
+CONSTANT = 0
+ARMIJO = 1
+
+def step_size_params(step_size):
+    '''
+    Tuple (rule, alpha, rho, beta) describing step size for the compiled loops or None if it is not supported
+    '''
+    if type(step_size) is _ss.ConstantStepSize and np.ndim(step_size.stepsize) == 0:
+        return CONSTANT, float(step_size.stepsize), 0., 0.
+    if (type(step_size) is _ss.Backtracking and step_size.rule == "Armijo" and step_size.par["parallel"] == 1
+        and step_size.par["f_vectorized"] is None):
+        return ARMIJO, float(step_size.par["init_alpha"]), float(step_size.par["rho"]), float(step_size.par["beta"])
+    return None
+
+def can_run(optimizer, x0, disp, functions):
+    '''
+    Check that solve of optimizer can run in the compiled loop, i.e. numba is available,
+    functions are jitted and the loop does not need callbacks, checkpoints, precision policy, verbose output
+    or special history policies
+    '''
+    return (available and x0.ndim == 1 and not disp and not optimizer._in_place and not optimizer._callbacks
+            and optimizer._checkpoint is None and optimizer._dtype is None and optimizer._acc_dtype is None
+            and type(optimizer._history) in (_history.FullHistory, _history.NoHistory)
+            and all(fun is not None and is_jitted(fun) for fun in functions))
+
+@_njit
+def _armijo(f, x, h, g, f_x, alpha, rho, beta):
+    # Same acceptance test as Backtracking("Armijo"), returns step size, function value in the new point
+    # and number of function evaluations
+    num_evals = 0
+    while True:
+        x_next = x + alpha * h
+        f_next = f(x_next)
+        num_evals += 1
+        if np.isnan(f_next) or f_next >= f_x + beta * g.dot(x_next - x):
+            alpha *= rho
+        else:
+            return alpha, f_next, num_evals
+        if alpha < 1e-16:
+            raise ValueError("Step size is too small!")
+
+@_njit
+def _armijo_projected(f, projector, x, h, g, f_x, alpha, rho, beta):
+    num_evals = 0
+    while True:
+        x_next = projector(x + alpha * h)
+        f_next = f(x_next)
+        num_evals += 1
+        if np.isnan(f_next) or f_next >= f_x + beta * g.dot(x_next - x):
+            alpha *= rho
+        else:
+            return alpha, f_next, num_evals
+        if alpha < 1e-16:
+            raise ValueError("Step size is too small!")
+
+@_njit
+def gd_loop(f, grad, x0, max_iter, tol, rule, alpha0, rho, beta, store):
+    x = x0.copy()
+    hist = np.empty((max_iter + 1 if store else 1, x0.shape[0]), dtype=x0.dtype)
+    hist[0] = x0
+    num_f = 0
+    num_grad = 0
+    # Function value in the current point, after the first iteration it is known from the Armijo rule
+    f_x = np.nan
+    num_iter = 0
+    while True:
+        g = grad(x)
+        num_grad += 1
+        if np.linalg.norm(g) < tol:
+            break
+        h = -g
+        alpha = alpha0
+        if rule == ARMIJO:
+            if np.isnan(f_x):
+                f_x = f(x)
+                num_f += 1
+            alpha, f_x, num_evals = _armijo(f, x, h, g, f_x, alpha0, rho, beta)
+            num_f += num_evals
+        x = x + alpha * h
+        num_iter += 1
+        if store:
+            hist[num_iter] = x
+        if num_iter >= max_iter:
+            break
+    return x, num_iter, hist, num_f, num_grad
+
+@_njit
+def agd_loop(f, grad, x0, max_iter, tol, rule, alpha0, rho, beta, store, lam0, lam1):
+    # y is the extrapolated point where gradient is taken, x is the last iterate
+    y = x0.copy()
+    x = x0.copy()
+    hist = np.empty((max_iter + 1 if store else 1, x0.shape[0]), dtype=x0.dtype)
+    hist[0] = x0
+    num_f = 0
+    num_grad = 0
+    num_iter = 0
+    while True:
+        g = grad(y)
+        num_grad += 1
+        if np.linalg.norm(g) < tol:
+            break
+        h = -g
+        alpha = alpha0
+        if rule == ARMIJO:
+            # As AcceleratedGD.get_stepsize, step size is searched from the last iterate
+            f_x = f(x)
+            g_x = grad(x)
+            alpha, _, num_evals = _armijo(f, x, h, g_x, f_x, alpha0, rho, beta)
+            num_f += num_evals + 1
+            num_grad += 1
+        x_next = y + alpha * h
+        momentum = (lam0 - 1) / lam1
+        t = lam0
+        lam0 = lam1
+        lam1 = (1 + np.sqrt(1 + 4 * t**2)) / 2.
+        y = (x_next - x) * momentum + x_next
+        x = x_next
+        num_iter += 1
+        if store:
+            hist[num_iter] = x
+        if num_iter >= max_iter:
+            break
+    return y, num_iter, hist, num_f, num_grad, lam0, lam1
+
+@_njit
+def bb_loop(f, grad, x0, max_iter, tol, alpha0, bb_type, store):
+    x = x0.copy()
+    x_prev = x0.copy()
+    g_prev = np.zeros_like(x0)
+    hist = np.empty((max_iter + 1 if store else 1, x0.shape[0]), dtype=x0.dtype)
+    hist[0] = x0
+    num_grad = 0
+    num_iter = 0
+    while True:
+        g = grad(x)
+        num_grad += 1
+        if np.linalg.norm(g) < tol:
+            break
+        if num_iter == 0:
+            alpha = alpha0
+        else:
+            y = g - g_prev
+            s = x - x_prev
+            if bb_type == 1:
+                alpha = y.dot(s) / y.dot(y)
+            else:
+                alpha = s.dot(s) / y.dot(s)
+        x_prev = x
+        g_prev = g
+        x = x + alpha * -g
+        num_iter += 1
+        if store:
+            hist[num_iter] = x
+        if num_iter >= max_iter:
+            break
+    return x, num_iter, hist, 0, num_grad
+
+@_njit
+def lbfgs_loop(f, grad, x0, max_iter, tol, rule, alpha0, rho, beta, store, hist_size, H0):
+    # H0 is nan if initial approximation is taken from the first pair
+    n = x0.shape[0]
+    m = hist_size
+    S = np.empty((m, n), dtype=x0.dtype)
+    Y = np.empty((m, n), dtype=x0.dtype)
+    rho_hist = np.empty(m, dtype=x0.dtype)
+    alpha_hist = np.empty(m, dtype=x0.dtype)
+    hist_start = 0
+    hist_len = 0
+    H = H0
+    x = x0.copy()
+    hist = np.empty((max_iter + 1 if store else 1, n), dtype=x0.dtype)
+    hist[0] = x0
+    g = grad(x)
+    num_grad = 1
+    num_f = 0
+    f_x = np.nan
+    num_iter = 0
+    while True:
+        if np.isnan(H):
+            h = -g
+        else:
+            q = g.copy()
+            for j in range(hist_len - 1, -1, -1):
+                i = (hist_start + j) % m
+                alpha_hist[i] = S[i].dot(q) * rho_hist[i]
+                q -= Y[i] * alpha_hist[i]
+            q *= H
+            for j in range(hist_len):
+                i = (hist_start + j) % m
+                b = rho_hist[i] * Y[i].dot(q)
+                q += S[i] * (alpha_hist[i] - b)
+            h = -q
+        if np.linalg.norm(g) < tol:
+            break
+        alpha = alpha0
+        if rule == ARMIJO:
+            if np.isnan(f_x):
+                f_x = f(x)
+                num_f += 1
+            alpha, f_x, num_evals = _armijo(f, x, h, g, f_x, alpha0, rho, beta)
+            num_f += num_evals
+        x_next = x + alpha * h
+        g_next = grad(x_next)
+        num_grad += 1
+        slot = (hist_start + hist_len) % m
+        if hist_len == m:
+            hist_start = (hist_start + 1) % m
+        else:
+            hist_len += 1
+        S[slot] = x_next - x
+        Y[slot] = g_next - g
+        ys = Y[slot].dot(S[slot])
+        rho_hist[slot] = 1. / ys
+        if np.isnan(H) or m <= num_iter:
+            H = ys / Y[slot].dot(Y[slot])
+        x = x_next
+        g = g_next
+        num_iter += 1
+        if store:
+            hist[num_iter] = x
+        if num_iter >= max_iter:
+            break
+    return x, num_iter, hist, num_f, num_grad
+
+@_njit
+def pgd_loop(f, grad, projector, x0, max_iter, tol, rule, alpha0, rho, beta, store):
+    x = x0.copy()
+    hist = np.empty((max_iter + 1 if store else 1, x0.shape[0]), dtype=x0.dtype)
+    hist[0] = x0
+    num_f = 0
+    num_grad = 0
+    f_x = np.nan
+    f_prev = np.nan
+    num_iter = 0
+    while True:
+        g = grad(x)
+        num_grad += 1
+        if np.isnan(f_x):
+            f_x = f(x)
+            num_f += 1
+        # Stopping rule of ProjectedGD is the decrease of function value
+        if num_iter > 0 and f_prev - f_x < tol:
+            break
+        f_prev = f_x
+        h = -g
+        alpha = alpha0
+        if rule == ARMIJO:
+            alpha, f_next, num_evals = _armijo_projected(f, projector, x, h, g, f_x, alpha0, rho, beta)
+            num_f += num_evals
+        else:
+            f_next = np.nan
+        x = projector(x + alpha * h)
+        f_x = f_next
+        num_iter += 1
+        if store:
+            hist[num_iter] = x
+        if num_iter >= max_iter:
+            break
+    return x, num_iter, hist, num_f, num_grad
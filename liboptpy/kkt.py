@@ -0,0 +1,124 @@
+import numpy as np
+import scipy.linalg as sla
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+try:
+    from sksparse.cholmod import analyze as _analyze
+except ImportError:
+    _analyze = None
+
+__all__ = ["KKTSolver"]
+
+class KKTSolver(object):
+    '''
+    Solver of KKT systems [H A^T; A 0] [dx; dy] = [r1; r2] of Newton steps for constrained problems,
+    A is None without equality constraints. Dense systems are solved by Cholesky factorization of H if there is no A
+    and by LU factorization otherwise. Sparse systems are factorized by SuperLU: sparsity pattern of KKT matrix is the same
+    in all iterations, so fill-reducing ordering is computed in the first factorization and reused while the size
+    of the system does not change. If scikit-sparse is installed, sparse positive definite H without A is factorized
+    by CHOLMOD with symbolic analysis done once. Factorization is kept, so systems with the same matrix
+    and new right-hand sides cost two triangular solves. Numbers of computed orderings and factorizations are counted,
+    factor_nnz is the number of nonzeros in the last LU factors. Without A, positive_definite tells if the last H is positive
+    definite: sparse LU shows it by signs of pivots if they are taken from the diagonal (Sylvester's law of inertia),
+    which is always the case for diag_pivot_thresh=0 and nonzero pivots, otherwise it is False
+    '''
+    def __init__(self, diag_pivot_thresh=0.1):
+        self._diag_pivot_thresh = diag_pivot_thresh
+        self.reset()
+
+    def reset(self):
+        self._perm = None
+        self._symbolic = None
+        self._shape = None
+        self.num_orderings = 0
+        self.num_factorizations = 0
+        self.factor_nnz = None
+        self.positive_definite = None
+
+    def solve(self, H, A, r1, r2=None):
+        self.factorize(H, A)
+        return self.solve_factorized(r1, r2)
+
+    def factorize(self, H, A=None):
+        '''
+        Factorize KKT matrix, systems with it are solved by solve_factorized
+        '''
+        self._n = H.shape[0]
+        self._with_A = A is not None
+        self.num_factorizations += 1
+        self.positive_definite = None
+        if not sp.issparse(H) and not sp.issparse(A):
+            self._solve_fun = self._factorize_dense(H, A)
+            return
+        if A is None:
+            K = sp.csc_matrix(H)
+        else:
+            K = sp.bmat([[H, A.T], [A, None]], format="csc")
+        if K.shape != self._shape:
+            self._perm = None
+            self._symbolic = None
+            self._shape = K.shape
+        self._solve_fun = None
+        if A is None and _analyze is not None:
+            self._solve_fun = self._factorize_cholmod(K)
+        if self._solve_fun is None:
+            self._solve_fun = self._factorize_lu(K)
+
+    def solve_factorized(self, r1, r2=None):
+        if not self._with_A:
+            return self._solve_fun(r1), None
+        z = self._solve_fun(np.concatenate([r1, r2]))
+        return z[:self._n], z[self._n:]
+
+    def _factorize_dense(self, H, A):
+        if A is None:
+            try:
+                factor = sla.cho_factor(H)
+                self.positive_definite = True
+                return lambda r: sla.cho_solve(factor, r)
+            except np.linalg.LinAlgError:
+                self.positive_definite = False
+            K = H
+        else:
+            p = A.shape[0]
+            K = np.block([[H, A.T], [A, np.zeros((p, p))]])
+        factor = sla.lu_factor(K)
+        return lambda r: sla.lu_solve(factor, r)
+
+    def _factorize_cholmod(self, K):
+        from sksparse.cholmod import CholmodNotPositiveDefiniteError
+        if self._symbolic is None:
+            self._symbolic = _analyze(K)
+            self.num_orderings += 1
+        try:
+            self._symbolic.cholesky_inplace(K)
+        except CholmodNotPositiveDefiniteError:
+            return None
+        self.positive_definite = True
+        return self._symbolic
+
+    def _factorize_lu(self, K):
+        # Symmetric mode of SuperLU: ordering of K + K^T, pivots are taken from the diagonal if they are not too small
+        options = {"SymmetricMode": True}
+        if self._perm is None:
+            lu = spla.splu(K, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=self._diag_pivot_thresh, options=options)
+            # Column j of K is column perm_c[j] of the ordered matrix
+            self._perm = np.argsort(lu.perm_c)
+            self.num_orderings += 1
+            self.factor_nnz = lu.L.nnz + lu.U.nnz
+            self._check_inertia(lu)
+            return lu.solve
+        p = self._perm
+        lu = spla.splu(K[p][:, p], permc_spec="NATURAL", diag_pivot_thresh=self._diag_pivot_thresh, options=options)
+        self.factor_nnz = lu.L.nnz + lu.U.nnz
+        self._check_inertia(lu)
+        def solve(r):
+            z = np.empty_like(r)
+            z[p] = lu.solve(r[p])
+            return z
+        return solve
+
+    def _check_inertia(self, lu):
+        if not self._with_A:
+            self.positive_definite = bool(np.array_equal(lu.perm_r, lu.perm_c) and np.all(lu.U.diagonal() > 0))
@@ -0,0 +1,64 @@
+import numpy as np
+import scipy.sparse.linalg as spla
+
+__all__ = ["Simplex", "L1Ball", "Box", "NuclearBall"]
+
+class Simplex(object):
+    '''
+    Linear minimization oracle of the simplex {x >= 0, sum(x) = radius}: vertex radius * e_i with the smallest g_i.
+    Rows of g are treated as independent gradients
+    '''
+    def __init__(self, radius=1.):
+        self.radius = radius
+
+    def __call__(self, g):
+        s = np.zeros_like(g)
+        np.put_along_axis(s, np.expand_dims(np.argmin(g, axis=-1), -1), self.radius, axis=-1)
+        return s
+
+class L1Ball(object):
+    '''
+    Linear minimization oracle of the ball ||x||_1 <= radius: vertex -radius * sign(g_i) e_i with the largest |g_i|
+    '''
+    def __init__(self, radius=1.):
+        self.radius = radius
+
+    def __call__(self, g):
+        s = np.zeros_like(g)
+        i = np.expand_dims(np.argmax(np.abs(g), axis=-1), -1)
+        np.put_along_axis(s, i, -self.radius * np.sign(np.take_along_axis(g, i, axis=-1)), axis=-1)
+        return s
+
+class Box(object):
+    '''
+    Linear minimization oracle of the bounded box lb <= x <= ub, bounds are scalars or arrays
+    '''
+    def __init__(self, lb=0., ub=1.):
+        self.lb = lb
+        self.ub = ub
+
+    def __call__(self, g):
+        return np.where(g > 0, self.lb, self.ub).astype(g.dtype)
+
+class NuclearBall(object):
+    '''
+    Linear minimization oracle of the ball of matrices of given shape with nuclear norm at most radius,
+    matrices are flattened to vectors. The vertex is -radius * u v^T for the top singular pair of the gradient,
+    it is found by Lanczos method started from the singular vector of the previous call
+    '''
+    def __init__(self, shape, radius=1.):
+        self.shape = shape
+        self.radius = radius
+        self._v0 = None
+
+    def __call__(self, g):
+        G = g.reshape(self.shape)
+        if min(self.shape) < 3:
+            U, _, Vt = np.linalg.svd(G)
+            u, v = U[:, 0], Vt[0]
+        else:
+            U, _, Vt = spla.svds(G, k=1, v0=self._v0)
+            u, v = U[:, 0], Vt[0]
+            # Lanczos runs for the smaller side of the matrix
+            self._v0 = v if self.shape[0] >= self.shape[1] else u
+        return -self.radius * np.outer(u, v).ravel()
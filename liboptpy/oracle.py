@@ -0,0 +1,159 @@
+import hashlib
+import numpy as np
+from collections import OrderedDict
+
+__all__ = ["Oracle"]
+
+class Oracle(object):
+    '''
+    Class wraps objective function and its gradient and memoizes their values
+    in the last cache_size visited points. Points are identified by the hash of their content,
+    so the arrays passed to the oracle can be safely reused by a caller.
+    Besides separate f(x) and grad(x), the oracle can be given a fused
+    f_and_grad(x) -> (f, g) or f_grad_hessvec(x) -> (f, g, hv),
+    where hv(v) is the product of the hessian in x and vector v.
+    If dtype is set, gradients are converted to it, solvers set it to the working precision
+    '''
+    def __init__(self, f=None, grad=None, f_and_grad=None, f_grad_hessvec=None, cache_size=4):
+        if f_and_grad is None and f_grad_hessvec is not None:
+            f_and_grad = lambda x: f_grad_hessvec(x)[:2]
+        if f_and_grad is None and (f is None or grad is None):
+            raise ValueError("Provide either f and grad or fused f_and_grad or f_grad_hessvec!")
+        self._f_fun = f
+        self._grad_fun = grad
+        self._f_and_grad_fun = f_and_grad
+        self._f_grad_hessvec_fun = f_grad_hessvec
+        self.has_f_and_grad = f_and_grad is not None
+        self.has_hessvec = f_grad_hessvec is not None
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self.dtype = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.num_f_evals = 0
+        self.num_grad_evals = 0
+        self.num_f_saved = 0
+        self.num_grad_saved = 0
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self):
+        return {"f_evals": self.num_f_evals, "grad_evals": self.num_grad_evals,
+                "f_saved": self.num_f_saved, "grad_saved": self.num_grad_saved}
+
+    def _key(self, x):
+        x = np.ascontiguousarray(x)
+        return (x.shape, x.dtype.str, hashlib.blake2b(x, digest_size=16).digest())
+
+    def _get_entry(self, x):
+        if self._cache_size == 0:
+            return {}
+        key = self._key(x)
+        entry = self._cache.get(key)
+        if entry is None:
+            entry = {}
+            self._cache[key] = entry
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return entry
+
+    def _eval_fused(self, x, entry):
+        if self._f_grad_hessvec_fun is not None:
+            entry["f"], entry["grad"], entry["hessvec"] = self._f_grad_hessvec_fun(x)
+        else:
+            entry["f"], entry["grad"] = self._f_and_grad_fun(x)
+        entry["grad"] = self._cast(entry["grad"])
+        self.num_f_evals += 1
+        self.num_grad_evals += 1
+
+    def _f_entry(self, x, entry):
+        if "f" in entry:
+            self.num_f_saved += 1
+        elif self._f_fun is None:
+            self._eval_fused(x, entry)
+        else:
+            entry["f"] = self._f_fun(x)
+            self.num_f_evals += 1
+        return entry["f"]
+
+    def _grad_entry(self, x, entry):
+        if "grad" in entry:
+            self.num_grad_saved += 1
+        elif self._grad_fun is None:
+            self._eval_fused(x, entry)
+        else:
+            entry["grad"] = self._cast(self._grad_fun(x))
+            self.num_grad_evals += 1
+        return entry["grad"]
+
+    def _cast(self, g):
+        if self.dtype is None or g.dtype == self.dtype:
+            return g
+        return g.astype(self.dtype)
+
+    def f(self, x):
+        return self._f_entry(x, self._get_entry(x))
+    
+    def peek_f(self, x):
+        '''
+        Cached value of f in x or None, nothing is evaluated or counted
+        '''
+        if self._cache_size == 0:
+            return None
+        entry = self._cache.get(self._key(x))
+        if entry is None:
+            return None
+        return entry.get("f")
+
+    def grad(self, x):
+        return self._grad_entry(x, self._get_entry(x))
+
+    def f_and_grad(self, x):
+        entry = self._get_entry(x)
+        if self._f_and_grad_fun is not None and not entry:
+            self._eval_fused(x, entry)
+            return entry["f"], entry["grad"]
+        return self._f_entry(x, entry), self._grad_entry(x, entry)
+
+    def f_many(self, points, map_fun=map, f_vectorized=None):
+        '''
+        Values of f in several points. Points missed in the cache are evaluated together
+        by map_fun(fun, points), e.g. map method of an executor, or by f_vectorized
+        applied to the array of stacked points
+        '''
+        entries = [self._get_entry(x) for x in points]
+        missed = []
+        for entry, x in zip(entries, points):
+            if "f" in entry:
+                self.num_f_saved += 1
+            elif not any(entry is e for e, _ in missed):
+                missed.append((entry, x))
+        if missed:
+            missed_points = [x for _, x in missed]
+            if f_vectorized is not None:
+                for (entry, _), val in zip(missed, f_vectorized(np.stack(missed_points))):
+                    entry["f"] = val
+            elif self._f_fun is not None:
+                for (entry, _), val in zip(missed, map_fun(self._f_fun, missed_points)):
+                    entry["f"] = val
+            else:
+                fused = self._f_grad_hessvec_fun if self._f_grad_hessvec_fun is not None else self._f_and_grad_fun
+                for (entry, _), res in zip(missed, map_fun(fused, missed_points)):
+                    entry["f"], entry["grad"] = res[0], self._cast(res[1])
+                    if len(res) == 3:
+                        entry["hessvec"] = res[2]
+                self.num_grad_evals += len(missed)
+            self.num_f_evals += len(missed)
+        return [entry["f"] for entry in entries]
+    
+    def hessvec(self, x):
+        if not self.has_hessvec:
+            raise ValueError("Oracle has no hessian-vector product, provide f_grad_hessvec!")
+        entry = self._get_entry(x)
+        if "hessvec" not in entry:
+            self._eval_fused(x, entry)
+        return entry["hessvec"]
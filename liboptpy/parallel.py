@@ -0,0 +1,120 @@
+import concurrent.futures as _futures
+import multiprocessing as _mp
+import os
+import numpy as np
+import scipy.sparse as sp
+from multiprocessing import shared_memory
+from . import history as _history
+
+__all__ = ["solve_many"]
+
+# Read-only arrays attached by the worker process
+_shared = {}
+_segments = []
+
+class _SharedArrays(object):
+    '''
+    Dense arrays and sparse matrices copied once to shared memory blocks owned by the parent process.
+    Workers get only the names of blocks, shapes and types
+    '''
+    def __init__(self, arrays):
+        self._segments = []
+        self.specs = {}
+        try:
+            for name, a in arrays.items():
+                if sp.issparse(a):
+                    a = sp.csr_matrix(a)
+                    self.specs[name] = ("csr", a.shape, [self._share(a.data), self._share(a.indices),
+                                                         self._share(a.indptr)])
+                else:
+                    self.specs[name] = ("dense", None, [self._share(np.asarray(a))])
+        except Exception:
+            self.close()
+            raise
+
+    def _share(self, a):
+        a = np.ascontiguousarray(a)
+        segment = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+        self._segments.append(segment)
+        np.ndarray(a.shape, dtype=a.dtype, buffer=segment.buf)[...] = a
+        return segment.name, a.shape, a.dtype.str
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+def _attach_array(name, shape, dtype):
+    # Workers share the resource tracker of the parent, which unlinks the blocks
+    segment = shared_memory.SharedMemory(name=name)
+    _segments.append(segment)
+    a = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+    a.flags.writeable = False
+    return a
+
+def _attach(specs):
+    _shared.clear()
+    for name, (kind, shape, parts) in specs.items():
+        arrays = [_attach_array(*part) for part in parts]
+        if kind == "csr":
+            _shared[name] = sp.csr_matrix(tuple(arrays), shape=shape, copy=False)
+        else:
+            _shared[name] = arrays[0]
+
+def _solve_task(solver_class, build, solver_kwargs, index, x0, data, max_iter, tol, shared):
+    try:
+        solver_kwargs = dict(solver_kwargs)
+        solver_kwargs.setdefault("history", _history.NoHistory())
+        solver = solver_class(*build(data, **shared), **solver_kwargs)
+        x = solver.solve(x0, max_iter, tol)
+    except Exception as e:
+        return {"index": index, "error": "{}: {}".format(type(e).__name__, e)}
+    result = {"index": index, "x": x, "iterations": solver._num_iter - 1}
+    result.update(solver.get_oracle().get_stats())
+    return result
+
+def _solve_task_in_worker(*args):
+    return _solve_task(*args, _shared)
+
+def solve_many(solver_class, build, tasks, shared=None, max_workers=None, max_iter=100, tol=1e-6,
+               mp_context=None, **solver_kwargs):
+    '''
+    Solve independent problems in the pool of max_workers processes and yield results as they are finished.
+    Every task is a pair (x0, data), solver is created in the worker as
+    solver_class(*build(data, **shared), **solver_kwargs), so build must be picklable, e.g. a module-level function.
+    Dense arrays and sparse matrices in the dictionary shared are copied once to shared memory
+    and passed to build as read-only arrays instead of pickling them for every task.
+    Result is the dictionary with index of task, solution x, number of iterations and numbers of evaluations
+    or with error if solve failed. Solvers keep no history unless it is given in solver_kwargs.
+    If max_workers is 0, tasks are solved in the current process
+    '''
+    if shared is None:
+        shared = {}
+    if max_workers == 0:
+        for index, (x0, data) in enumerate(tasks):
+            yield _solve_task(solver_class, build, solver_kwargs, index, x0, data, max_iter, tol, shared)
+        return
+    if isinstance(mp_context, str):
+        mp_context = _mp.get_context(mp_context)
+    num_workers = max_workers or os.cpu_count() or 1
+    blocks = _SharedArrays(shared)
+    try:
+        with _futures.ProcessPoolExecutor(max_workers, mp_context=mp_context, initializer=_attach,
+                                          initargs=(blocks.specs,)) as executor:
+            tasks = enumerate(tasks)
+            pending = set()
+            while True:
+                # Only a few tasks per worker are submitted ahead, so long lists of tasks are not kept in memory
+                for index, (x0, data) in tasks:
+                    pending.add(executor.submit(_solve_task_in_worker, solver_class, build, solver_kwargs,
+                                                index, x0, data, max_iter, tol))
+                    if len(pending) >= 2 * num_workers:
+                        break
+                if not pending:
+                    break
+                done, pending = _futures.wait(pending, return_when=_futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        blocks.close()
@@ -0,0 +1,120 @@
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from collections import deque
+
+__all__ = ["Jacobi", "IncompleteCholesky", "LBFGSPreconditioner", "as_preconditioner"]
+
+def as_preconditioner(M):
+    '''
+    Function r -> M^{-1} r from None (identity), callable applying the inverse,
+    or matrix, sparse matrix or LinearOperator approximating the inverse
+    '''
+    if M is None:
+        return lambda r: r
+    if hasattr(M, "dot"):
+        return M.dot
+    return M
+
+class LBFGSPreconditioner(object):
+    '''
+    Preconditioner applying the limited-memory BFGS approximation of the inverse hessian
+    built from the last hist_size pairs (s, y) given to update. Pairs with non-positive curvature are skipped
+    '''
+    def __init__(self, hist_size=5):
+        self._hist_size = hist_size
+        self.reset()
+
+    def reset(self):
+        self._pairs = deque(maxlen=self._hist_size)
+
+    def update(self, s, y):
+        sy = s.dot(y)
+        if sy > 1e-10 * np.linalg.norm(s) * np.linalg.norm(y):
+            self._pairs.append((s.copy(), y.copy(), 1. / sy))
+
+    def __call__(self, r):
+        q = r.copy()
+        if not self._pairs:
+            return q
+        alpha = []
+        for s, y, rho in reversed(self._pairs):
+            a = rho * s.dot(q)
+            q -= a * y
+            alpha.append(a)
+        s, y, rho = self._pairs[-1]
+        q *= 1. / (rho * y.dot(y))
+        for (s, y, rho), a in zip(self._pairs, reversed(alpha)):
+            q += (a - rho * y.dot(q)) * s
+        return q
+
+class Jacobi(object):
+    '''
+    Preconditioner dividing by the diagonal of dense or sparse matrix A.
+    Vectors and batches of vectors given as rows are supported
+    '''
+    def __init__(self, A):
+        diag = A.diagonal()
+        if np.any(diag <= 0):
+            raise ValueError("Jacobi preconditioner requires positive diagonal!")
+        self._inv_diag = 1. / diag
+
+    def __call__(self, r):
+        return r * self._inv_diag
+
+class IncompleteCholesky(object):
+    '''
+    Preconditioner given by the incomplete Cholesky factorization A ~ L L^T without fill-in (IC(0))
+    of sparse symmetric positive definite matrix A. If the factorization breaks down, 
+    it is repeated for A + shift * diag(A) with the shift doubled each time starting from init_shift
+    '''
+    def __init__(self, A, init_shift=1e-3, max_shift=1e3):
+        A = sp.csr_matrix(A)
+        shift = 0.
+        while True:
+            L = self._factorize(A, shift)
+            if L is not None:
+                break
+            shift = init_shift if shift == 0 else 2 * shift
+            if shift > max_shift:
+                raise ValueError("Incomplete Cholesky factorization failed!")
+        self._L = L
+        self._LT = L.T.tocsr()
+        self.shift = shift
+
+    def _factorize(self, A, shift):
+        L = sp.tril(A, format="csr")
+        L.sort_indices()
+        L.data = L.data.astype(float)
+        indptr, indices, data = L.indptr, L.indices, L.data
+        n = A.shape[0]
+        # Column -> position in the row for the rows factorized so far
+        rows = []
+        for i in range(n):
+            start, end = indptr[i], indptr[i + 1]
+            if end == start or indices[end - 1] != i:
+                return None
+            row = {}
+            for pos in range(start, end - 1):
+                j = indices[pos]
+                row_j = rows[j]
+                val = data[pos]
+                for k, pos_k in row.items():
+                    pos_jk = row_j.get(k)
+                    if pos_jk is not None:
+                        val -= data[pos_k] * data[pos_jk]
+                data[pos] = val / data[indptr[j + 1] - 1]
+                row[j] = pos
+            diag = data[end - 1] * (1 + shift) - sum(data[pos] ** 2 for pos in row.values())
+            if diag <= 0:
+                return None
+            data[end - 1] = np.sqrt(diag)
+            rows.append(row)
+        return L
+
+    def __call__(self, r):
+        # Batch of vectors given as rows is solved as the matrix of columns
+        rhs = r if r.ndim == 1 else r.T
+        z = spla.spsolve_triangular(self._L, rhs, lower=True)
+        z = spla.spsolve_triangular(self._LT, z, lower=False)
+        return z if r.ndim == 1 else z.T
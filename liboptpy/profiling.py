@@ -0,0 +1,43 @@
+import cProfile
+import pstats
+import numpy as np
+
+__all__ = ["Recorder", "profile_solve"]
+
+class Recorder(object):
+    '''
+    Callback collecting per-iteration events of a solver into NumPy arrays.
+    Function values which have not been computed by the solver are stored as nan
+    '''
+    fields = ("f", "grad_norm", "alpha", "ls_trials", "f_evals", "grad_evals", 
+              "t_direction", "t_step_size", "t_update")
+    
+    def __init__(self, fields=None):
+        if fields is not None:
+            self.fields = tuple(fields)
+        self.reset()
+    
+    def reset(self):
+        self._data = {key: [] for key in self.fields}
+    
+    def __call__(self, event):
+        for key in self.fields:
+            value = event[key]
+            self._data[key].append(np.nan if value is None else value)
+    
+    def get(self):
+        return {key: np.array(value, dtype=float) for key, value in self._data.items()}
+    
+    def get_timings(self):
+        '''
+        Total time of every phase of iterations
+        '''
+        return {key[2:]: float(np.sum(self._data[key])) for key in self.fields if key.startswith("t_")}
+
+def profile_solve(solver, x0, *args, sort="cumulative", **kwargs):
+    '''
+    Run solver.solve(x0, *args, **kwargs) under cProfile, return the solution and sorted statistics
+    '''
+    profiler = cProfile.Profile()
+    x = profiler.runcall(solver.solve, x0, *args, **kwargs)
+    return x, pstats.Stats(profiler).sort_stats(sort)
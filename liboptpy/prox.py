@@ -0,0 +1,94 @@
+import inspect
+import numpy as np
+
+__all__ = ["L1", "Box", "L2Ball", "Simplex", "L1Ball", "project_simplex", "as_prox"]
+
+def as_prox(op):
+    '''
+    Function (x, alpha) -> prox of alpha * g from the operator of this catalog or from projector(x)
+    as ProjectedGD accepts it, projection does not depend on alpha
+    '''
+    if isinstance(op, np.ufunc):
+        return lambda x, alpha=1.: op(x)
+    try:
+        params = inspect.signature(op).parameters
+    except (TypeError, ValueError):
+        return op
+    if len(params) == 1:
+        return lambda x, alpha=1.: op(x)
+    return op
+
+def project_simplex(x, radius=1.):
+    '''
+    Euclidean projection of vector x or of rows of x onto the simplex {z >= 0, sum(z) = radius}, O(n log n) by sorting
+    '''
+    u = -np.sort(-x, axis=-1)
+    css = np.cumsum(u, axis=-1) - radius
+    ind = np.arange(1, x.shape[-1] + 1)
+    # Number of positive entries in the projection, the condition holds for a prefix of sorted entries
+    k = np.sum(u * ind > css, axis=-1, keepdims=True)
+    theta = np.take_along_axis(css, k - 1, axis=-1) / k
+    return np.maximum(x - theta, 0)
+
+class L1(object):
+    '''
+    Proximal operator of lam * ||x||_1 (soft thresholding)
+    '''
+    def __init__(self, lam=1.):
+        self.lam = lam
+
+    def __call__(self, x, alpha=1.):
+        return np.sign(x) * np.maximum(np.abs(x) - alpha * self.lam, 0)
+
+    def value(self, x):
+        return self.lam * np.sum(np.abs(x), axis=-1)
+
+class _Projection(object):
+    '''
+    Projection is the proximal operator of the indicator of the set, value is zero since iterates are feasible
+    '''
+    def value(self, x):
+        return np.zeros(x.shape[:-1]) if x.ndim > 1 else 0.
+
+class Box(_Projection):
+    '''
+    Projection onto the box lb <= x <= ub, bounds are scalars or arrays
+    '''
+    def __init__(self, lb=-np.inf, ub=np.inf):
+        self.lb = lb
+        self.ub = ub
+
+    def __call__(self, x, alpha=1.):
+        return np.clip(x, self.lb, self.ub)
+
+class L2Ball(_Projection):
+    '''
+    Projection onto the ball ||x||_2 <= radius
+    '''
+    def __init__(self, radius=1.):
+        self.radius = radius
+
+    def __call__(self, x, alpha=1.):
+        norm = np.linalg.norm(x, axis=-1, keepdims=True)
+        return x * np.minimum(1, self.radius / np.maximum(norm, np.finfo(float).tiny))
+
+class Simplex(_Projection):
+    '''
+    Projection onto the simplex {x >= 0, sum(x) = radius}
+    '''
+    def __init__(self, radius=1.):
+        self.radius = radius
+
+    def __call__(self, x, alpha=1.):
+        return project_simplex(x, self.radius)
+
+class L1Ball(_Projection):
+    '''
+    Projection onto the ball ||x||_1 <= radius through the projection of |x| onto the simplex
+    '''
+    def __init__(self, radius=1.):
+        self.radius = radius
+
+    def __call__(self, x, alpha=1.):
+        inside = np.sum(np.abs(x), axis=-1, keepdims=True) <= self.radius
+        return np.where(inside, x, np.sign(x) * project_simplex(np.abs(x), self.radius))
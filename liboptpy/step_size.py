@@ -1,6 +1,9 @@
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .utils import rowdot, rownorm
 
-__all__ = ["ConstantStepSize", "Backtracking", "ExactLineSearch4Quad", "InvIterStepSize", "ScaledInvIterStepSize"]
+__all__ = ["ConstantStepSize", "Backtracking", "MoreThuente", "ExactLineSearch4Quad", "InvIterStepSize", "ScaledInvIterStepSize",
+           "FractionToBoundary"]
 
 class StepSize(object):
     '''
@@ -11,7 +14,7 @@ class StepSize(object):
     def get_stepsize(self, *args, **kwargs):
         raise NotImplementedError("Method to get current step size has to be implemented!")
         
-    def assign_function(self, f, grad, *args):
+    def assign_function(self, f, grad, *args, **kwargs):
         pass
     
 class ConstantStepSize(StepSize):
@@ -29,7 +32,7 @@ class ScaledConstantStepSize(StepSize):
         self.stepsize = stepsize
     
     def get_stepsize(self, h, x, num_iter, *args):
-        return self.stepsize / np.linalg.norm(h)
+        return self.stepsize / rownorm(h)
     
 class InvIterStepSize(StepSize):
     def __init__(self):
@@ -44,7 +47,7 @@ class ScaledInvIterStepSize(StepSize):
     
     def get_stepsize(self, h, x, num_iter, *args):
         s = 1. / num_iter
-        return s / np.linalg.norm(h)
+        return s / rownorm(h)
     
 class InvSqrootIterStepSize(StepSize):
     def __init__(self):
@@ -55,7 +58,13 @@ class InvSqrootIterStepSize(StepSize):
         
 class Backtracking(StepSize):
     '''
-    Class represents different rules for backtracking search of step size
+    Class represents different rules for backtracking search of step size.
+    If parallel is k > 1, Armijo and Lipschitz rules test the ladder of k trial steps
+    alpha, rho * alpha, ..., rho^(k-1) * alpha at once and take the largest acceptable one,
+    Wolfe rules use the ladder to bracket the step size before bisection.
+    Function values in the ladder are computed by f_vectorized over the stacked trial points if it is given,
+    otherwise by map of the executor (thread pool of k workers by default).
+    Thread pool created by the rule is shut down by close() or at the exit of the with block, executor given by user is not
     '''
     def __init__(self, rule_type, **kwargs):
         self.rule = rule_type
@@ -64,29 +73,59 @@ class Backtracking(StepSize):
             self.par["eps"] = 0.
         if "disp" not in self.par:
             self.par["disp"] = False
+        self.par.setdefault("parallel", 1)
+        self.par.setdefault("executor", None)
+        self.par.setdefault("f_vectorized", None)
+        self._f_many = None
+        self._acc_dtype = None
+        self._executor = None
         if self.rule == "Lipschitz":
             self._alpha = None
     
-    def assign_function(self, f, grad, update_x_next):
+    def close(self):
+        if self._executor is not None and self._executor is not self.par["executor"]:
+            self._executor.shutdown()
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+    
+    def assign_function(self, f, grad, update_x_next, f_many=None, accumulate=None):
+        # f and grad are cached oracle methods: an oracle given only by fused f_and_grad 
+        # computes gradient together with function value in the trial point,
+        # so the curvature checks of Wolfe rules take it from the cache.
+        # Dot products in the tests are accumulated in the precision accumulate if it is given
         self._f = f
         self._grad = grad
         self._update_x_next = update_x_next
+        self._f_many = f_many
+        self._acc_dtype = accumulate
     
     def get_stepsize(self, h, x, num_iter, *args):
         alpha = self.par["init_alpha"]
+        if x.ndim == 2 and self.rule != "Armijo":
+            raise NotImplementedError("Only Armijo rule supports batched solve")
         if self.rule == "Armijo":
             rho = self.par["rho"]
             beta = self.par["beta"]
             assert beta < 0.5, "Armijo rule is applicable for beta less than 0.5"
             assert rho < 1, "Decay factor has to be less than 1"
+            if x.ndim == 2:
+                return self._get_armijo_batch(h, x, alpha, rho, beta)
+            if self.par["parallel"] > 1:
+                return self._get_armijo_parallel(h, x, alpha, rho, beta)
             current_grad = self._grad(x)
             current_f = self._f(x)
             x_next = self._update_x_next(x, alpha, h)
             while True:
-                if np.isnan(self._f(x_next)):
+                f_next = self._f(x_next)
+                if np.isnan(f_next):
                     alpha *= rho
                 else:
-                    if self._f(x_next) >= current_f + beta * current_grad.dot(x_next - x):
+                    if f_next >= current_f + beta * rowdot(current_grad, x_next - x, self._acc_dtype):
                         alpha *= rho
                     else:
                         break
@@ -105,14 +144,18 @@ class Backtracking(StepSize):
             assert 0 < beta1 < beta2 < 1, "Wolfe rule is applicable for betas such that 0 < beta1 < beta2 < 1"
             current_grad = self._grad(x)
             current_f = self._f(x)
+            if self.par["parallel"] > 1:
+                alpha, ub = self._get_wolfe_bracket(h, x, alpha, rho, beta1, current_f, current_grad)
             while True: 
-                if np.isnan(self._f(x + alpha * h)):
+                x_next = x + alpha * h
+                f_next = self._f(x_next)
+                if np.isnan(f_next):
                     alpha *= rho
                 else:
-                    if self._f(x + alpha * h) > current_f + beta1 * alpha * current_grad.dot(h):
+                    if f_next > current_f + beta1 * alpha * rowdot(current_grad, h, self._acc_dtype):
                         ub = alpha
                         alpha = 0.5 * (lb + ub)
-                    elif h.dot(self._grad(x + alpha * h)) < beta2 * h.dot(current_grad):
+                    elif rowdot(h, self._grad(x_next), self._acc_dtype) < beta2 * rowdot(h, current_grad, self._acc_dtype):
                         lb = alpha
                         if np.isinf(ub):
                             alpha = 2 * lb
@@ -124,7 +167,35 @@ class Backtracking(StepSize):
                     raise ValueError("Step size is too small!")
             return alpha
         elif self.rule == "Goldstein":
-            pass
+            rho = self.par["rho"]
+            beta = self.par["beta"]
+            assert 0 < beta < 0.5, "Goldstein rule is applicable for beta such that 0 < beta < 0.5"
+            assert rho < 1, "Decay factor has to be less than 1"
+            lb = 0
+            ub = np.inf
+            current_grad = self._grad(x)
+            current_f = self._f(x)
+            slope = rowdot(current_grad, h, self._acc_dtype)
+            while True:
+                x_next = self._update_x_next(x, alpha, h)
+                f_next = self._f(x_next)
+                if np.isnan(f_next):
+                    ub = alpha
+                    alpha *= rho
+                elif f_next > current_f + beta * alpha * slope:
+                    ub = alpha
+                    alpha = 0.5 * (lb + ub)
+                elif f_next < current_f + (1 - beta) * alpha * slope:
+                    lb = alpha
+                    if np.isinf(ub):
+                        alpha = 2 * lb
+                    else:
+                        alpha = 0.5 * (lb + ub)
+                else:
+                    break
+                if alpha < 1e-16 or ub - lb < 1e-16 * ub:
+                    raise ValueError("Step size is too small!")
+            return alpha
         elif self.rule == "Wolfe strong":
             rho = self.par["rho"]
             assert rho < 1, "Decay factor has to be less than 1"
@@ -135,14 +206,18 @@ class Backtracking(StepSize):
             assert 0 < beta1 < beta2 < 1, "Wolfe rule is applicable for betas such that 0 < beta1 < beta2 < 1"
             current_grad = self._grad(x)
             current_f = self._f(x)
+            if self.par["parallel"] > 1:
+                alpha, ub = self._get_wolfe_bracket(h, x, alpha, rho, beta1, current_f, current_grad)
             while True: 
-                if np.isnan(self._f(x + alpha * h)):
+                x_next = x + alpha * h
+                f_next = self._f(x_next)
+                if np.isnan(f_next):
                     alpha *= rho
                 else:
-                    if self._f(x + alpha * h) > current_f + beta1 * alpha * current_grad.dot(h):
+                    if f_next > current_f + beta1 * alpha * rowdot(current_grad, h, self._acc_dtype):
                         ub = alpha
                         alpha = 0.5 * (lb + ub)
-                    elif np.abs(h.dot(self._grad(x + alpha * h))) > beta2 * np.abs(h.dot(current_grad)):
+                    elif np.abs(rowdot(h, self._grad(x_next), self._acc_dtype)) > beta2 * np.abs(rowdot(h, current_grad, self._acc_dtype)):
                         lb = alpha
                         if np.isinf(ub):
                             alpha = 2 * lb
@@ -163,14 +238,18 @@ class Backtracking(StepSize):
                 self._alpha = alpha
             else:
                 self._alpha /= rho
+            if self.par["parallel"] > 1:
+                self._alpha = self._get_lipschitz_parallel(h, x, rho, current_f, current_grad, eps)
+                return self._alpha
             x_next = self._update_x_next(x, self._alpha, h)
             while True: 
                 if self.par["disp"]:
                     print("Current test alpha = {}".format(self._alpha))
-                if np.isnan(self._f(x_next)):
+                f_next = self._f(x_next)
+                if np.isnan(f_next):
                     self._alpha *= rho
                 else:
-                    if self._f(x_next) > current_f + current_grad.dot(x_next - x) + np.linalg.norm(x_next - x)**2 / (2 * self._alpha) + eps:
+                    if f_next > current_f + rowdot(current_grad, x_next - x, self._acc_dtype) + np.linalg.norm(x_next - x)**2 / (2 * self._alpha) + eps:
                         self._alpha *= rho
                     else:
                         if self.par["disp"]:
@@ -183,6 +262,263 @@ class Backtracking(StepSize):
         else:
             raise NotImplementedError("Available rules for backtracking are 'Armijo', 'Goldstein', 'Wolfe', 'Wolfe strong' and 'Lipschitz'")
 
+    def _get_ladder(self, alpha, rho):
+        alphas = [alpha]
+        while len(alphas) < self.par["parallel"] and alphas[-1] * rho >= 1e-16:
+            alphas.append(alphas[-1] * rho)
+        return alphas
+    
+    def _f_ladder(self, points):
+        if self._f_many is None:
+            return [self._f(x) for x in points]
+        if self.par["f_vectorized"] is not None:
+            return self._f_many(points, f_vectorized=self.par["f_vectorized"])
+        if self._executor is None:
+            self._executor = self.par["executor"]
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.par["parallel"])
+        return self._f_many(points, map_fun=self._executor.map)
+    
+    def _get_trial_points(self, x, alphas, h):
+        # Update of x can write to the reused buffer, so every trial point is copied
+        return [np.copy(self._update_x_next(x, a, h)) for a in alphas]
+    
+    def _get_armijo_parallel(self, h, x, alpha, rho, beta):
+        current_grad = self._grad(x)
+        current_f = self._f(x)
+        while True:
+            alphas = self._get_ladder(alpha, rho)
+            points = self._get_trial_points(x, alphas, h)
+            for a, x_next, f_next in zip(alphas, points, self._f_ladder(points)):
+                if f_next < current_f + beta * rowdot(current_grad, x_next - x, self._acc_dtype):
+                    return a
+            alpha = alphas[-1] * rho
+            if alpha < 1e-16:
+                raise ValueError("Step size is too small!")
+    
+    def _get_lipschitz_parallel(self, h, x, rho, current_f, current_grad, eps):
+        alpha = self._alpha
+        while True:
+            alphas = self._get_ladder(alpha, rho)
+            points = self._get_trial_points(x, alphas, h)
+            for a, x_next, f_next in zip(alphas, points, self._f_ladder(points)):
+                if f_next <= current_f + rowdot(current_grad, x_next - x, self._acc_dtype) + np.linalg.norm(x_next - x)**2 / (2 * a) + eps:
+                    return a
+            alpha = alphas[-1] * rho
+            if alpha < 1e-16:
+                raise ValueError("Step size is too small!")
+    
+    def _get_wolfe_bracket(self, h, x, alpha, rho, beta1, current_f, current_grad):
+        # The largest step size of the ladder with sufficient decrease starts bisection,
+        # the previous one is the upper bound. Function values in the ladder are cached by the oracle
+        ub = np.inf
+        while True:
+            alphas = self._get_ladder(alpha, rho)
+            points = [x + a * h for a in alphas]
+            for a, f_next in zip(alphas, self._f_ladder(points)):
+                if f_next <= current_f + beta1 * a * rowdot(current_grad, h, self._acc_dtype):
+                    return a, ub
+                ub = a
+            alpha = alphas[-1] * rho
+            if alpha < 1e-16:
+                raise ValueError("Step size is too small!")
+    
+    def _get_armijo_batch(self, h, x, alpha, rho, beta):
+        # Every row of x is an independent problem with its own step size,
+        # rows with zero direction are accepted immediately and stalled rows get nan step size
+        current_grad = self._grad(x)
+        current_f = np.reshape(self._f(x), (-1, 1))
+        alpha = np.full((x.shape[0], 1), alpha, dtype=x.dtype)
+        accepted = rowdot(h, h) == 0
+        while True:
+            x_next = self._update_x_next(x, alpha, h)
+            f_next = np.reshape(self._f(x_next), (-1, 1))
+            accepted |= f_next < current_f + beta * rowdot(current_grad, x_next - x, self._acc_dtype)
+            if np.all(accepted):
+                return alpha
+            alpha = np.where(accepted, alpha, alpha * rho)
+            stalled = ~accepted & (alpha < 1e-16)
+            if np.any(stalled):
+                alpha[stalled] = np.nan
+                accepted |= stalled
+
+def _cubic_step(stx, fx, dx, sty, fy, dy, stp, fp, dp, brackt, stpmin, stpmax):
+    # Safeguarded step of More and Thuente (dcstep from MINPACK-2): interval [stx, sty] contains
+    # the step with the least function value stx, the trial step stp is updated by cubic or quadratic interpolation
+    sgnd = dp * np.sign(dx)
+    if fp > fx:
+        theta = 3 * (fx - fp) / (stp - stx) + dx + dp
+        s = max(abs(theta), abs(dx), abs(dp))
+        gamma = s * np.sqrt((theta / s)**2 - (dx / s) * (dp / s))
+        if stp < stx:
+            gamma = -gamma
+        r = ((gamma - dx) + theta) / (((gamma - dx) + gamma) + dp)
+        stpc = stx + r * (stp - stx)
+        stpq = stx + ((dx / ((fx - fp) / (stp - stx) + dx)) / 2) * (stp - stx)
+        if abs(stpc - stx) < abs(stpq - stx):
+            stpf = stpc
+        else:
+            stpf = stpc + (stpq - stpc) / 2
+        brackt = True
+    elif sgnd < 0:
+        theta = 3 * (fx - fp) / (stp - stx) + dx + dp
+        s = max(abs(theta), abs(dx), abs(dp))
+        gamma = s * np.sqrt((theta / s)**2 - (dx / s) * (dp / s))
+        if stp > stx:
+            gamma = -gamma
+        r = ((gamma - dp) + theta) / (((gamma - dp) + gamma) + dx)
+        stpc = stp + r * (stx - stp)
+        stpq = stp + (dp / (dp - dx)) * (stx - stp)
+        if abs(stpc - stp) > abs(stpq - stp):
+            stpf = stpc
+        else:
+            stpf = stpq
+        brackt = True
+    elif abs(dp) < abs(dx):
+        theta = 3 * (fx - fp) / (stp - stx) + dx + dp
+        s = max(abs(theta), abs(dx), abs(dp))
+        gamma = s * np.sqrt(max(0., (theta / s)**2 - (dx / s) * (dp / s)))
+        if stp > stx:
+            gamma = -gamma
+        r = ((gamma - dp) + theta) / ((gamma + (dx - dp)) + gamma)
+        if r < 0 and gamma != 0:
+            stpc = stp + r * (stx - stp)
+        elif stp > stx:
+            stpc = stpmax
+        else:
+            stpc = stpmin
+        stpq = stp + (dp / (dp - dx)) * (stx - stp)
+        if brackt:
+            if abs(stpc - stp) < abs(stpq - stp):
+                stpf = stpc
+            else:
+                stpf = stpq
+            if stp > stx:
+                stpf = min(stp + 0.66 * (sty - stp), stpf)
+            else:
+                stpf = max(stp + 0.66 * (sty - stp), stpf)
+        else:
+            if abs(stpc - stp) > abs(stpq - stp):
+                stpf = stpc
+            else:
+                stpf = stpq
+            stpf = min(max(stpf, stpmin), stpmax)
+    elif brackt:
+        theta = 3 * (fp - fy) / (sty - stp) + dy + dp
+        s = max(abs(theta), abs(dy), abs(dp))
+        gamma = s * np.sqrt((theta / s)**2 - (dy / s) * (dp / s))
+        if stp > sty:
+            gamma = -gamma
+        r = ((gamma - dp) + theta) / (((gamma - dp) + gamma) + dy)
+        stpf = stp + r * (sty - stp)
+    elif stp > stx:
+        stpf = stpmax
+    else:
+        stpf = stpmin
+    if fp > fx:
+        sty, fy, dy = stp, fp, dp
+    else:
+        if sgnd < 0:
+            sty, fy, dy = stx, fx, dx
+        stx, fx, dx = stp, fp, dp
+    return stx, fx, dx, sty, fy, dy, stpf, brackt
+
+class MoreThuente(StepSize):
+    '''
+    Class represents line search of More and Thuente for step size satisfying strong Wolfe conditions
+    f(x + alpha h) <= f(x) + c1 alpha grad(x)^T h and |grad(x + alpha h)^T h| <= c2 |grad(x)^T h|.
+    The step size is found by safeguarded cubic and quadratic interpolation of function values and 
+    directional derivatives, so usually one to three evaluations of f and grad are enough
+    '''
+    def __init__(self, c1=1e-4, c2=0.9, init_alpha=1., xtol=1e-14, min_alpha=1e-16, max_alpha=1e10, max_evals=20):
+        assert 0 < c1 < c2 < 1, "More-Thuente line search is applicable for c1 and c2 such that 0 < c1 < c2 < 1"
+        self.par = {"c1": c1, "c2": c2, "init_alpha": init_alpha, "xtol": xtol,
+                    "min_alpha": min_alpha, "max_alpha": max_alpha, "max_evals": max_evals}
+        self._acc_dtype = None
+    
+    def assign_function(self, f, grad, update_x_next, *args, accumulate=None):
+        self._f = f
+        self._grad = grad
+        self._update_x_next = update_x_next
+        self._acc_dtype = accumulate
+    
+    def _phi(self, x, alpha, h):
+        x_next = self._update_x_next(x, alpha, h)
+        return self._f(x_next), rowdot(self._grad(x_next), h, self._acc_dtype)
+    
+    def get_stepsize(self, h, x, num_iter, *args):
+        if x.ndim == 2:
+            raise NotImplementedError("More-Thuente line search does not support batched solve")
+        xtrapl = 1.1
+        xtrapu = 4.
+        c1 = self.par["c1"]
+        c2 = self.par["c2"]
+        xtol = self.par["xtol"]
+        min_alpha = self.par["min_alpha"]
+        max_alpha = self.par["max_alpha"]
+        finit = self._f(x)
+        ginit = rowdot(self._grad(x), h, self._acc_dtype)
+        if ginit >= 0:
+            raise ValueError("Direction is not a descent direction!")
+        gtest = c1 * ginit
+        stp = min(max(self.par["init_alpha"], min_alpha), max_alpha)
+        brackt = False
+        stage = 1
+        width = max_alpha - min_alpha
+        width1 = 2 * width
+        stx, fx, gx = 0., finit, ginit
+        sty, fy, gy = 0., finit, ginit
+        stmin = 0.
+        stmax = stp + xtrapu * stp
+        for _ in range(self.par["max_evals"]):
+            f, g = self._phi(x, stp, h)
+            if not (np.isfinite(f) and np.isfinite(g)):
+                # Step leaves the domain of f, so it is shortened towards the best step
+                stmax = stp
+                stp = stx + 0.5 * (stp - stx)
+                continue
+            ftest = finit + stp * gtest
+            if f <= ftest and abs(g) <= -c2 * ginit:
+                return stp
+            if stage == 1 and f <= ftest and g >= 0:
+                stage = 2
+            if (brackt and (stp <= stmin or stp >= stmax or stmax - stmin <= xtol * stmax)) or \
+               (stp == max_alpha and f <= ftest and g <= gtest) or \
+               (stp == min_alpha and (f > ftest or g >= gtest)):
+                # Rounding errors or bounds prevent progress, the current step size is the best available
+                if f <= ftest:
+                    return stp
+                break
+            if stage == 1 and f <= fx and f > ftest:
+                # Modified function psi(alpha) = phi(alpha) - gtest * alpha is used until the step with 
+                # sufficient decrease and non-negative derivative is found
+                stx, fxm, gxm, sty, fym, gym, stp, brackt = _cubic_step(stx, fx - stx * gtest, gx - gtest,
+                                                                       sty, fy - sty * gtest, gy - gtest,
+                                                                       stp, f - stp * gtest, g - gtest, 
+                                                                       brackt, stmin, stmax)
+                fx, gx = fxm + stx * gtest, gxm + gtest
+                fy, gy = fym + sty * gtest, gym + gtest
+            else:
+                stx, fx, gx, sty, fy, gy, stp, brackt = _cubic_step(stx, fx, gx, sty, fy, gy, stp, f, g, 
+                                                                   brackt, stmin, stmax)
+            if brackt:
+                if abs(sty - stx) >= 0.66 * width1:
+                    stp = stx + 0.5 * (sty - stx)
+                width1 = width
+                width = abs(sty - stx)
+                stmin = min(stx, sty)
+                stmax = max(stx, sty)
+            else:
+                stmin = stp + xtrapl * (stp - stx)
+                stmax = stp + xtrapu * (stp - stx)
+            stp = min(max(stp, min_alpha), max_alpha)
+            if brackt and (stp <= stmin or stp >= stmax or stmax - stmin <= xtol * stmax):
+                stp = stx
+        # Step size with the least function value satisfies at least sufficient decrease condition if it is nonzero
+        if stx > 0:
+            return stx
+        raise ValueError("More-Thuente line search failed to find step size!")
+
 class ExactLineSearch4Quad(StepSize):
     def __init__(self, A, b=None):
         self._A = A
@@ -192,4 +528,45 @@ class ExactLineSearch4Quad(StepSize):
             self._b = b
     
     def get_stepsize(self, h, x, num_iter):
+        if x.ndim == 2:
+            raise NotImplementedError("Exact line search does not support batched solve")
         return h.dot(self._b - self._A.dot(x)) / h.dot(self._A.dot(h))
+
+class FractionToBoundary(StepSize):
+    '''
+    Class represents step size rule of interior-point methods keeping iterates strictly inside the domain.
+    max_step(x, h) is the largest step such that x + alpha h is in the domain, infinity or None if it is unknown.
+    Initial step size of backtracking rule is reduced to tau * max_step, so trial points are never infeasible.
+    If max_step is None or returns None, the step is halved until the trial point satisfies is_feasible(x), 
+    so only the constraints are evaluated outside the domain
+    '''
+    def __init__(self, max_step, rule=None, tau=0.99, is_feasible=None):
+        if max_step is None and is_feasible is None:
+            raise ValueError("Feasibility test is_feasible is required if max_step is None")
+        if rule is None:
+            rule = Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+        self._max_step = max_step
+        self._rule = rule
+        self._tau = tau
+        self._is_feasible = is_feasible
+        self._init_alpha = rule.par["init_alpha"]
+    
+    def assign_function(self, f, grad, *args, **kwargs):
+        self._rule.assign_function(f, grad, *args, **kwargs)
+    
+    def get_boundary_step(self, h, x):
+        alpha = None if self._max_step is None else self._max_step(x, h)
+        if alpha is None:
+            if self._is_feasible is None:
+                raise ValueError("Largest feasible step is unknown, FractionToBoundary requires is_feasible")
+            alpha = self._init_alpha
+            while not self._is_feasible(x + alpha * h):
+                alpha *= 0.5
+                if alpha < 1e-16:
+                    raise ValueError("Step size is too small!")
+            return alpha
+        return min(self._init_alpha, self._tau * alpha)
+    
+    def get_stepsize(self, h, x, num_iter, *args):
+        self._rule.par["init_alpha"] = self.get_boundary_step(h, x)
+        return self._rule.get_stepsize(h, x, num_iter, *args)
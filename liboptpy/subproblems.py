@@ -0,0 +1,71 @@
+import numpy as np
+import scipy.linalg as sla
+
+__all__ = ["steihaug_cg", "dogleg"]
+
+def _to_boundary(z, d, radius):
+    # Positive tau such that ||z + tau d|| = radius
+    dd = d.dot(d)
+    zd = z.dot(d)
+    zz = z.dot(z)
+    return (-zd + np.sqrt(max(zd**2 + dd * (radius**2 - zz), 0))) / dd
+
+def steihaug_cg(g, hessvec, radius, tol=None, max_iter=None):
+    '''
+    Steihaug-Toint truncated CG for the trust-region subproblem min g^T p + p^T B p / 2 s.t. ||p|| <= radius,
+    where hessvec(v) = B v. CG stops on the boundary, in direction of non-positive curvature or
+    when the residual is less than tol, by default min(0.5, sqrt(||g||)) ||g||.
+    Returns step p, product B p and number of products with B
+    '''
+    g_norm = np.linalg.norm(g)
+    if tol is None:
+        tol = min(0.5, np.sqrt(g_norm)) * g_norm
+    if max_iter is None:
+        max_iter = g.shape[0]
+    z = np.zeros_like(g)
+    Bz = np.zeros_like(g)
+    r = g.copy()
+    d = -r
+    rr = r.dot(r)
+    num_hessvec = 0
+    for _ in range(max_iter):
+        if np.sqrt(rr) <= tol:
+            break
+        Bd = hessvec(d)
+        num_hessvec += 1
+        curv = d.dot(Bd)
+        if curv <= 0:
+            tau = _to_boundary(z, d, radius)
+            return z + tau * d, Bz + tau * Bd, num_hessvec
+        alpha = rr / curv
+        z_next = z + alpha * d
+        if np.linalg.norm(z_next) >= radius:
+            tau = _to_boundary(z, d, radius)
+            return z + tau * d, Bz + tau * Bd, num_hessvec
+        z = z_next
+        Bz += alpha * Bd
+        r += alpha * Bd
+        rr_next = r.dot(r)
+        d = -r + (rr_next / rr) * d
+        rr = rr_next
+    return z, Bz, num_hessvec
+
+def dogleg(g, B, radius, p_newton=None):
+    '''
+    Dogleg step for the trust-region subproblem with dense positive definite matrix B: the path goes from zero
+    to the Cauchy point along the antigradient and then to the Newton point -B^{-1} g, which can be given
+    to reuse it for several radii. Returns step p and product B p, LinAlgError is raised if B is not positive definite
+    '''
+    if p_newton is None:
+        p_newton = -sla.cho_solve(sla.cho_factor(B), g)
+    if np.linalg.norm(p_newton) <= radius:
+        return p_newton, -g
+    Bg = B.dot(g)
+    g_norm = np.linalg.norm(g)
+    p_cauchy = -(g_norm**2 / g.dot(Bg)) * g
+    if np.linalg.norm(p_cauchy) >= radius:
+        p = -(radius / g_norm) * g
+        return p, -(radius / g_norm) * Bg
+    tau = _to_boundary(p_cauchy, p_newton - p_cauchy, radius)
+    p = p_cauchy + tau * (p_newton - p_cauchy)
+    return p, B.dot(p)
@@ -5,6 +5,8 @@ from ._acc_gd import AcceleratedGD
 from ._subgrad import SubgradientMethod
 from ._dual_average import DualAveraging
 from ._quasi_newton import BFGS, LBFGS, DFP, BarzilaiBorweinMethod
+from ._trust_region import TrustRegionQuasiNewton
+from ._stochastic import SGD, MomentumSGD, Adam, SVRG, SAGA
 
 __all__ = ["BarzilaiBorweinMethod",
            "AcceleratedGD",
@@ -14,4 +16,6 @@ __all__ = ["BarzilaiBorweinMethod",
            "ConjugateGradientQuad",
            "SubgradientMethod",
            "DualAveraging",
-           "BFGS", "LBFGS", "DFP"]
\ No newline at end of file
+           "BFGS", "LBFGS", "DFP",
+           "TrustRegionQuasiNewton",
+           "SGD", "MomentumSGD", "Adam", "SVRG", "SAGA"]
\ No newline at end of file
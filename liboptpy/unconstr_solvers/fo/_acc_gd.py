@@ -1,19 +1,34 @@
 from ... import base_optimizer as _base
 import numpy as _np
 from ... import step_size as ss
+from ... import jit as _jit
 
 class AcceleratedGD(_base.LineSearchOptimizer):
+    _batch_support = True
+    _in_place_support = True
+    _jit_support = True
+    _state_attrs = ("_lam0", "_lam1")
+    
     def __init__(self, f, grad, step_size, momentum_size=None, **kwargs):
         super().__init__(f, grad, step_size, **kwargs)
         if momentum_size is not None:
-            momentum_size.assign(f, grad)
+            momentum_size.assign(self._f, self._grad)
         self._momentum_size = momentum_size
         self._lam0 = 0
         self._lam1 = 1
+        self._y_bufs = None
+        
+    def _allocate_buffers(self, x):
+        super()._allocate_buffers(x)
+        # Extrapolated points alternate between two buffers, since frozen rows of batch are taken from the previous one
+        self._y_bufs = [_np.empty_like(x), _np.empty_like(x)]
         
     def get_direction(self, x):
+        if self._num_iter == 1:
+            self._lam0 = 0
+            self._lam1 = 1
         self._current_grad = self._grad(x)
-        return -self._current_grad
+        return _np.negative(self._current_grad, out=self._h_buf)
     
     def _update_x_current(self):
         if self._momentum_size is None:
@@ -21,7 +36,23 @@ class AcceleratedGD(_base.LineSearchOptimizer):
             t = self._lam0
             self._lam0 = self._lam1
             self._lam1 = (1 + _np.sqrt(1 + 4 * t**2)) / 2.
-        self._x_current = self._x_next + beta * (self._x_next - self.convergence[-1])
+        out = None if self._y_bufs is None else self._y_bufs[self._num_iter % 2]
+        y = _np.subtract(self._x_next, self._x_mem[-1], out=out)
+        y *= beta
+        y += self._x_next
+        self._x_current = y
         
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
\ No newline at end of file
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
+    
+    def _jit_params(self):
+        if self._momentum_size is not None:
+            return None
+        return super()._jit_params()
+    
+    def _solve_jit(self, max_iter, tol):
+        rule, alpha, rho, beta = self._jit_params()
+        res = _jit.agd_loop(self._oracle._f_fun, self._oracle._grad_fun, self._x_current, max_iter, tol, 
+                            rule, alpha, rho, beta, self._jit_store(), 0, 1)
+        self._lam0, self._lam1 = res[-2:]
+        return self._finish_jit(*res[:-2])
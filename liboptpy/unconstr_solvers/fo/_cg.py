@@ -1,74 +1,112 @@
 from ... import base_optimizer as _base
+from ... import oracle as _oracle
+from ... import step_size as _ss
+from ... import preconditioners as _precond
 import numpy as _np
 
 class ConjugateGradientFR(_base.LineSearchOptimizer):
-    def __init__(self, f, grad, step_size, restart=None, **kwargs):
+    def __init__(self, f, grad, step_size=None, restart=None, **kwargs):
+        if step_size is None:
+            # Directions of nonlinear CG need more accurate line search than quasi-Newton ones
+            step_size = _ss.MoreThuente(c2=0.1)
         super().__init__(f, grad, step_size, **kwargs)
         if restart is not None:
-            restart.assign_function(f, grad)
+            restart.assign_function(self._f, self._grad)
         self._restart = restart
         
     def get_direction(self, x):
-        if (len(self.convergence) == 1) or (self._restart is not None and 
-                                            self._restart(len(self.convergence), x)):
+        if (self._num_iter == 1) or (self._restart is not None and 
+                                            self._restart(self._num_iter, x)):
             self._current_grad = self._grad(x)
             h = -self._current_grad
         else:
-            self._current_grad = self._grad(self.convergence[-1])
+            self._current_grad = self._grad(self._x_mem[-1])
             beta = self._current_grad.dot(self._current_grad) / self._grad_mem[-1].dot(self._grad_mem[-1])
             h = -self._current_grad + beta * self._h
         return h
     
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
 
 class ConjugateGradientPR(_base.LineSearchOptimizer):
-    def __init__(self, f, grad, step_size, restart=None, **kwargs):
+    def __init__(self, f, grad, step_size=None, restart=None, **kwargs):
+        if step_size is None:
+            # Directions of nonlinear CG need more accurate line search than quasi-Newton ones
+            step_size = _ss.MoreThuente(c2=0.1)
         super().__init__(f, grad, step_size, **kwargs)
         if restart is not None:
-            restart.assign_function(f, grad)
+            restart.assign_function(self._f, self._grad)
         self._restart = restart
         
     def get_direction(self, x):
-        if (len(self.convergence) == 1):
+        if (self._num_iter == 1):
             self._current_grad = self._grad(x)
             h = -self._current_grad
         else:
-            self._current_grad = self._grad(self.convergence[-1])
+            self._current_grad = self._grad(self._x_mem[-1])
             beta = self._current_grad.dot(self._current_grad - self._grad_mem[-1]) / self._grad_mem[-1].dot(self._grad_mem[-1])
             h = -self._current_grad + beta * self._h
         return h
     
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence)) 
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter) 
     
 class ConjugateGradientQuad(_base.LineSearchOptimizer):
-    def __init__(self, A, b=None):
+    '''
+    Class represents preconditioned CG method for quadratic function 0.5 x^T A x - b^T x, i.e. for system Ax = b.
+    Every iteration costs one product of A and direction, the residual is updated recursively
+    and recomputed as b - Ax every residual_refresh iterations to remove accumulated rounding errors.
+    Preconditioner is None, function r -> M^{-1} r, matrix or LinearOperator approximating the inverse of A,
+    e.g. Jacobi or IncompleteCholesky from liboptpy.preconditioners.
+    Several right-hand sides are solved together if b and x0 have shape (N, n), then rows are independent
+    systems sharing the single product of A and matrix of directions per iteration
+    '''
+    _batch_support = True
+    _state_attrs = ("_r", "_rz", "_Ah")
+    
+    def __init__(self, A, b=None, precond=None, residual_refresh=50, **kwargs):
         if b is None:
             b = _np.zeros(A.shape[0])
-        f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x)
-        grad = lambda x: A.dot(x) - b
-        super().__init__(f, grad, None)
+        f = lambda x: _np.sum(x * (0.5 * self._matvec(x) - b), axis=-1)
+        grad = lambda x: self._matvec(x) - b
+        # Every point is visited once, so function values are not cached
+        super().__init__(_oracle.Oracle(f, grad, cache_size=0), None, None, **kwargs)
         self._A = A
         self._b = b
-        
+        self._precond = _precond.as_preconditioner(precond)
+        self._residual_refresh = residual_refresh
+    
+    def _matvec(self, x):
+        if x.ndim == 1:
+            return self._A.dot(x)
+        return self._A.dot(x.T).T
+    
     def get_direction(self, x):
-        if (len(self.convergence) == 1):
+        if self._num_iter == 1:
             self._current_grad = self._grad(x)
-            h = -self._current_grad
-            self._r = -h
+            self._r = -self._current_grad
+        else:
+            if self._residual_refresh and (self._num_iter - 1) % self._residual_refresh == 0:
+                self._r = self._cast(self._b - self._matvec(x))
+            else:
+                self._r = self._r - self._alpha * self._Ah
+            self._current_grad = -self._r
+        z = self._precond(self._r)
+        rz = self._dot(self._r, z)
+        if self._num_iter == 1:
+            h = z
         else:
-            r_next = self._r + self._alpha * self._A.dot(self._h)
-            beta = r_next.dot(r_next) / self._r.dot(self._r)
-            h = -r_next + beta * self._h
-            self._r = r_next
+            h = z + self._cast(self._safe_div(rz, self._rz)) * self._h
+        self._rz = rz
         return h
     
     def get_stepsize(self):
-        # h = self._grad_mem[-1]
-        self._alpha = self._r.dot(self._r) / self._h.dot(self._A.dot(self._h))
-        return self._alpha
+        # The only product with A in the iteration, it is reused for the residual update
+        self._Ah = self._cast(self._matvec(self._h))
+        return self._safe_div(self._rz, self._dot(self._h, self._Ah))
     
-    def check_convergence(self, tol):
-        return _np.linalg.norm(self._grad(self.convergence[-1])) < tol
-    
\ No newline at end of file
+    def _safe_div(self, a, b):
+        # Rows of converged systems have zero directions and residuals in batched solve
+        if _np.ndim(b) == 0:
+            return a / b
+        return _np.divide(a, b, out=_np.zeros_like(b), where=b != 0)
@@ -1,12 +1,23 @@
 from ... import base_optimizer as _base
+from ... import jit as _jit
+import numpy as _np
 
 class GradientDescent(_base.LineSearchOptimizer):
+    _batch_support = True
+    _in_place_support = True
+    _jit_support = True
+    
     def __init__(self, f, grad, step_size, **kwargs):
         super().__init__(f, grad, step_size, **kwargs)
     
     def get_direction(self, x):
         self._current_grad = self._grad(x)
-        return -self._current_grad
+        return _np.negative(self._current_grad, out=self._h_buf)
     
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
\ No newline at end of file
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
+    
+    def _solve_jit(self, max_iter, tol):
+        rule, alpha, rho, beta = self._jit_params()
+        return self._finish_jit(*_jit.gd_loop(self._oracle._f_fun, self._oracle._grad_fun, self._x_current, 
+                                              max_iter, tol, rule, alpha, rho, beta, self._jit_store()))
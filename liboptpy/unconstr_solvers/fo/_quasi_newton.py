@@ -1,147 +1,401 @@
 import numpy as _np
+import scipy.linalg as _sla
+import scipy.sparse as _sp
+import scipy.sparse.linalg as _spla
+from scipy.linalg import blas as _blas
 from ... import base_optimizer as _base
 from ... import step_size as _ss
-from collections import deque
+from ... import utils as _utils
+from ... import jit as _jit
+from ... import checkpoint as _checkpoint
 
 
+def _init_matrix(x, H0, diag=None):
+    # Dense symmetric matrices are kept in Fortran order to be updated in place by BLAS,
+    # only their lower triangles are referenced
+    if _sp.issparse(H0):
+        H0 = H0.toarray()
+    if H0 is not None:
+        return _np.array(H0, dtype=x.dtype, order="F")
+    H = _np.zeros((x.shape[0], x.shape[0]), dtype=x.dtype, order="F")
+    _np.fill_diagonal(H, diag)
+    return H
+
+def _chol_rank1_update(L, v, sign):
+    # L L^T + sign * v v^T = L_new L_new^T, L is lower triangular in Fortran order and updated in place
+    v = v.copy()
+    for k in range(L.shape[0]):
+        r2 = L[k, k]**2 + sign * v[k]**2
+        if r2 <= 0:
+            raise _np.linalg.LinAlgError("Updated matrix is not positive definite")
+        r = _np.sqrt(r2)
+        c = r / L[k, k]
+        t = v[k] / L[k, k]
+        L[k, k] = r
+        col = L[k+1:, k]
+        col += sign * t * v[k+1:]
+        col /= c
+        v[k+1:] *= c
+        v[k+1:] -= t * col
+    
+
 class BFGS(_base.LineSearchOptimizer):
     
+    '''
+    Class represents BFGS method. Approximation of the inverse hessian is updated in place 
+    by the symmetric rank-2 BLAS update of its lower triangle, so no n x n temporaries are created.
+    If factored is True, the Cholesky factor of the hessian approximation is updated instead 
+    by rank-1 update and downdate, and the direction is found by two triangular solves
+    '''
+    _in_place_support = True
+    _state_attrs = ("_H",)
+    
     def __init__(self, f, grad, step_size=None, 
-                 H=None, **kwargs):
+                 H=None, factored=False, **kwargs):
         if step_size is None:
-            step_size = _ss.Backtracking("Wolfe", rho=0.5, beta1=1e-3, beta2=0.9, init_alpha=1.)
+            step_size = _ss.MoreThuente()
         super().__init__(f, grad, step_size, memory_size=1, **kwargs)
         self._H0 = H
         self._H = H
+        self._factored = factored
     
     def get_direction(self, x):
-        if self._H is None:
+        if self._num_iter == 1:
             self._current_grad = self._grad(x)
-            return -self._current_grad
+            self._H = None
+            if self._H0 is not None:
+                self._init_approximation(x)
+        if self._H is None:
+            return _np.negative(self._current_grad, out=self._h_buf)
+        elif self._factored:
+            z = self._trsv(self._H, self._current_grad, lower=1)
+            h = self._trsv(self._H, z, trans=1, lower=1, overwrite_x=1)
+            return _np.negative(h, out=h)
+        else:
+            return self._symv(-1., self._H, self._current_grad, lower=1)
+    
+    def _init_approximation(self, x, diag=None):
+        if self._factored:
+            # Cholesky factor of B = H^{-1}
+            if self._H0 is not None:
+                self._H = _np.array(_sla.cholesky(_np.linalg.inv(self._H0), lower=True), dtype=x.dtype, order="F")
+            else:
+                self._H = _init_matrix(x, None, _np.sqrt(1. / diag))
         else:
-            return -self._H.dot(self._current_grad)
+            self._H = _init_matrix(x, self._H0, diag)
+        self._get_blas_funcs()
+    
+    def _get_blas_funcs(self):
+        self._symv, self._syr2, self._trsv, self._trmv = _blas.get_blas_funcs(("symv", "syr2", "trsv", "trmv"), 
+                                                                               (self._H,))
+    
+    def set_state(self, state):
+        super().set_state(state)
+        if self._H is not None:
+            self._get_blas_funcs()
     
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
     
     def _update_x_current(self):
         self._current_grad = self._grad(self._x_next)
         s = self._x_next - self._x_current
         y = self._current_grad - self._grad_mem[-1]
-        rho = 1. / y.dot(s)
+        ys = self._dot(y, s)
         if self._H is None:
-            self._H = _np.eye(self._x_current.shape[0]) / y.dot(y) / rho
-        Hy = self._H.dot(y)
-        Hys = _np.outer(Hy, s)
-        ss = _np.outer(s, s)
-        self._H = rho * ss + self._H - rho * Hys - rho * Hys.T + \
-                  rho**2 * y.dot(Hy) * ss
+            self._init_approximation(self._x_current, ys / self._dot(y, y))
+        if self._factored:
+            # B_new = B + y y^T / y^T s - B s s^T B / s^T B s, update is skipped if curvature condition fails
+            if ys > 0:
+                w = self._trmv(self._H, s, trans=1, lower=1)
+                Bs = self._trmv(self._H, w, lower=1)
+                _chol_rank1_update(self._H, y / _np.sqrt(ys), 1)
+                _chol_rank1_update(self._H, Bs / _np.linalg.norm(w), -1)
+        else:
+            # H_new = H + u s^T + s u^T with u = -rho H y + (rho + rho^2 y^T H y) s / 2
+            rho = 1. / ys
+            u = self._symv(-rho, self._H, y, lower=1)
+            u += 0.5 * (rho - rho * self._dot(y, u)) * s
+            self._syr2(1., u, s, a=self._H, lower=1, overwrite_a=1)
         self._x_current = self._x_next
         
-    def _get_result_x(self):
-        self._H = self._H0
-        return self._x_current
     
     
 class LBFGS(_base.LineSearchOptimizer):
     
+    '''
+    Class represents limited-memory BFGS method. Pairs (s, y) are kept in preallocated ring buffers
+    of shape (hist_size, n) together with the cached values rho = 1 / s^T y. If compact is True,
+    the direction is computed with the compact representation of Byrd, Nocedal and Schnabel
+    through a few matrix-vector products with the buffers instead of the two-loop recursion.
+    Initial approximation H of the inverse hessian is a scalar, a vector of diagonal entries or
+    a matrix, sparse matrix or LinearOperator, so no n x n matrix is created
+    '''
+    _batch_support = True
+    _in_place_support = True
+    _jit_support = True
+    _state_attrs = ("_S", "_Y", "_rho_hist", "_hist_start", "_hist_len", "_H", "_SY", "_YY")
+    
     def __init__(self, f, grad, step_size=None, 
-                 H=None, hist_size=10, **kwargs):
+                 H=None, hist_size=10, compact=False, **kwargs):
         if step_size is None:
-            step_size = _ss.Backtracking("Wolfe", rho=0.5, beta1=1e-3, beta2=0.9, init_alpha=1.)
+            step_size = _ss.MoreThuente()
         super().__init__(f, grad, step_size, memory_size=1, **kwargs)
         self._H0 = H
         self._H = H
-        self._s_hist = deque(maxlen=hist_size)
-        self._y_hist = deque(maxlen=hist_size)
+        self._hist_size = hist_size
+        self._compact = compact
+        self._S = None
+        self._warm = None
+    
+    def warm_start(self, state):
+        '''
+        Start the next solves from the pairs (s, y) and the initial approximation of the previous run
+        given by its get_state or checkpoint file. None disables warm start
+        '''
+        if isinstance(state, str):
+            state = _checkpoint.load(state)
+        if state is None or not state.get("_hist_len"):
+            self._warm = None
+            return
+        m = state["_S"].shape[0]
+        order = [(state["_hist_start"] + i) % m for i in range(state["_hist_len"])]
+        if state["_S"].ndim != 2:
+            raise NotImplementedError("Warm start from batched solve is not supported")
+        self._warm = (state["_S"][order], state["_Y"][order], state["_rho_hist"][order], state["_H"])
+    
+    def _allocate_hist(self, x):
+        m = self._hist_size
+        if self._S is None or self._S.shape[1:] != x.shape or self._S.dtype != x.dtype:
+            self._S = _np.empty((m,) + x.shape, dtype=x.dtype)
+            self._Y = _np.empty_like(self._S)
+            # Scalars per pair, for batched solve they are columns
+            col_shape = () if x.ndim == 1 else (x.shape[0], 1)
+            self._rho_hist = _np.empty((m,) + col_shape, dtype=x.dtype)
+            if self._compact:
+                # SY[i, j] = s_i^T y_j and YY[i, j] = y_i^T y_j for slots of the ring buffer
+                self._SY = _np.empty((m, m), dtype=x.dtype)
+                self._YY = _np.empty((m, m), dtype=x.dtype)
+        self._alpha_hist = _np.empty_like(self._rho_hist)
+        self._q = _np.empty_like(x)
+        self._work = _np.empty_like(x)
+    
+    def _reset_hist(self, x):
+        if self._compact and x.ndim != 1:
+            raise NotImplementedError("Compact representation does not support batched solve")
+        if self._compact and self._H0 is not None and _np.ndim(self._H0) != 0:
+            raise NotImplementedError("Compact representation supports only scalar initial approximation")
+        self._allocate_hist(x)
+        self._hist_start = 0
+        self._hist_len = 0
+        self._H = self._H0
+        if self._warm is not None:
+            if x.ndim != 1:
+                raise NotImplementedError("Warm start does not support batched solve")
+            S, Y, rho, H = self._warm
+            k = min(S.shape[0], self._hist_size)
+            self._S[:k] = S[-k:]
+            self._Y[:k] = Y[-k:]
+            self._rho_hist[:k] = rho[-k:]
+            self._hist_len = k
+            if self._H0 is None:
+                self._H = H
+            if self._compact:
+                self._SY[:k, :k] = self._S[:k].dot(self._Y[:k].T)
+                self._YY[:k, :k] = self._Y[:k].dot(self._Y[:k].T)
+    
+    def set_state(self, state):
+        super().set_state(state)
+        # Work buffers are not a part of the state
+        self._allocate_hist(self._x_current)
+    
+    def _hist_order(self):
+        return [(self._hist_start + i) % self._hist_size for i in range(self._hist_len)]
     
     def get_direction(self, x):
-        if self._H is None:
+        if self._num_iter == 1:
+            self._reset_hist(x)
             self._current_grad = self._grad(x)
-            return -self._current_grad
+        if self._H is None:
+            return _np.negative(self._current_grad, out=self._h_buf)
+        elif self._compact:
+            return self._get_compact_direction(self._current_grad)
+        else:
+            return self._get_two_loop_direction(self._current_grad)
+    
+    def _get_two_loop_direction(self, g):
+        q = self._q
+        work = self._work
+        _np.copyto(q, g)
+        order = self._hist_order()
+        for i in reversed(order):
+            self._alpha_hist[i] = _utils.rowdot(self._S[i], q) * self._rho_hist[i]
+            _np.multiply(self._Y[i], self._alpha_hist[i], out=work)
+            q -= work
+        self._apply_H0(q)
+        for i in order:
+            beta = self._rho_hist[i] * _utils.rowdot(self._Y[i], q)
+            _np.multiply(self._S[i], self._alpha_hist[i] - beta, out=work)
+            q += work
+        # q is the reused buffer, so the direction is returned in the new array or in the direction buffer
+        return _np.negative(q, out=self._h_buf)
+    
+    def _apply_H0(self, q):
+        H = self._H
+        if _sp.issparse(H) or isinstance(H, _spla.LinearOperator) or _np.ndim(H) > q.ndim:
+            q[...] = H.dot(q)
         else:
-            q = self._current_grad
-            alpha = _np.zeros(len(self._s_hist))
-            rho = _np.zeros(len(self._s_hist))
-            for i in range(len(self._s_hist) - 1, -1, -1):
-                rho[i] = 1. / self._s_hist[i].dot(self._y_hist[i])
-                alpha[i] = self._s_hist[i].dot(q) * rho[i]
-                q = q - alpha[i] * self._y_hist[i]
-            r = q * self._H
-            for i in range(len(self._s_hist)):
-                beta = rho[i] * self._y_hist[i].dot(r)
-                r = r + self._s_hist[i] * (alpha[i] - beta)
-            return -r
+            # Scalar, diagonal or column of scalars for batched solve
+            _np.multiply(q, H, out=q)
+    
+    def _get_compact_direction(self, g):
+        k = self._hist_len
+        order = self._hist_order()
+        gamma = self._H
+        # Slots 0, ..., k-1 are occupied, order maps pairs from the oldest to the newest onto slots
+        a = self._S[:k].dot(g)[order]
+        b = self._Y[:k].dot(g)[order]
+        SY = self._SY[_np.ix_(order, order)]
+        R = _np.triu(SY)
+        R_inv_a = _sla.solve_triangular(R, a)
+        p2 = -R_inv_a
+        p1 = _sla.solve_triangular(R, _np.diag(SY) * R_inv_a + gamma * self._YY[_np.ix_(order, order)].dot(R_inv_a) - gamma * b, 
+                                   trans="T")
+        c_s = _np.empty(k, dtype=g.dtype)
+        c_y = _np.empty(k, dtype=g.dtype)
+        c_s[order] = p1
+        c_y[order] = gamma * p2
+        h = c_s.dot(self._S[:k])
+        h += c_y.dot(self._Y[:k])
+        h += gamma * g
+        return _np.negative(h, out=h)
     
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
     
     def _update_x_current(self):
         self._current_grad = self._grad(self._x_next)
-        s = self._x_next - self._x_current
-        y = self._current_grad - self._grad_mem[-1]
-        self._s_hist.append(s)
-        self._y_hist.append(y)
-        if self._H is None or self._s_hist.maxlen <= len(self.convergence) - 1:
-            self._H = y.dot(s) / y.dot(y)
+        m = self._hist_size
+        slot = (self._hist_start + self._hist_len) % m
+        if self._hist_len == m:
+            self._hist_start = (self._hist_start + 1) % m
+        else:
+            self._hist_len += 1
+        s = self._S[slot]
+        y = self._Y[slot]
+        _np.subtract(self._x_next, self._x_current, out=s)
+        _np.subtract(self._current_grad, self._grad_mem[-1], out=y)
+        ys = self._dot(y, s)
+        self._rho_hist[slot] = 1. / ys
+        # Diagonal or operator initial approximation given by user is kept along iterations
+        if self._H is None or (m <= self._num_iter - 1 and _np.ndim(self._H0) == 0):
+            self._H = self._cast(ys / self._dot(y, y))
+        if self._compact:
+            k = self._hist_len
+            self._SY[slot, :k] = self._Y[:k].dot(s)
+            self._SY[:k, slot] = self._S[:k].dot(y)
+            self._YY[slot, :k] = self._Y[:k].dot(y)
+            self._YY[:k, slot] = self._YY[slot, :k]
         self._x_current = self._x_next
         
-    def _get_result_x(self):
-        self._H = self._H0
-        return self._x_current
+    
+    def _jit_params(self):
+        if self._compact or self._warm is not None or _np.ndim(self._H0) != 0:
+            return None
+        return super()._jit_params()
+    
+    def _solve_jit(self, max_iter, tol):
+        rule, alpha, rho, beta = self._jit_params()
+        H0 = _np.nan if self._H0 is None else float(self._H0)
+        return self._finish_jit(*_jit.lbfgs_loop(self._oracle._f_fun, self._oracle._grad_fun, self._x_current, 
+                                                 max_iter, tol, rule, alpha, rho, beta, self._jit_store(), 
+                                                 self._hist_size, H0))
     
     
 class DFP(_base.LineSearchOptimizer):
     
+    '''
+    Class represents DFP method. Approximation of the inverse hessian is updated in place 
+    by two symmetric rank-1 BLAS updates of its lower triangle
+    '''
+    _in_place_support = True
+    _state_attrs = ("_H",)
+    
     def __init__(self, f, grad, step_size=None, 
                  H=None, **kwargs):
         if step_size is None:
-            step_size = _ss.Backtracking("Wolfe", rho=0.5, beta1=1e-3, beta2=0.9, init_alpha=1.)
+            step_size = _ss.MoreThuente()
         super().__init__(f, grad, step_size, memory_size=2, **kwargs)
         self._H0 = H
         self._H = H
     
     def get_direction(self, x):
-        if self._H is None:
+        if self._num_iter == 1:
             self._current_grad = self._grad(x)
-            return -self._current_grad
+            self._H = None
+            if self._H0 is not None:
+                self._init_approximation(x)
+        if self._H is None:
+            return _np.negative(self._current_grad, out=self._h_buf)
         else:
-            return -self._H.dot(self._current_grad)
+            return self._symv(-1., self._H, self._current_grad, lower=1)
+    
+    def _init_approximation(self, x, diag=None):
+        self._H = _init_matrix(x, self._H0, diag)
+        self._get_blas_funcs()
+    
+    def _get_blas_funcs(self):
+        self._symv, self._syr = _blas.get_blas_funcs(("symv", "syr"), (self._H,))
+    
+    def set_state(self, state):
+        super().set_state(state)
+        if self._H is not None:
+            self._get_blas_funcs()
     
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
     
     def _update_x_current(self):
         self._current_grad = self._grad(self._x_next)
         s = self._x_next - self._x_current
         y = self._current_grad - self._grad_mem[-1]
-        rho = 1. / y.dot(s)
+        rho = 1. / self._dot(y, s)
         if self._H is None:
-            self._H = _np.eye(self._x_current.shape[0]) / y.dot(y) / rho
-        Hy = self._H.dot(y)
-        self._H = self._H - ((_np.outer(Hy, Hy)) / (y.dot(Hy))) + (_np.outer(s, s) * rho)
+            self._init_approximation(self._x_current, 1. / self._dot(y, y) / rho)
+        Hy = self._symv(1., self._H, y, lower=1)
+        self._syr(-1. / self._dot(y, Hy), Hy, a=self._H, lower=1, overwrite_a=1)
+        self._syr(rho, s, a=self._H, lower=1, overwrite_a=1)
         self._x_current = self._x_next
         
-    def _get_result_x(self):
-        self._H = self._H0
-        return self._x_current
     
 class BarzilaiBorweinMethod(_base.LineSearchOptimizer):
+    _batch_support = True
+    _in_place_support = True
+    _jit_support = True
+    
     def __init__(self, f, grad, **kwargs):
         super().__init__(f, grad, None, memory_size=2, **kwargs)
     
     def get_direction(self, x):
         self._current_grad = self._grad(x)
-        return -self._current_grad
+        return _np.negative(self._current_grad, out=self._h_buf)
     
     def get_stepsize(self):
-        if len(self.convergence) == 1:
+        if self._num_iter == 1:
             return self._par["init_alpha"]
         else:
             g = self._grad_mem[-1] - self._grad_mem[-2]
-            s = self.convergence[-1] - self.convergence[-2]
+            s = self._x_mem[-1] - self._x_mem[-2]
             if self._par["type"] == 1:
-                alpha = g.dot(s) / g.dot(g)
+                alpha = self._dot(g, s) / self._dot(g, g)
             elif self._par["type"] == 2:
-                alpha = s.dot(s) / g.dot(s)
-            return alpha
\ No newline at end of file
+                alpha = self._dot(s, s) / self._dot(g, s)
+            return alpha
+    
+    def _jit_params(self):
+        return self._par["init_alpha"], self._par["type"]
+    
+    def _solve_jit(self, max_iter, tol):
+        alpha, bb_type = self._jit_params()
+        return self._finish_jit(*_jit.bb_loop(self._oracle._f_fun, self._oracle._grad_fun, self._x_current, 
+                                              max_iter, tol, alpha, bb_type, self._jit_store()))
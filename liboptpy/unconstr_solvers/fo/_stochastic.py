@@ -0,0 +1,134 @@
+import numpy as _np
+from ... import base_optimizer as _base
+
+class SGD(_base.StochasticOptimizer):
+    '''
+    Class represents stochastic gradient descent with the minibatch gradient as direction,
+    decreasing step sizes InvIterStepSize and InvSqrootIterStepSize give the classical schedules
+    '''
+    def get_direction(self, x):
+        idx = self._next_batch()
+        self._current_grad = self._problem.grad_batch(x, idx)
+        return -self._current_grad
+
+class MomentumSGD(_base.StochasticOptimizer):
+    '''
+    Class represents stochastic gradient descent with heavy-ball momentum v = momentum * v + g and direction -v
+    or with Nesterov momentum and direction -(g + momentum * v)
+    '''
+    _state_attrs = _base.StochasticOptimizer._state_attrs + ("_v",)
+
+    def __init__(self, problem, step_size, momentum=0.9, nesterov=False, **kwargs):
+        super().__init__(problem, step_size, **kwargs)
+        self._momentum = momentum
+        self._nesterov = nesterov
+
+    def get_direction(self, x):
+        idx = self._next_batch()
+        self._current_grad = self._problem.grad_batch(x, idx)
+        if self._num_iter == 1:
+            self._v = _np.zeros_like(self._current_grad)
+        self._v = self._momentum * self._v + self._current_grad
+        if self._nesterov:
+            return -(self._current_grad + self._momentum * self._v)
+        return -self._v
+
+class Adam(_base.StochasticOptimizer):
+    '''
+    Class represents Adam method with bias-corrected estimates of the first and the second moments of gradient,
+    step size is the base learning rate
+    '''
+    _state_attrs = _base.StochasticOptimizer._state_attrs + ("_m", "_v")
+
+    def __init__(self, problem, step_size, beta1=0.9, beta2=0.999, eps=1e-8, **kwargs):
+        super().__init__(problem, step_size, **kwargs)
+        self._beta1 = beta1
+        self._beta2 = beta2
+        self._eps = eps
+
+    def get_direction(self, x):
+        idx = self._next_batch()
+        g = self._problem.grad_batch(x, idx)
+        self._current_grad = g
+        if self._num_iter == 1:
+            self._m = _np.zeros_like(g)
+            self._v = _np.zeros_like(g)
+        self._m = self._beta1 * self._m + (1 - self._beta1) * g
+        self._v = self._beta2 * self._v + (1 - self._beta2) * g * g
+        m_hat = self._m / (1 - self._beta1**self._num_iter)
+        v_hat = self._v / (1 - self._beta2**self._num_iter)
+        return -m_hat / (_np.sqrt(v_hat) + self._eps)
+
+class SVRG(_base.StochasticOptimizer):
+    '''
+    Class represents stochastic variance reduced gradient method. Full gradient mu is computed
+    in the snapshot point in the beginning of every epoch and direction is -(g_B(x) - g_B(x_snap) + mu).
+    For linear models coefficients of samples in the snapshot are kept, m scalars, so every iteration
+    computes one minibatch gradient instead of two. Convergence check by gradient reuses mu
+    '''
+    _state_attrs = _base.StochasticOptimizer._state_attrs + ("_x_snap", "_mu", "_c_snap")
+
+    def get_direction(self, x):
+        idx = self._next_batch()
+        linear = hasattr(self._problem, "coef")
+        if self._new_epoch:
+            self._x_snap = x
+            if linear:
+                self._c_snap, self._mu = self._problem.full_coef(x)
+            else:
+                self._mu = self._grad(x)
+        if linear:
+            c = self._problem.coef(x, idx)
+            g = (self._problem.grad_from_coef(idx, c - self._c_snap[idx]) + self._mu
+                 + self._problem.lam * (x - self._x_snap))
+        else:
+            g = self._problem.grad_batch(x, idx) - self._problem.grad_batch(self._x_snap, idx) + self._mu
+        self._current_grad = g
+        return -g
+
+    def _epoch_grad(self):
+        return self._mu
+
+class SAGA(_base.StochasticOptimizer):
+    '''
+    Class represents SAGA method with the table of the last computed gradients of samples
+    and direction -(g_B(x) - table_B + mean(table)). For linear models the table keeps m scalar coefficients,
+    otherwise it is the m x n matrix of gradients. The table is stored in table_dtype, by default the type of iterates,
+    and initialized by a pass in the initial point
+    '''
+    _state_attrs = _base.StochasticOptimizer._state_attrs + ("_table", "_table_mean")
+
+    def __init__(self, problem, step_size, table_dtype=None, **kwargs):
+        super().__init__(problem, step_size, **kwargs)
+        self._table_dtype = table_dtype
+
+    def get_direction(self, x):
+        # Repeated indices of sampling with replacement are counted once in the table update
+        idx = _np.unique(self._next_batch())
+        m = self._problem.num_samples
+        linear = hasattr(self._problem, "coef")
+        dtype = x.dtype if self._table_dtype is None else self._table_dtype
+        if self._num_iter == 1:
+            if linear:
+                self._table, self._table_mean = self._problem.full_coef(x, dtype)
+                self._table_mean = self._table_mean - self._problem.lam * x
+            else:
+                self._table = _np.empty((m, x.shape[0]), dtype=dtype)
+                for chunk in self._problem.chunks():
+                    self._table[chunk] = self._problem.grad_samples(x, chunk)
+                self._table_mean = _np.mean(self._table, axis=0, dtype=x.dtype)
+        if linear:
+            c = self._problem.coef(x, idx)
+            diff = self._problem.grad_from_coef(idx, c - self._table[idx])
+            self._table[idx] = c
+        else:
+            grads = self._problem.grad_samples(x, idx)
+            delta = grads - self._table[idx]
+            self._table[idx] = grads
+            diff = _np.mean(delta, axis=0)
+        g = diff + self._table_mean
+        if linear:
+            g = g + self._problem.lam * x
+        self._table_mean = self._table_mean + diff * len(idx) / m
+        self._current_grad = g
+        return -g
@@ -2,12 +2,17 @@ from ... import base_optimizer as _base
 import numpy as np
 
 class SubgradientMethod(_base.LineSearchOptimizer):
-    def __init__(self, f, subgrad, step_size):
-        super().__init__(f, subgrad, step_size)
+    _state_attrs = ("_x_best", "_f_best")
+    
+    def __init__(self, f, subgrad, step_size, **kwargs):
+        super().__init__(f, subgrad, step_size, **kwargs)
         self._x_best = None
         self._f_best = np.inf
     
     def get_direction(self, x):
+        if self._num_iter == 1:
+            self._x_best = None
+            self._f_best = np.inf
         self._current_grad = self._grad(x)
         return -self._current_grad
     
@@ -19,7 +24,7 @@ class SubgradientMethod(_base.LineSearchOptimizer):
         return False
     
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self._x_current, len(self.convergence))
+        return self._step_size.get_stepsize(self._h, self._x_current, self._num_iter)
     
     def _print_info(self):
         pass
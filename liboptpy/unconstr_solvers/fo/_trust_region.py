@@ -0,0 +1,60 @@
+import numpy as _np
+from ... import base_optimizer as _base
+from ... import subproblems as _sub
+
+class TrustRegionQuasiNewton(_base.TrustRegionOptimizer):
+    '''
+    Class represents trust-region quasi-Newton method with dense approximation B of the hessian
+    updated by symmetric rank-1 (update="SR1") or BFGS (update="BFGS") formula after every trial step,
+    accepted or rejected. SR1 approximation may be indefinite, which the trust region handles.
+    Subproblem is solved by Steihaug-Toint CG (subproblem="steihaug") or by dogleg (subproblem="dogleg"),
+    dogleg falls back to CG if B is not positive definite. If B is None, the initial approximation
+    is the identity scaled by y^T y / y^T s after the first step
+    '''
+    def __init__(self, f, grad, update="SR1", subproblem="steihaug", B=None, **kwargs):
+        super().__init__(f, grad, **kwargs)
+        if update not in ("SR1", "BFGS"):
+            raise ValueError("Available updates are 'SR1' and 'BFGS'")
+        if subproblem not in ("steihaug", "dogleg"):
+            raise ValueError("Available subproblem solvers are 'steihaug' and 'dogleg'")
+        self._update = update
+        self._subproblem = subproblem
+        self._B0 = B
+        self._B = None
+
+    def _reset_model(self, x):
+        if self._B0 is None:
+            self._B = _np.eye(x.shape[0], dtype=x.dtype)
+            self._scaled = False
+        else:
+            self._B = _np.array(self._B0, dtype=x.dtype)
+            self._scaled = True
+
+    def _set_model(self, x):
+        pass
+
+    def solve_subproblem(self, g, radius):
+        if self._subproblem == "dogleg":
+            try:
+                return _sub.dogleg(g, self._B, radius)
+            except _np.linalg.LinAlgError:
+                pass
+        p, Bp, _ = _sub.steihaug_cg(g, self._B.dot, radius)
+        return p, Bp
+
+    def _update_model(self, s, x_trial, accepted):
+        # Gradient in the trial point is taken from the cache of the oracle if the step is accepted
+        y = self._grad(x_trial) - self._current_grad
+        ys = y.dot(s)
+        if not self._scaled and ys > 0:
+            self._B *= y.dot(y) / ys
+            self._scaled = True
+        Bs = self._B.dot(s)
+        if self._update == "SR1":
+            v = y - Bs
+            vs = v.dot(s)
+            # Update is skipped if the denominator is small
+            if abs(vs) >= 1e-8 * _np.linalg.norm(s) * _np.linalg.norm(v):
+                self._B += _np.outer(v, v / vs)
+        elif ys > 0:
+            self._B += _np.outer(y, y / ys) - _np.outer(Bs, Bs / s.dot(Bs))
@@ -1,4 +1,5 @@
-from ._newton import NewtonMethod
+from ._newton import NewtonMethod, LazyNewtonMethod
 from ._inexact_newton import InexactNewtonMethod
+from ._trust_region import TrustRegionNewtonCG, TrustRegionDogleg
 
-__all__ = ["NewtonMethod", "InexactNewtonMethod"]
\ No newline at end of file
+__all__ = ["NewtonMethod", "LazyNewtonMethod", "InexactNewtonMethod", "TrustRegionNewtonCG", "TrustRegionDogleg"]
\ No newline at end of file
@@ -1,25 +1,85 @@
 import numpy as np
 from ... import base_optimizer as base
-from ..fo import _cg as cg
+from ... import preconditioners as precond
 
 class InexactNewtonMethod(base.LineSearchOptimizer):
-    def __init__(self, f, grad, hess_matvec, step_size, **kwargs):
+    '''
+    Class represents matrix-free truncated Newton method (Newton-CG). Direction is found by preconditioned CG
+    applied to the Newton system, which stops when the relative residual is below min(0.5, sqrt(||g||)),
+    when direction of non-positive curvature is met (Steihaug rule) or after max_cg_iter hessian-vector products.
+    hess_matvec(x) returns function v -> H(x)v, matrix or LinearOperator, if it is None,
+    hessian-vector product is taken from the oracle given by f_grad_hessvec.
+    If warm_start is True, CG starts from the previous direction when it decreases the quadratic model.
+    Preconditioner is None, function r -> M^{-1} r, matrix or LinearOperator approximating the inverse hessian,
+    or LBFGSPreconditioner updated by the pairs (s, y) of the outer iterations
+    '''
+    _state_attrs = ("_h_prev", "_num_hessvec")
+    
+    def __init__(self, f, grad, hess_matvec, step_size, precond=None, max_cg_iter=None, warm_start=False, **kwargs):
         super().__init__(f, grad, step_size, **kwargs)
         self._hess_matvec = hess_matvec
-    
+        self._precond = precond
+        self._max_cg_iter = max_cg_iter
+        self._warm_start = warm_start
+        self._num_hessvec = 0
+
+    def get_num_hessvec(self):
+        return self._num_hessvec
+
     def get_direction(self, x):
         self._current_grad = self._grad(x)
-        hess = self._hess_matvec(x)
-        lin_cg = cg.ConjugateGradientQuad(hess, -self._current_grad)
-        eta = np.minimum(0.5, np.sqrt(np.linalg.norm(self._current_grad)))
-        h = np.zeros(self._current_grad.shape[0])
-        while True:
-            h = lin_cg.solve(x0=h, tol=eta)
-            if h.dot(self._current_grad) < 0:
+        g = self._current_grad
+        if self._num_iter == 1:
+            self._h_prev = None
+            self._num_hessvec = 0
+            if hasattr(self._precond, "reset"):
+                self._precond.reset()
+        elif hasattr(self._precond, "update"):
+            self._precond.update(x - self._x_mem[-2], g - self._grad_mem[-1])
+        if self._hess_matvec is None:
+            hessvec = self._oracle.hessvec(x)
+        else:
+            hessvec = self._hess_matvec(x)
+        if hasattr(hessvec, "dot"):
+            hessvec = hessvec.dot
+        apply_precond = precond.as_preconditioner(self._precond)
+        max_cg_iter = g.shape[0] if self._max_cg_iter is None else self._max_cg_iter
+        g_norm = np.linalg.norm(g)
+        tol = min(0.5, np.sqrt(g_norm)) * g_norm
+        h = np.zeros_like(g)
+        r = -g
+        if self._warm_start and self._h_prev is not None and max_cg_iter > 0:
+            Hh = hessvec(self._h_prev)
+            self._num_hessvec += 1
+            max_cg_iter -= 1
+            if g.dot(self._h_prev) + 0.5 * self._h_prev.dot(Hh) < 0:
+                h = self._h_prev.copy()
+                r = r - Hh
+        z = apply_precond(r)
+        d = z.copy()
+        rz = r.dot(z)
+        for _ in range(max_cg_iter):
+            if np.linalg.norm(r) <= tol:
                 break
-            else:
-                eta = eta / 10.
+            Hd = hessvec(d)
+            self._num_hessvec += 1
+            curv = d.dot(Hd)
+            if curv <= 0:
+                # Non-positive curvature, on the first iteration the preconditioned steepest descent direction is taken
+                if not h.any():
+                    h = d
+                break
+            alpha = rz / curv
+            h += alpha * d
+            r -= alpha * Hd
+            z = apply_precond(r)
+            rz_next = r.dot(z)
+            d = z + (rz_next / rz) * d
+            rz = rz_next
+        if h.dot(g) >= 0:
+            h = -g
+        self._h_prev = h
         return h
-    
+
     def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
\ No newline at end of file
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
@@ -1,21 +1,157 @@
+import inspect as _inspect
 import numpy as _np
+import scipy.linalg as _sla
+import scipy.sparse as _sp
+import scipy.sparse.linalg as _spla
 from ... import base_optimizer as _base
+from ... import kkt as _kkt
+
+try:
+    from sksparse.cholmod import cholesky as _cholmod
+except ImportError:
+    _cholmod = None
+
+# Relative tolerance of CG is called rtol since scipy 1.12 and tol before
+_cg_tol_name = "rtol" if "rtol" in _inspect.signature(_spla.cg).parameters else "tol"
 
 class NewtonMethod(_base.LineSearchOptimizer):
-    def __init__(self, f, grad, hess, step_size, linsolver=None, **kwargs):
+    '''
+    Class represents Newton method. Hessian can be a dense matrix, a scipy.sparse matrix or a LinearOperator.
+    Sparse systems are solved by sparse Cholesky factorization if scikit-sparse is installed and by sparse LU otherwise,
+    systems with LinearOperator are solved by CG with relative tolerance cg_tol.
+    Custom linsolver(hess, rhs) overrides this choice
+    '''
+    def __init__(self, f, grad, hess, step_size, linsolver=None, cg_tol=1e-8, cg_maxiter=None, **kwargs):
         super().__init__(f, grad, step_size, **kwargs)
         self._hess = hess
         self._linsolver = linsolver
+        self._cg_tol = cg_tol
+        self._cg_maxiter = cg_maxiter
     
     def get_direction(self, x):
         self._current_grad = self._grad(x)
         hess = self._hess(x)
         if self._linsolver:
             h = self._linsolver(hess, -self._current_grad)
+        elif _sp.issparse(hess):
+            h = self._sparse_solve(hess, -self._current_grad)
+        elif isinstance(hess, _spla.LinearOperator):
+            h, _ = _spla.cg(hess, -self._current_grad, maxiter=self._cg_maxiter,
+                             **{_cg_tol_name: self._cg_tol})
+            if h.dot(self._current_grad) >= 0:
+                # Inaccurate solution is not a descent direction
+                h = -self._current_grad
         else:
             h = _np.linalg.solve(hess, -self._current_grad)
         return h
     
-    def get_stepsize(self):
-        return self._step_size.get_stepsize(self._h, self.convergence[-1], len(self.convergence))
+    def _sparse_solve(self, hess, rhs):
+        if _cholmod is not None:
+            return _cholmod(_sp.csc_matrix(hess))(rhs)
+        # Symmetric mode of SuperLU: ordering of A + A^T and diagonal pivoting
+        lu = _spla.splu(_sp.csc_matrix(hess), permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.,
+                        options={"SymmetricMode": True})
+        return lu.solve(rhs)
     
+    def get_stepsize(self):
+        return self._step_size.get_stepsize(self._h, self._x_mem[-1], self._num_iter)
+
+class LazyNewtonMethod(NewtonMethod):
+    '''
+    Class represents Newton method with lazy Hessian (Shamanskii method). Hessian is recomputed and factorized
+    every refresh_every iterations, when the gradient norm decreases less than by the factor stall_tol
+    and when the kept factorization does not give a descent direction. Other iterations cost two triangular solves.
+    Dense Hessian is factorized by Cholesky, if it is not positive definite, it is shifted by (delta - lambda_min) I,
+    where lambda_min is the smallest eigenvalue and delta = shift * max(1, max_i |H_ii|). Sparse Hessian is factorized
+    by liboptpy.kkt.KKTSolver with reused ordering and diagonal pivoting, which shows if it is positive definite
+    '''
+    _state_attrs = ("_x_hess", "_tau", "_age", "_grad_norm_prev", "_num_hess", "_num_factorizations", "_num_shifts")
+
+    def __init__(self, f, grad, hess, step_size, refresh_every=5, stall_tol=0.5, shift=1e-8, kkt_solver=None, **kwargs):
+        super().__init__(f, grad, hess, step_size, **kwargs)
+        self._refresh_every = refresh_every
+        self._stall_tol = stall_tol
+        self._shift = shift
+        self._kkt = _kkt.KKTSolver(diag_pivot_thresh=0.) if kkt_solver is None else kkt_solver
+        self._solve_fun = None
+        self._num_hess = 0
+        self._num_shifts = 0
+        self._num_factorizations = 0
+
+    def get_num_hess(self):
+        return self._num_hess
+
+    def get_num_factorizations(self):
+        return self._num_factorizations
+
+    def get_num_shifts(self):
+        return self._num_shifts
+
+    def set_state(self, state):
+        super().set_state(state)
+        # Factorization is not a part of the state, it is recomputed in the same point with the same shift
+        self._solve_fun = None
+
+    def get_direction(self, x):
+        if self._num_iter == 1:
+            self._solve_fun = None
+            self._x_hess = None
+            self._num_hess = 0
+            self._num_shifts = 0
+            self._num_factorizations = 0
+        self._current_grad = self._grad(x)
+        grad_norm = _np.linalg.norm(self._current_grad)
+        if self._solve_fun is None and self._x_hess is not None:
+            self._factorize(self._hess(self._x_hess), self._tau)
+            self._num_hess += 1
+        refresh = (self._solve_fun is None or self._age >= self._refresh_every or
+                   grad_norm > self._stall_tol * self._grad_norm_prev)
+        if not refresh:
+            h = self._solve_fun(-self._current_grad)
+            # Outdated Hessian does not give a descent direction
+            refresh = not h.dot(self._current_grad) < 0
+        if refresh:
+            h = self._refresh(x)
+        self._age += 1
+        self._grad_norm_prev = grad_norm
+        return h
+
+    def _refresh(self, x):
+        hess = self._hess(x)
+        self._num_hess += 1
+        self._x_hess = x
+        self._age = 0
+        if not self._factorize(hess, 0.):
+            tau = self._get_shift(hess)
+            # Rounding errors of the smallest eigenvalue
+            while not self._factorize(hess, tau):
+                tau *= 2
+        return self._solve_fun(-self._current_grad)
+
+    def _get_shift(self, hess):
+        self._num_shifts += 1
+        if _sp.issparse(hess):
+            lam_min = _spla.eigsh(_sp.csc_matrix(hess, dtype=float), k=1, which="SA", return_eigenvectors=False)[0]
+        else:
+            lam_min = _sla.eigh(hess, eigvals_only=True, subset_by_index=[0, 0])[0]
+        return max(0., -lam_min) + self._shift * max(1., abs(hess.diagonal()).max())
+
+    def _factorize(self, hess, tau):
+        # Returns False if Hessian is not positive definite, shifted one is used anyway
+        self._tau = tau
+        self._num_factorizations += 1
+        if _sp.issparse(hess):
+            self._kkt.factorize(hess + tau * _sp.identity(hess.shape[0], format="csc") if tau > 0 else hess)
+            self._solve_fun = lambda r: self._kkt.solve_factorized(r)[0]
+            return tau > 0 or self._kkt.positive_definite
+        try:
+            factor = _sla.cho_factor(hess + tau * _np.eye(hess.shape[0]) if tau > 0 else hess)
+        except _np.linalg.LinAlgError:
+            self._solve_fun = None
+            return False
+        self._solve_fun = lambda r: _sla.cho_solve(factor, r)
+        return True
+
+    def _print_info(self):
+        print("Norm of gradient = {}, Hessian evaluations = {}, factorizations = {}".format(
+            _np.linalg.norm(self._current_grad), self._num_hess, self._num_factorizations))
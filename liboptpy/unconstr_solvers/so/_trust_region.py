@@ -0,0 +1,68 @@
+import numpy as _np
+import scipy.linalg as _sla
+from ... import base_optimizer as _base
+from ... import subproblems as _sub
+
+class TrustRegionNewtonCG(_base.TrustRegionOptimizer):
+    '''
+    Class represents trust-region Newton method with subproblem solved by Steihaug-Toint truncated CG,
+    so only hessian-vector products are needed and indefinite hessians are handled by steps to the boundary.
+    hess_matvec(x) returns function v -> H(x)v, matrix or LinearOperator, if it is None,
+    hessian-vector product is taken from the oracle given by f_grad_hessvec
+    '''
+    def __init__(self, f, grad, hess_matvec, max_cg_iter=None, **kwargs):
+        super().__init__(f, grad, **kwargs)
+        self._hess_matvec = hess_matvec
+        self._max_cg_iter = max_cg_iter
+        self._num_hessvec = 0
+
+    def get_num_hessvec(self):
+        return self._num_hessvec
+
+    def _reset_model(self, x):
+        self._num_hessvec = 0
+
+    def _set_model(self, x):
+        if self._hess_matvec is None:
+            hessvec = self._oracle.hessvec(x)
+        else:
+            hessvec = self._hess_matvec(x)
+        self._hessvec = hessvec.dot if hasattr(hessvec, "dot") else hessvec
+
+    def solve_subproblem(self, g, radius):
+        p, Bp, num_hessvec = _sub.steihaug_cg(g, self._hessvec, radius, max_iter=self._max_cg_iter)
+        self._num_hessvec += num_hessvec
+        return p, Bp
+
+class TrustRegionDogleg(_base.TrustRegionOptimizer):
+    '''
+    Class represents trust-region Newton method with dogleg steps. Hessian is a dense matrix, it is factorized
+    once per accepted point and the Newton point is reused after rejected steps.
+    If hessian is not positive definite or it is sparse, the subproblem is solved by Steihaug-Toint CG
+    '''
+    def __init__(self, f, grad, hess, **kwargs):
+        super().__init__(f, grad, **kwargs)
+        self._hess = hess
+        self._num_hess = 0
+
+    def get_num_hess(self):
+        return self._num_hess
+
+    def _reset_model(self, x):
+        self._num_hess = 0
+
+    def _set_model(self, x):
+        self._B = self._hess(x)
+        self._num_hess += 1
+        self._p_newton = None
+        if isinstance(self._B, _np.ndarray):
+            try:
+                self._p_newton = -_sla.cho_solve(_sla.cho_factor(self._B), self._current_grad)
+            except _np.linalg.LinAlgError:
+                pass
+
+    def solve_subproblem(self, g, radius):
+        if self._p_newton is None:
+            p, Bp, _ = _sub.steihaug_cg(g, self._B.dot, radius)
+            return p, Bp
+        return _sub.dogleg(g, self._B, radius, self._p_newton)
@@ -0,0 +1,24 @@
+import numpy as np
+
+__all__ = ["rowdot", "rownorm"]
+
+def rowdot(a, b, dtype=None):
+    '''
+    Dot product of two vectors or row-wise dot products of two batches of vectors given as a column.
+    If dtype is given, products are accumulated in it, e.g. in float64 for float32 vectors
+    '''
+    if dtype is not None and np.result_type(a, b) != dtype:
+        if a.ndim == 1:
+            return np.einsum("i,i->", a, b, dtype=dtype)
+        return np.einsum("ij,ij->i", a, b, dtype=dtype)[:, np.newaxis]
+    if a.ndim == 1:
+        return a.dot(b)
+    return np.einsum("ij,ij->i", a, b)[:, np.newaxis]
+
+def rownorm(a):
+    '''
+    Norm of vector or row-wise norms of batch of vectors given as a column
+    '''
+    if a.ndim == 1:
+        return np.linalg.norm(a)
+    return np.linalg.norm(a, axis=1, keepdims=True)
@@ -7,8 +7,9 @@ setup(
     author='Alexandr Katrutsa',
     author_email="aleksandr.katrutsa@phystech.edu",
     packages=['liboptpy', 'liboptpy.unconstr_solvers','liboptpy.unconstr_solvers.fo', 'liboptpy.unconstr_solvers.so',
-             'liboptpy.constr_solvers'],
+             'liboptpy.constr_solvers', 'liboptpy.benchmarks'],
     install_requires=['numpy>=1.12', 'scipy>=1.0'],
+    extras_require={'jit': ['numba']},
     keywords=[ 'Convex optimization', 'numerical optimization', 
               'Python', 'Numpy', 'Scipy'],
     url='https://github.com/amkatrutsa/liboptpy',
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import liboptpy.constr_solvers as methods
+import liboptpy.step_size as ss
+from liboptpy import prox
+
+rng = np.random.RandomState(0)
+m, n, lam = 60, 150, 0.05
+D = rng.randn(m, n) / np.sqrt(m)
+b = D.dot(rng.randn(n) * (rng.rand(n) < 0.1)) + 0.01 * rng.randn(m)
+P, q = D.T.dot(D), -D.T.dot(b)
+F = lambda x: 0.5 * np.sum((D.dot(x) - b)**2) + lam * np.sum(np.abs(x))
+x0 = np.zeros(n)
+
+def lasso_solution():
+    solver = methods.FISTA(lambda x: 0.5 * np.sum((D.dot(x) - b)**2), lambda x: D.T.dot(D.dot(x) - b), prox.L1(lam),
+                           ss.ConstantStepSize(1 / np.linalg.norm(D, 2)**2))
+    return solver.solve(x0, 20000, 1e-12)
+
+x_lasso = lasso_solution()
+
+@pytest.mark.parametrize("relax", [1., 1.6])
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_lasso(relax, adaptive):
+    solver = methods.ADMM(P, q, prox.L1(lam), relax=relax, adaptive=adaptive)
+    x = solver.solve(x0, 2000, 1e-10)
+    assert np.allclose(solver.get_z(), x_lasso, atol=1e-7)
+    assert np.allclose(x, solver.get_z(), atol=1e-7)
+    assert len(solver.convergence) < 300
+    # Matrix is factorized in the first iteration and after every change of rho
+    assert solver.get_kkt_solver().num_factorizations == 1 + solver.get_num_adapts()
+
+def test_over_relaxation_is_faster():
+    plain = methods.ADMM(P, q, prox.L1(lam), adaptive=False)
+    plain.solve(x0, 2000, 1e-10)
+    relaxed = methods.ADMM(P, q, prox.L1(lam), relax=1.6, adaptive=False)
+    relaxed.solve(x0, 2000, 1e-10)
+    assert len(relaxed.convergence) < len(plain.convergence)
+    with pytest.raises(ValueError):
+        methods.ADMM(P, q, prox.L1(lam), relax=2.)
+
+def test_residual_balancing():
+    # Bad initial rho is fixed by adaptation
+    fixed = methods.ADMM(P, q, prox.L1(lam), rho=1e3, adaptive=False)
+    fixed.solve(x0, 3000, 1e-8)
+    adaptive = methods.ADMM(P, q, prox.L1(lam), rho=1e3, adapt_every=5)
+    adaptive.solve(x0, 3000, 1e-8)
+    assert adaptive.get_num_adapts() > 0 and adaptive.get_rho() < 1e3
+    assert len(adaptive.convergence) < len(fixed.convergence)
+
+def test_sparse_box_qp():
+    k = 500
+    P2 = sp.diags([-np.ones(k - 1), 4 * np.ones(k), -np.ones(k - 1)], [-1, 0, 1], format="csc")
+    q2 = 3 * rng.randn(k)
+    f = lambda x: 0.5 * x.dot(P2.dot(x)) + q2.dot(x)
+    grad = lambda x: P2.dot(x) + q2
+    projector = lambda y: np.clip(y, 0, 1)
+    x_pgd = methods.ProjectedGD(f, grad, projector, ss.ConstantStepSize(1 / 6.)).solve(np.zeros(k), 5000, 1e-15)
+    # Projector of ProjectedGD is accepted as it is
+    solver = methods.ADMM(P2, q2, projector, A=sp.identity(k, format="csr"), relax=1.6)
+    solver.solve(np.zeros(k), 1000, 1e-9)
+    assert np.allclose(solver.get_z(), x_pgd, atol=1e-6)
+    assert solver.get_kkt_solver().num_orderings == 1
+
+def test_augmented_lagrangian():
+    k = 40
+    C, d = rng.randn(5, k), rng.randn(5)
+    P2 = np.diag(rng.rand(k) + 0.1)
+    q2 = rng.randn(k)
+    z = np.linalg.solve(np.block([[P2, C.T], [C, np.zeros((5, 5))]]), np.concatenate([-q2, d]))
+    solver = methods.AugmentedLagrangian(P2, q2, C, d)
+    x = solver.solve(np.zeros(k), 100, 1e-10)
+    assert np.allclose(x, z[:k]) and np.allclose(solver.get_dual(), z[k:])
+    assert len(solver.convergence) < 20
+
+def test_resume():
+    make = lambda: methods.ADMM(P, q, prox.L1(lam), relax=1.6, adapt_every=3)
+    x_straight = make().solve(x0, 60, 0)
+    first = make()
+    first.solve(x0, 25, 0)
+    x_resumed = make().resume(first.get_state(), 60, 0)
+    assert np.allclose(x_resumed, x_straight, rtol=1e-12, atol=1e-14)
+
+def test_as_prox():
+    v = rng.randn(n)
+    assert np.allclose(prox.as_prox(lambda y: np.clip(y, 0, 1))(v, 0.1), np.clip(v, 0, 1))
+    assert np.allclose(prox.as_prox(prox.L1(1.))(v, 0.5), prox.L1(1.)(v, 0.5))
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+
+rng = np.random.RandomState(1)
+n = 20
+N = 6
+A = np.diag(np.linspace(1., 30., n))
+B = rng.randn(N, n)
+X0 = rng.randn(N, n)
+f_batch = lambda X: 0.5 * np.sum(X * X.dot(A), axis=1) - np.sum(B * X, axis=1)
+grad_batch = lambda X: X.dot(A) - B
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+methods = {
+    "GD": lambda f, grad: solvers.fo.GradientDescent(f, grad, armijo()),
+    "GD constant": lambda f, grad: solvers.fo.GradientDescent(f, grad, ss.ConstantStepSize(1. / 30)),
+    "AGD": lambda f, grad: solvers.fo.AcceleratedGD(f, grad, ss.ConstantStepSize(1. / 30)),
+    "BB": lambda f, grad: solvers.fo.BarzilaiBorweinMethod(f, grad, init_alpha=1e-2, type=1),
+    "LBFGS": lambda f, grad: solvers.fo.LBFGS(f, grad, armijo()),
+}
+
+def single_solve(make_solver, i, max_iter=500, tol=1e-6):
+    f = lambda x: 0.5 * x.dot(A.dot(x)) - B[i].dot(x)
+    grad = lambda x: A.dot(x) - B[i]
+    return make_solver(f, grad).solve(X0[i], max_iter, tol)
+
+@pytest.mark.parametrize("name", sorted(methods))
+def test_batch_rows_match_single_solves(name):
+    solver = methods[name](f_batch, grad_batch)
+    X = solver.solve(X0, 500, 1e-6)
+    assert solver.get_converged_rows().all()
+    assert not solver.get_failed_rows().any()
+    for i in range(N):
+        assert np.allclose(X[i], single_solve(methods[name], i), atol=1e-10)
+
+@pytest.mark.parametrize("step_size", [ss.ScaledConstantStepSize(1e-2), ss.ScaledInvIterStepSize()])
+def test_scaled_step_sizes_are_rowwise(step_size):
+    solver = solvers.fo.GradientDescent(f_batch, grad_batch, step_size)
+    X = solver.solve(X0, 5, 1e-12)
+    for i in range(N):
+        make_solver = lambda f, grad: solvers.fo.GradientDescent(f, grad, step_size)
+        assert np.allclose(X[i], single_solve(make_solver, i, max_iter=5, tol=1e-12))
+
+def test_exact_line_search_rejects_batch():
+    solver = solvers.fo.GradientDescent(f_batch, grad_batch, ss.ExactLineSearch4Quad(A, B[0]))
+    with pytest.raises(NotImplementedError):
+        solver.solve(X0, 5, 1e-6)
+
+def test_stalled_row_is_frozen():
+    # Gradient of the first problem has the wrong sign, so Armijo rule can not find the step size for it
+    def grad(X):
+        G = grad_batch(X)
+        G[0] *= -1
+        return G
+    solver = solvers.fo.GradientDescent(f_batch, grad, armijo())
+    X = solver.solve(X0, 500, 1e-6)
+    failed = solver.get_failed_rows()
+    assert failed[0] and not failed[1:].any()
+    assert not solver.get_converged_rows()[0] and solver.get_converged_rows()[1:].all()
+    assert np.array_equal(X[0], X0[0])
+    assert np.abs(grad_batch(X)[1:]).max() < 1e-6
+
+def test_row_masks_reset():
+    f = lambda x: f_batch(x) if x.ndim == 2 else f_batch(x[np.newaxis])[0]
+    grad = lambda x: grad_batch(x) if x.ndim == 2 else grad_batch(x[np.newaxis])[0]
+    solver = methods["GD"](f, grad)
+    assert solver.get_converged_rows() is None
+    assert solver.get_failed_rows() is None
+    solver.solve(X0, 500, 1e-6)
+    assert solver.get_converged_rows().shape == (N,)
+    solver.solve(X0[0], 500, 1e-6)
+    assert solver.get_converged_rows() is None
+    assert solver.get_failed_rows() is None
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+import liboptpy.benchmarks as bench
+
+def problems():
+    return bench.get_problems(sizes=(6,))
+
+@pytest.mark.parametrize("problem", problems(), ids=lambda p: p.name)
+def test_problem_derivatives(problem):
+    rng = np.random.RandomState(0)
+    x = problem.x0 + 0.1 * rng.rand(problem.n)
+    if problem.kind == "nonsmooth":
+        x += 1.
+    eps = 1e-6
+    e = np.eye(problem.n)
+    fd_grad = np.array([(problem.f(x + eps * e[i]) - problem.f(x - eps * e[i])) / (2 * eps) for i in range(problem.n)])
+    assert np.allclose(fd_grad, problem.grad(x), rtol=1e-5, atol=1e-5)
+    if problem.hess is not None:
+        fd_hess = np.array([(problem.grad(x + eps * e[i]) - problem.grad(x - eps * e[i])) / (2 * eps) 
+                            for i in range(problem.n)])
+        assert np.allclose(fd_hess, problem.hess(x), rtol=1e-5, atol=1e-4)
+
+def test_constrained_oracles():
+    for problem in problems():
+        if problem.kind != "constrained":
+            continue
+        y = np.random.RandomState(0).randn(problem.n)
+        x = problem.projector(y)
+        assert np.allclose(problem.projector(x), x)
+        s = problem.lmo(y)
+        # Vertex given by the linear minimization oracle is not worse than the projection
+        assert s.dot(y) <= x.dot(y) + 1e-12
+
+def test_run_records():
+    problem = bench.quadratic(8, cond=10.)
+    solvers = [s for s in bench.default_solvers() if s[0] in ("GD/Armijo", "BFGS/MoreThuente", "Newton/Armijo")]
+    results = bench.run([problem], solvers, max_iter=500, tol=1e-6, f_tol=1e-8)
+    assert [r["solver"] for r in results] == ["GD/Armijo", "BFGS/MoreThuente", "Newton/Armijo"]
+    for r in results:
+        assert "error" not in r
+        assert r["f_gap"] < 1e-8
+        assert r["iter_to_tol"] is not None and r["iter_to_tol"] <= r["iterations"]
+        assert 0 <= r["time_to_tol"] <= r["time"]
+        assert r["grad_evals"] >= r["iterations"]
+        assert r["peak_memory"] > 0
+    newton = results[-1]
+    # Hessian is also computed in the final point to check convergence
+    assert newton["iterations"] == 1 and newton["hess_evals"] == 2
+
+def test_failures_are_recorded():
+    def make_solver(problem, **kwargs):
+        raise ValueError("broken")
+    results = bench.run([bench.rosenbrock(4)], [("broken", ("smooth",), (), make_solver)])
+    assert results[0]["error"] == "ValueError: broken"
+
+def test_save_load_compare(tmp_path):
+    solvers = [s for s in bench.default_solvers() if s[0] == "GD/Armijo"]
+    results = bench.run([bench.quadratic(8, cond=10.)], solvers, memory=False)
+    filename = str(tmp_path / "bench.json")
+    bench.save(results, filename)
+    loaded = bench.load(filename)
+    assert loaded == results
+    ratios = bench.compare(loaded, results, key="iterations")
+    assert len(ratios) == 1 and ratios[0]["ratio"] == 1.
+
+def test_jit_overhead():
+    pytest.importorskip("numba")
+    results = bench.jit_overhead(sizes=[10], max_iter=50, repeat=1)
+    assert {r["solver"] for r in results} == {name for name, _, _ in bench.jit_solvers()}
+    assert all(r["time_jit"] > 0 for r in results if "error" not in r)
@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy import checkpoint
+
+rng = np.random.RandomState(0)
+n = 40
+U, _ = np.linalg.qr(rng.randn(n, n))
+A = U.dot(np.diag(np.logspace(0, 2, n))).dot(U.T)
+A = 0.5 * (A + A.T)
+b = rng.randn(n)
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x) + 0.01 * np.sum(x**4)
+grad = lambda x: A.dot(x) - b + 0.04 * x**3
+x0 = np.zeros(n)
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+makers = {
+    "BFGS": lambda: solvers.fo.BFGS(f, grad, armijo()),
+    "LBFGS": lambda: solvers.fo.LBFGS(f, grad, armijo(), hist_size=5),
+    "LBFGS-compact": lambda: solvers.fo.LBFGS(f, grad, armijo(), hist_size=5, compact=True),
+    "AGD": lambda: solvers.fo.AcceleratedGD(f, grad, ss.ConstantStepSize(1e-2)),
+    "DualAveraging": lambda: solvers.fo.DualAveraging(f, grad, ss.ConstantStepSize(1e-2), ss.ConstantStepSize(1.)),
+    "CGQuad": lambda: solvers.fo.ConjugateGradientQuad(A, b),
+}
+
+@pytest.mark.parametrize("name", sorted(makers))
+@pytest.mark.parametrize("from_file", [False, True])
+def test_resume_matches_straight_solve(name, from_file, tmp_path):
+    x_straight = makers[name]().solve(x0, 30, 1e-12)
+    first = makers[name]()
+    first.solve(x0, 12, 1e-12)
+    if from_file:
+        state = str(tmp_path / "state.npz")
+        first.save_checkpoint(state)
+    else:
+        state = first.get_state()
+    second = makers[name]()
+    x_resumed = second.resume(state, 30, 1e-12)
+    assert np.allclose(x_resumed, x_straight, rtol=1e-12, atol=1e-12)
+    assert len(second.convergence) == 30 - 12 + 1
+
+def test_periodic_checkpoint(tmp_path):
+    filename = str(tmp_path / "lbfgs.npz")
+    solver = solvers.fo.LBFGS(f, grad, armijo(), checkpoint=filename, checkpoint_every=5)
+    solver.solve(x0, 12, 1e-12)
+    state = checkpoint.load(filename)
+    assert state["num_iter"] == 11
+    assert not os.path.exists(filename + ".tmp")
+
+def test_large_arrays_are_memory_mapped(tmp_path):
+    filename = str(tmp_path / "bfgs.npz")
+    solver = solvers.fo.BFGS(f, grad, armijo())
+    solver.solve(x0, 5, 1e-12)
+    solver.save_checkpoint(filename, mmap_threshold=n * n * 8 - 1)
+    state = checkpoint.load(filename)
+    assert isinstance(state["_H"], np.memmap)
+    assert np.allclose(state["_H"], solver._H)
+    # Files of the previous checkpoint are removed when the next one is saved
+    solver.solve(x0, 7, 1e-12)
+    solver.save_checkpoint(filename, mmap_threshold=n * n * 8 - 1)
+    assert sorted(os.listdir(str(tmp_path))) == ["bfgs.npz", "bfgs.npz._H.8.npy"]
+    x_resumed = makers["BFGS"]().resume(filename, 20, 1e-12)
+    assert np.allclose(x_resumed, makers["BFGS"]().solve(x0, 20, 1e-12))
+
+def test_repeated_solves_are_equal():
+    for name in ["BFGS", "AGD", "DualAveraging"]:
+        solver = makers[name]()
+        x_first = solver.solve(x0, 20, 1e-12).copy()
+        assert np.allclose(solver.solve(x0, 20, 1e-12), x_first)
+
+def test_lbfgs_warm_start(tmp_path):
+    shifted_b = b + 0.1 * rng.randn(n)
+    g = lambda x: A.dot(x) - shifted_b + 0.04 * x**3
+    h = lambda x: 0.5 * x.dot(A.dot(x)) - shifted_b.dot(x) + 0.01 * np.sum(x**4)
+    previous = solvers.fo.LBFGS(f, grad, armijo(), hist_size=10)
+    previous.solve(x0, 300, 1e-6)
+    filename = str(tmp_path / "previous.npz")
+    previous.save_checkpoint(filename)
+    cold = solvers.fo.LBFGS(h, g, armijo(), hist_size=10)
+    x_cold = cold.solve(x0, 300, 1e-6)
+    warm = solvers.fo.LBFGS(h, g, armijo(), hist_size=10)
+    warm.warm_start(filename)
+    x_warm = warm.solve(x0, 300, 1e-6)
+    assert np.linalg.norm(g(x_warm)) < 1e-6
+    assert np.allclose(x_warm, x_cold, atol=1e-5)
+    assert len(warm.convergence) < len(cold.convergence)
+    warm.warm_start(None)
+    assert np.allclose(warm.solve(x0, 300, 1e-6), x_cold)
+    assert len(warm.convergence) == len(cold.convergence)
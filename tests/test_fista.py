@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import liboptpy.constr_solvers as methods
+import liboptpy.step_size as ss
+from liboptpy import prox
+
+rng = np.random.RandomState(0)
+m, n = 60, 40
+A = rng.randn(m, n)
+b = rng.randn(m)
+L = np.linalg.norm(A, 2)**2
+f = lambda x: 0.5 * np.sum((A.dot(x) - b)**2)
+grad = lambda x: A.T.dot(A.dot(x) - b)
+x0 = np.zeros(n)
+
+def lipschitz():
+    return ss.Backtracking("Lipschitz", rho=0.5, init_alpha=1.)
+
+def project_simplex_bisection(x, radius):
+    lo, hi = np.min(x) - radius, np.max(x)
+    for _ in range(200):
+        theta = 0.5 * (lo + hi)
+        if np.sum(np.maximum(x - theta, 0)) > radius:
+            lo = theta
+        else:
+            hi = theta
+    return np.maximum(x - theta, 0)
+
+def test_simplex_projection():
+    X = 3 * rng.randn(5, 20)
+    P = prox.project_simplex(X, 2.)
+    for x, p in zip(X, P):
+        assert np.allclose(p, project_simplex_bisection(x, 2.), atol=1e-10)
+        assert np.allclose(prox.project_simplex(x, 2.), p)
+
+def test_balls_and_box():
+    x = rng.randn(n)
+    for op, inside in [(prox.L2Ball(0.5), lambda z: np.linalg.norm(z) <= 0.5 + 1e-12),
+                       (prox.L1Ball(0.5), lambda z: np.sum(np.abs(z)) <= 0.5 + 1e-12),
+                       (prox.Box(-0.1, 0.2), lambda z: np.all((z >= -0.1) & (z <= 0.2)))]:
+        p = op(x)
+        assert inside(p)
+        assert np.allclose(op(p), p)
+        # Projection is the nearest point: x - p makes obtuse angle with directions into the set
+        for z in [op(rng.randn(n)) for _ in range(10)]:
+            assert (x - p).dot(z - p) <= 1e-10
+
+def lasso_optimality(x, lam):
+    g = grad(x)
+    nz = x != 0
+    return max(np.max(np.abs(g[nz] + lam * np.sign(x[nz])), initial=0), np.max(np.abs(g[~nz]), initial=0) - lam)
+
+@pytest.mark.parametrize("restart", [None, "gradient", "function"])
+@pytest.mark.parametrize("step_size", ["constant", "lipschitz"])
+def test_lasso(restart, step_size):
+    lam = 5.
+    step = ss.ConstantStepSize(1. / L) if step_size == "constant" else lipschitz()
+    solver = methods.FISTA(f, grad, prox.L1(lam), step, restart=restart)
+    x = solver.solve(x0, 5000, 1e-8)
+    assert lasso_optimality(x, lam) < 1e-6
+    assert np.sum(x != 0) < n
+
+def test_faster_than_proximal_gradient():
+    lam = 5.
+    l1 = prox.L1(lam)
+    fista = methods.FISTA(f, grad, l1, ss.ConstantStepSize(1. / L))
+    fista.solve(x0, 5000, 1e-6)
+    ista = methods.ProjectedGD(f, grad, lambda x: l1(x, 1. / L), ss.ConstantStepSize(1. / L))
+    ista.solve(x0, len(fista.convergence), 0)
+    assert lasso_optimality(fista.convergence[-1], lam) < 1e-2 * lasso_optimality(ista.convergence[-1], lam)
+
+def test_restart_speeds_up_strongly_convex():
+    iterations = {}
+    for restart in [None, "gradient", "function"]:
+        solver = methods.FISTA(f, grad, prox.Box(-0.1, 0.1), ss.ConstantStepSize(1. / L), restart=restart)
+        solver.solve(x0, 5000, 1e-8)
+        iterations[restart] = len(solver.convergence)
+    assert iterations["gradient"] < iterations[None]
+    assert iterations["function"] < iterations[None]
+
+def test_simplex_constrained():
+    solver = methods.FISTA(f, grad, prox.Simplex(), lipschitz())
+    x = solver.solve(np.ones(n) / n, 5000, 1e-8)
+    assert np.isclose(np.sum(x), 1) and np.all(x >= 0)
+    # On the support of the solution gradient is constant, outside it is not smaller
+    g = grad(x)
+    support = x > 0
+    assert np.ptp(g[support]) < 1e-6
+    assert np.all(g[~support] >= np.min(g[support]) - 1e-6)
+
+def test_function_restart_requires_value():
+    with pytest.raises(ValueError):
+        methods.FISTA(f, grad, lambda x, alpha: x, ss.ConstantStepSize(1. / L), restart="function")
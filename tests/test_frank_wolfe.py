@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import liboptpy.constr_solvers as methods
+import liboptpy.step_size as ss
+from liboptpy import lmo
+
+rng = np.random.RandomState(0)
+m, n = 30, 50
+A = rng.randn(m, n)
+# Solution lies inside a face of the simplex, where standard Frank-Wolfe zigzags
+x_true = np.zeros(n)
+x_true[:5] = 0.2
+b = A.dot(x_true) + 0.01 * rng.randn(m)
+Q = A.T.dot(A) + 1e-2 * np.eye(n)
+c = A.T.dot(b)
+f = lambda x: 0.5 * x.dot(Q.dot(x)) - c.dot(x)
+grad = lambda x: Q.dot(x) - c
+x0 = np.zeros(n)
+x0[-1] = 1.
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+def test_lmo_catalog():
+    G = rng.randn(4, n)
+    for oracle, vertices in [(lmo.Simplex(2.), 2 * np.eye(n)),
+                             (lmo.L1Ball(2.), np.vstack([2 * np.eye(n), -2 * np.eye(n)]))]:
+        S = oracle(G)
+        for g, s in zip(G, S):
+            assert np.allclose(oracle(g), s)
+            assert np.isclose(g.dot(s), np.min(vertices.dot(g)))
+    g = rng.randn(n)
+    s = lmo.Box(-1., 2.)(g)
+    assert np.isclose(g.dot(s), np.sum(np.minimum(-g, 2 * g)))
+
+@pytest.mark.parametrize("shape", [(2, 5), (8, 6), (6, 8)])
+def test_nuclear_ball(shape):
+    oracle = lmo.NuclearBall(shape, radius=3.)
+    for _ in range(3):
+        G = rng.randn(*shape)
+        S = oracle(G.ravel()).reshape(shape)
+        assert np.isclose(np.linalg.norm(S, "nuc"), 3.)
+        assert np.isclose(np.sum(G * S), -3. * np.linalg.norm(G, 2))
+
+@pytest.mark.parametrize("variant", ["standard", "away", "pairwise"])
+def test_one_gradient_per_iteration(variant):
+    solver = methods.FrankWolfe(f, grad, lmo.Simplex(), ss.ExactLineSearch4Quad(Q, c), variant=variant)
+    solver.solve(x0, 50, 0)
+    stats = solver.get_oracle().get_stats()
+    assert stats["grad_evals"] == 50
+    assert stats["grad_saved"] == 0
+
+@pytest.mark.parametrize("variant", ["standard", "away", "pairwise"])
+def test_gap_bounds_suboptimality(variant):
+    solver = methods.FrankWolfe(f, grad, lmo.Simplex(), armijo(), variant=variant)
+    x = solver.solve(x0, 20, 0)
+    f_opt = f(methods.FrankWolfe(f, grad, lmo.Simplex(), ss.ExactLineSearch4Quad(Q, c), variant="pairwise").solve(x0, 5000, 1e-12))
+    g = grad(x)
+    assert f(x) - f_opt <= g.dot(x - lmo.Simplex()(g)) + 1e-12
+    if variant != "standard":
+        atoms, weights = solver.get_active_set()
+        assert np.all(weights > 0) and np.isclose(np.sum(weights), 1)
+        assert np.allclose(weights.dot(atoms), x)
+
+def test_away_steps_converge_linearly():
+    iterations = {}
+    for variant in ["standard", "away", "pairwise"]:
+        solver = methods.FrankWolfe(f, grad, lmo.Simplex(), ss.ExactLineSearch4Quad(Q, c), variant=variant)
+        x = solver.solve(x0, 5000, 1e-8)
+        iterations[variant] = len(solver.convergence)
+        assert np.isclose(np.sum(x), 1) and np.all(x >= -1e-12)
+    assert iterations["standard"] == 5001
+    assert iterations["away"] < 1000
+    assert iterations["pairwise"] < 1000
+
+def test_l1_ball_with_away_steps():
+    solver = methods.FrankWolfe(f, grad, lmo.L1Ball(0.5), armijo(), variant="away")
+    x = solver.solve(np.zeros(n), 2000, 1e-6)
+    assert solver.get_gap() < 1e-6
+    assert np.sum(np.abs(x)) <= 0.5 + 1e-10
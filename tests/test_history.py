@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+import liboptpy.history as hist
+
+n = 10
+A = np.diag(np.arange(1., n + 1))
+b = np.ones(n)
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x)
+grad = lambda x: A.dot(x) - b
+x0 = np.zeros(n)
+
+def solve(history, method="GD", max_iter=50, tol=1e-8):
+    if method == "GD":
+        solver = solvers.fo.GradientDescent(f, grad, ss.ConstantStepSize(1. / n), history=history)
+    else:
+        solver = solvers.fo.BFGS(f, grad, ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.),
+                                 history=history)
+    x = solver.solve(x0, max_iter, tol)
+    return solver, x
+
+def full_iterates(max_iter=50, tol=1e-8):
+    solver, _ = solve(hist.FullHistory(), max_iter=max_iter, tol=tol)
+    return solver.get_convergence()
+
+@pytest.mark.parametrize("history", [hist.FullHistory(), hist.NoHistory(), hist.LastIterates(3),
+                                     hist.SubsampledIterates(5), hist.MemmapHistory("unused.npy")])
+def test_empty_before_solve(history):
+    solver = solvers.fo.GradientDescent(f, grad, ss.ConstantStepSize(0.1), history=history)
+    assert len(solver.get_convergence()) == 0
+    assert len(solver.convergence) == 0
+
+def test_full_history():
+    iterates = full_iterates()
+    assert len(iterates) == 51
+    assert np.array_equal(iterates[0], x0)
+
+def test_no_history():
+    solver, x = solve(hist.NoHistory())
+    assert solver.get_convergence() == []
+    assert np.allclose(x, full_iterates()[-1])
+
+def test_last_iterates():
+    solver, _ = solve(hist.LastIterates(3))
+    iterates = solver.get_convergence()
+    assert len(iterates) == 3
+    for x, x_full in zip(iterates, full_iterates()[-3:]):
+        assert np.array_equal(x, x_full)
+
+def test_subsampled_iterates():
+    history = hist.SubsampledIterates(7)
+    solver, _ = solve(history)
+    iterates = full_iterates()
+    assert history.get_indices() == list(range(0, 51, 7))
+    for i, x in zip(history.get_indices(), solver.get_convergence()):
+        assert np.array_equal(x, iterates[i])
+
+@pytest.mark.parametrize("method", ["GD", "BFGS"])
+def test_scalar_trace(method):
+    solver, _ = solve(hist.ScalarTrace(), method=method, max_iter=5)
+    trace = solver.get_convergence()
+    assert trace["f"].shape == (6,)
+    assert trace["grad_norm"].shape == (5,)
+    assert trace["alpha"].shape == (5,)
+    assert trace["f"][0] == f(x0)
+    # Norm of gradient is taken in the iterate the step is made from
+    assert trace["grad_norm"][0] == np.linalg.norm(grad(x0))
+
+def test_scalar_trace_converged_in_initial_point():
+    solver = solvers.fo.GradientDescent(f, grad, ss.ConstantStepSize(0.1), history=hist.ScalarTrace())
+    solver.solve(np.linalg.solve(A, b), 10, 1e-8)
+    trace = solver.get_convergence()
+    assert trace["f"].shape == (1,)
+    assert trace["grad_norm"].shape == (0,)
+
+def test_callback_history():
+    stream = []
+    solver, _ = solve(hist.CallbackHistory(lambda x, k: stream.append((k, x.copy()))))
+    iterates = full_iterates()
+    assert [k for k, _ in stream] == list(range(51))
+    assert np.array_equal(stream[-1][1], iterates[-1])
+
+def test_memmap_history_truncated(tmp_path):
+    filename = str(tmp_path / "hist.npy")
+    solver = solvers.fo.BarzilaiBorweinMethod(f, grad, init_alpha=1e-2, type=1,
+                                              history=hist.MemmapHistory(filename, every=2))
+    solver.solve(x0, 500, 1e-8)
+    iterates = np.load(filename)
+    assert iterates.shape[0] < 50
+    assert np.array_equal(iterates, solver.get_convergence())
+    assert np.array_equal(iterates[0], x0)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+import liboptpy.history as hist
+
+n = 30
+A = np.diag(np.linspace(1., 30., n))
+b = np.ones(n)
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x)
+grad = lambda x: A.dot(x) - b
+x0 = np.zeros(n)
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+methods = {
+    "GD": lambda f, grad, **kwargs: solvers.fo.GradientDescent(f, grad, armijo(), **kwargs),
+    "AGD": lambda f, grad, **kwargs: solvers.fo.AcceleratedGD(f, grad, ss.ConstantStepSize(1. / 30), **kwargs),
+    "BB": lambda f, grad, **kwargs: solvers.fo.BarzilaiBorweinMethod(f, grad, init_alpha=1e-2, type=1, **kwargs),
+    "BFGS": lambda f, grad, **kwargs: solvers.fo.BFGS(f, grad, armijo(), **kwargs),
+    "LBFGS": lambda f, grad, **kwargs: solvers.fo.LBFGS(f, grad, armijo(), **kwargs),
+    "DFP": lambda f, grad, **kwargs: solvers.fo.DFP(f, grad, armijo(), **kwargs),
+}
+
+@pytest.mark.parametrize("name", sorted(methods))
+def test_in_place_matches_default(name):
+    solver = methods[name](f, grad)
+    x = solver.solve(x0, 200, 1e-6)
+    solver_in_place = methods[name](f, grad, in_place=True)
+    x_in_place = solver_in_place.solve(x0, 200, 1e-6)
+    assert np.array_equal(x, x_in_place)
+    iterates = solver_in_place.get_convergence()
+    assert len(iterates) == len(solver.get_convergence())
+    for x_k, x_k_in_place in zip(solver.get_convergence(), iterates):
+        assert np.array_equal(x_k, x_k_in_place)
+
+def test_in_place_reuses_buffers():
+    points = []
+    def f_record(x):
+        points.append(x.__array_interface__["data"][0])
+        return f(x)
+    solver = methods["GD"](f_record, grad, in_place=True, history=hist.NoHistory())
+    x = solver.solve(x0, 20, 1e-8)
+    # Iterates and trial points of the line search are written to four buffers only
+    assert len(points) > 20
+    assert len(set(points)) <= 4
+    assert any(x is buf for buf in solver._x_bufs)
+
+def test_in_place_batch():
+    B = np.vstack([b, 2 * b])
+    f_batch = lambda X: 0.5 * np.sum(X * X.dot(A), axis=1) - np.sum(B * X, axis=1)
+    grad_batch = lambda X: X.dot(A) - B
+    X0 = np.zeros((2, n))
+    X = methods["AGD"](f_batch, grad_batch).solve(X0, 300, 1e-6)
+    X_in_place = methods["AGD"](f_batch, grad_batch, in_place=True).solve(X0, 300, 1e-6)
+    assert np.array_equal(X, X_in_place)
+
+def test_in_place_not_supported():
+    with pytest.raises(NotImplementedError):
+        solvers.fo.ConjugateGradientFR(f, grad, armijo(), in_place=True)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+import scipy.optimize as sopt
+import scipy.sparse as sp
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy.preconditioners import LBFGSPreconditioner
+
+rng = np.random.default_rng(0)
+m, n = 400, 200
+A = rng.standard_normal((m, n)) * np.logspace(0, 1, n)
+y = np.sign(rng.standard_normal(m))
+lam = 0.1
+
+def f(x):
+    return np.sum(np.logaddexp(0, -y * A.dot(x))) + 0.5 * lam * x.dot(x)
+
+def grad(x):
+    return A.T.dot(-y / (1 + np.exp(y * A.dot(x)))) + lam * x
+
+def hess_matvec(x):
+    p = 1. / (1 + np.exp(-y * A.dot(x)))
+    w = p * (1 - p)
+    return lambda v: A.T.dot(w * A.dot(v)) + lam * v
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=1e-4, init_alpha=1.)
+
+def solve(max_iter=100, **kwargs):
+    solver = solvers.so.InexactNewtonMethod(f, grad, hess_matvec, armijo(), **kwargs)
+    x = solver.solve(np.zeros(n), max_iter, 1e-6)
+    return solver, x
+
+@pytest.mark.parametrize("kwargs", [{}, {"warm_start": True}, {"precond": LBFGSPreconditioner()},
+                                    {"precond": sp.diags(1. / (np.sum(A**2, axis=0) / 4 + lam))}])
+def test_converges(kwargs):
+    solver, x = solve(**kwargs)
+    assert np.linalg.norm(grad(x)) < 1e-6
+
+def test_lbfgs_preconditioner_saves_hessvec():
+    plain, _ = solve()
+    preconditioned, _ = solve(precond=LBFGSPreconditioner())
+    assert preconditioned.get_num_hessvec() < plain.get_num_hessvec()
+
+def test_cg_budget():
+    solver, _ = solve(max_iter=20, max_cg_iter=5)
+    assert solver.get_num_hessvec() <= 5 * 20
+
+def test_matrix_hessian():
+    B = np.diag(np.arange(1., 11.))
+    solver = solvers.so.InexactNewtonMethod(lambda x: 0.5 * x.dot(B.dot(x)) - x.sum(), lambda x: B.dot(x) - 1.,
+                                            lambda x: B, armijo())
+    x = solver.solve(np.zeros(10), 20, 1e-8)
+    assert np.allclose(x, 1. / np.arange(1., 11.))
+
+def test_negative_curvature_rosenbrock():
+    solver = solvers.so.InexactNewtonMethod(sopt.rosen, sopt.rosen_der, 
+                                            lambda x: (lambda v: sopt.rosen_hess_prod(x, v)), armijo())
+    x = solver.solve(-np.ones(20), 500, 1e-6)
+    assert np.allclose(x, np.ones(20), atol=1e-5)
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import liboptpy.constr_solvers as methods
+import liboptpy.step_size as ss
+from liboptpy import constraints, kkt
+
+rng = np.random.RandomState(0)
+n = 200
+# Sparse QP over the box [0, 1]^n with one equality constraint
+Q = sp.diags([-np.ones(n - 1), 4 * np.ones(n), -np.ones(n - 1)], [-1, 0, 1], format="csr")
+q = 3 * rng.randn(n)
+f = lambda x: 0.5 * x.dot(Q.dot(x)) - q.dot(x)
+grad = lambda x: Q.dot(x) - q
+hess = lambda x: Q
+box = constraints.Bounds(0., 1., n)
+A = sp.csr_matrix(np.ones((1, n)))
+b = np.array([n / 4.])
+x0 = np.full(n, 0.25)
+
+def check_kkt(x, lam, nu, tol=1e-6):
+    # Stationarity, complementarity and feasibility of the solution
+    r = grad(x) + box.G.T.dot(lam) + A.T.dot(nu)
+    assert np.linalg.norm(r) < tol
+    assert np.all(lam >= 0) and np.all(np.abs(lam * box(x)) < tol)
+    assert np.all(box(x) <= 0) and np.allclose(A.dot(x), b)
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("with_A", [False, True])
+def test_kkt_solver(sparse, with_A):
+    H = sp.diags(rng.rand(n) + 1).tocsr() + Q
+    A_ = sp.csr_matrix(rng.randn(3, n)) if with_A else None
+    r1, r2 = rng.randn(n), rng.randn(3)
+    K = H.toarray() if A_ is None else np.block([[H.toarray(), A_.T.toarray()], [A_.toarray(), np.zeros((3, 3))]])
+    z = np.linalg.solve(K, r1 if A_ is None else np.concatenate([r1, r2]))
+    solver = kkt.KKTSolver()
+    nnz = []
+    for _ in range(3):
+        if sparse:
+            dx, dy = solver.solve(H, A_, r1, r2 if with_A else None)
+        else:
+            dx, dy = solver.solve(H.toarray(), None if A_ is None else A_.toarray(), r1, r2 if with_A else None)
+        assert np.allclose(dx, z[:n])
+        assert dy is None if A_ is None else np.allclose(dy, z[n:])
+        nnz.append(solver.factor_nnz)
+    assert solver.num_factorizations == 3
+    assert solver.num_orderings == (1 if sparse else 0)
+    assert solver.positive_definite is (None if with_A else True)
+    # Reused ordering gives the same fill as the computed one
+    assert nnz[0] == nnz[1] == nnz[2]
+
+def test_barrier_and_primal_dual():
+    barrier = methods.BarrierMethod(f, grad, hess, box, A, b)
+    x_b = barrier.solve(x0, 500, 1e-8)
+    # Dual variables of the barrier method are exact only on the central path
+    check_kkt(x_b, *barrier.get_dual(), tol=1e-3)
+    pd = methods.PrimalDualInteriorPoint(f, grad, hess, box, A, b)
+    x_pd = pd.solve(x0, 100, 1e-8)
+    check_kkt(x_pd, *pd.get_dual())
+    assert abs(f(x_pd) - f(x_b)) < 1e-6
+    assert len(pd.convergence) - 1 < 30
+    assert pd.get_gap() < 1e-8 and barrier.get_gap() < 1e-8
+    # Sparsity pattern of KKT systems does not change, so the ordering is computed once
+    for solver in [barrier, pd]:
+        assert solver.get_kkt_solver().num_orderings == 1
+        assert solver.get_kkt_solver().num_factorizations > 10
+
+def test_infeasible_start():
+    pd = methods.PrimalDualInteriorPoint(f, grad, hess, box, A, b)
+    x = pd.solve(np.full(n, 0.5), 100, 1e-8)
+    check_kkt(x, *pd.get_dual())
+    for solver in [pd, methods.BarrierMethod(f, grad, hess, box, A, b)]:
+        with pytest.raises(ValueError):
+            solver.solve(np.full(n, 2.), 10)
+    with pytest.raises(ValueError):
+        methods.BarrierMethod(f, grad, hess, box, A, b).solve(np.full(n, 0.5), 10)
+
+def test_nonlinear_constraint():
+    # Minimization of linear function over the unit ball, the largest feasible step is unknown
+    c = rng.randn(5)
+    ball = constraints.Inequalities(lambda x: np.array([x.dot(x) - 1]), lambda x: 2 * x[np.newaxis],
+                                    lambda x, w: 2 * w[0] * np.eye(5))
+    for solver in [methods.BarrierMethod(lambda x: c.dot(x), lambda x: c, lambda x: np.zeros((5, 5)), ball),
+                   methods.PrimalDualInteriorPoint(lambda x: c.dot(x), lambda x: c, lambda x: np.zeros((5, 5)), ball)]:
+        x = solver.solve(np.zeros(5), 200, 1e-9)
+        assert np.allclose(x, -c / np.linalg.norm(c), atol=1e-4)
+
+def test_fraction_to_boundary():
+    points = []
+    def barrier(x):
+        points.append(x)
+        assert np.all(box(x) < 0)
+        return f(x) - np.sum(np.log(-box(x)))
+    rule = ss.FractionToBoundary(box.max_step)
+    rule.assign_function(barrier, lambda x: grad(x) + box.G.T.dot(-1. / box(x)), lambda x, alpha, h: x + alpha * h)
+    h = -grad(x0) - box.G.T.dot(-1. / box(x0)) + rng.randn(n)
+    alpha = rule.get_stepsize(h, x0, 1)
+    assert 0 < alpha <= 0.99 * box.max_step(x0, h)
+    assert len(points) > 0
+
+def test_fraction_to_boundary_requires_feasibility_test():
+    with pytest.raises(ValueError):
+        ss.FractionToBoundary(None)
+    rule = ss.FractionToBoundary(lambda x, h: None)
+    with pytest.raises(ValueError):
+        rule.get_boundary_step(-grad(x0), x0)
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.constr_solvers as constr
+import liboptpy.step_size as ss
+from liboptpy import jit
+
+n = 20
+A = np.diag(np.linspace(1., 10., n))
+b = np.ones(n)
+x0 = np.zeros(n)
+
+def f(x):
+    return 0.5 * x.dot(A.dot(x)) - b.dot(x)
+
+def grad(x):
+    return A.dot(x) - b
+
+def projector(x):
+    return np.clip(x, 0., 0.5)
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+def constant():
+    return ss.ConstantStepSize(0.1)
+
+def python_solve(solver, max_iter=200, tol=1e-6):
+    x = solver.solve(x0, max_iter, tol)
+    return x, len(solver.get_convergence()) - 1, solver.get_convergence()
+
+def check_loop(python, res):
+    x, num_iter, hist = python
+    x_loop, num_iter_loop, hist_loop = res[:3]
+    assert num_iter_loop == num_iter
+    assert np.allclose(x_loop, x, rtol=1e-12, atol=1e-14)
+    assert np.allclose(hist_loop[:num_iter + 1], np.array(hist), rtol=1e-12, atol=1e-14)
+
+def loop(name):
+    # Loops are checked against the common loop, without numba they are plain Python functions
+    fun = getattr(jit, name)
+    if not jit.available:
+        return fun
+    import numba
+    return lambda *args: fun(*[numba.njit(arg) if callable(arg) else arg for arg in args])
+
+@pytest.mark.parametrize("step_size", [armijo, constant])
+def test_gd_loop(step_size):
+    python = python_solve(solvers.fo.GradientDescent(f, grad, step_size(), jit=False))
+    rule, alpha, rho, beta = jit.step_size_params(step_size())
+    check_loop(python, loop("gd_loop")(f, grad, x0, 200, 1e-6, rule, alpha, rho, beta, True))
+
+def test_agd_loop():
+    python = python_solve(solvers.fo.AcceleratedGD(f, grad, constant(), jit=False))
+    rule, alpha, rho, beta = jit.step_size_params(constant())
+    check_loop(python, loop("agd_loop")(f, grad, x0, 200, 1e-6, rule, alpha, rho, beta, True, 0, 1))
+
+@pytest.mark.parametrize("bb_type", [1, 2])
+def test_bb_loop(bb_type):
+    python = python_solve(solvers.fo.BarzilaiBorweinMethod(f, grad, init_alpha=1e-2, type=bb_type, jit=False))
+    check_loop(python, loop("bb_loop")(f, grad, x0, 200, 1e-6, 1e-2, bb_type, True))
+
+@pytest.mark.parametrize("step_size", [armijo, constant])
+def test_lbfgs_loop(step_size):
+    python = python_solve(solvers.fo.LBFGS(f, grad, step_size(), hist_size=5, jit=False))
+    rule, alpha, rho, beta = jit.step_size_params(step_size())
+    check_loop(python, loop("lbfgs_loop")(f, grad, x0, 200, 1e-6, rule, alpha, rho, beta, True, 5, np.nan))
+
+@pytest.mark.parametrize("step_size", [armijo, constant])
+def test_pgd_loop(step_size):
+    python = python_solve(constr.ProjectedGD(f, grad, projector, step_size(), jit=False), tol=1e-10)
+    rule, alpha, rho, beta = jit.step_size_params(step_size())
+    check_loop(python, loop("pgd_loop")(f, grad, projector, x0, 200, 1e-10, rule, alpha, rho, beta, True))
+
+def test_unsupported_step_size():
+    assert jit.step_size_params(ss.MoreThuente()) is None
+    assert jit.step_size_params(ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1., parallel=4)) is None
+
+def test_python_functions_use_common_loop():
+    solver = solvers.fo.GradientDescent(f, grad, armijo())
+    assert not solver._use_jit(x0, False)
+
+@pytest.mark.skipif(jit.available, reason="numba is installed")
+def test_jit_requires_numba():
+    solver = solvers.fo.GradientDescent(f, grad, armijo(), jit=True)
+    with pytest.raises(ImportError):
+        solver.solve(x0, 10, 1e-8)
+
+@pytest.mark.parametrize("make_solver", [
+    lambda f, grad: solvers.fo.GradientDescent(f, grad, armijo()),
+    lambda f, grad: solvers.fo.AcceleratedGD(f, grad, constant()),
+    lambda f, grad: solvers.fo.BarzilaiBorweinMethod(f, grad, init_alpha=1e-2, type=1),
+    lambda f, grad: solvers.fo.LBFGS(f, grad, armijo()),
+])
+def test_compiled_solve(make_solver):
+    numba = pytest.importorskip("numba")
+    f_jit = numba.njit(f)
+    grad_jit = numba.njit(grad)
+    solver = make_solver(f_jit, grad_jit)
+    assert solver._use_jit(x0, False)
+    x = solver.solve(x0, 200, 1e-6)
+    x_python = make_solver(f, grad).solve(x0, 200, 1e-6)
+    assert np.allclose(x, x_python)
+    assert solver.get_oracle().num_grad_evals > 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+
+rng = np.random.default_rng(0)
+m, n = 400, 100
+A = rng.standard_normal((m, n)) / np.sqrt(n)
+y = np.sign(rng.standard_normal(m))
+lam = 0.1
+
+def f(x):
+    return np.sum(np.logaddexp(0, -y * A.dot(x))) + 0.5 * lam * x.dot(x)
+
+def grad(x):
+    return A.T.dot(-y / (1 + np.exp(y * A.dot(x)))) + lam * x
+
+def hess(x):
+    p = 1. / (1 + np.exp(-y * A.dot(x)))
+    return (A.T * (p * (1 - p))).dot(A) + lam * np.eye(n)
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=1e-4, init_alpha=1.)
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_reuses_factorization(sparse):
+    hess_ = (lambda x: sp.csr_matrix(hess(x))) if sparse else hess
+    solver = solvers.so.LazyNewtonMethod(f, grad, hess_, armijo(), refresh_every=10)
+    x = solver.solve(np.zeros(n), 50, 1e-8)
+    assert np.linalg.norm(grad(x)) < 1e-8
+    assert solver.get_num_hess() < len(solver.get_convergence()) - 1
+    assert solver.get_num_factorizations() == solver.get_num_hess()
+    assert solver.get_num_shifts() == 0
+    x_newton = solvers.so.NewtonMethod(f, grad, hess, armijo()).solve(np.zeros(n), 50, 1e-8)
+    assert np.allclose(x, x_newton)
+
+def test_refresh_every_iteration():
+    solver = solvers.so.LazyNewtonMethod(f, grad, hess, armijo(), refresh_every=1)
+    solver.solve(np.zeros(n), 50, 1e-8)
+    # Hessian is also computed in the last iteration, where convergence is checked
+    assert solver.get_num_hess() == len(solver.get_convergence())
+
+# Double well in every coordinate: the hessian is negative definite in the initial point
+k = 20
+f_well = lambda x: np.sum(0.25 * x**4 - 0.5 * x**2) + 0.1 * np.sum(x[1:] * x[:-1])
+grad_well = lambda x: x**3 - x + 0.1 * (np.concatenate([x[1:], [0]]) + np.concatenate([[0], x[:-1]]))
+hess_well = lambda x: np.diag(3 * x**2 - 1) + 0.1 * (np.eye(k, k=1) + np.eye(k, k=-1))
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_indefinite_hessian(sparse):
+    hess_ = (lambda x: sp.csr_matrix(hess_well(x))) if sparse else hess_well
+    x0 = 0.1 * np.ones(k)
+    solver = solvers.so.LazyNewtonMethod(f_well, grad_well, hess_, armijo())
+    x = solver.solve(x0, 200, 1e-8)
+    assert np.linalg.norm(grad_well(x)) < 1e-8
+    assert np.all(np.linalg.eigvalsh(hess_well(x)) > 0)
+    assert f_well(x) < f_well(x0)
+    assert solver.get_num_shifts() > 0
+
+def test_resume():
+    make = lambda: solvers.so.LazyNewtonMethod(f_well, grad_well, hess_well, armijo(), refresh_every=3)
+    x0 = 0.1 * np.ones(k)
+    x_straight = make().solve(x0, 12, 0)
+    first = make()
+    first.solve(x0, 5, 0)
+    x_resumed = make().resume(first.get_state(), 12, 0)
+    assert np.allclose(x_resumed, x_straight, rtol=1e-12, atol=1e-14)
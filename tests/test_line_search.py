@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy.oracle import Oracle
+
+n = 20
+A = np.diag(np.linspace(1., 100., n))
+b = np.ones(n)
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x) + 0.1 * np.sum(x**4)
+grad = lambda x: A.dot(x) - b + 0.4 * x**3
+x0 = np.full(n, 2.)
+
+class VectorizedF(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, X):
+        self.calls += 1
+        return np.array([f(x) for x in X])
+
+def solve(rule, method=solvers.fo.GradientDescent, **kwargs):
+    if rule == "Armijo":
+        step_size = ss.Backtracking(rule, rho=0.5, beta=0.1, init_alpha=1., **kwargs)
+    elif rule == "Lipschitz":
+        step_size = ss.Backtracking(rule, rho=0.5, init_alpha=1., **kwargs)
+    else:
+        step_size = ss.Backtracking(rule, rho=0.5, beta1=1e-3, beta2=0.9, init_alpha=1., **kwargs)
+    with step_size:
+        solver = method(f, grad, step_size)
+        x = solver.solve(x0, 200, 1e-6)
+    return solver, x
+
+@pytest.mark.parametrize("rule", ["Armijo", "Lipschitz"])
+@pytest.mark.parametrize("parallel", [2, 8])
+def test_parallel_ladder_matches_sequential(rule, parallel):
+    solver, x = solve(rule)
+    solver_parallel, x_parallel = solve(rule, parallel=parallel)
+    assert np.array_equal(x, x_parallel)
+    assert len(solver.get_convergence()) == len(solver_parallel.get_convergence())
+
+def test_vectorized_f_reduces_rounds():
+    solver, x = solve("Armijo")
+    f_vectorized = VectorizedF()
+    solver_parallel, x_parallel = solve("Armijo", parallel=16, f_vectorized=f_vectorized)
+    assert np.array_equal(x, x_parallel)
+    num_iter = len(solver_parallel.get_convergence()) - 1
+    # One evaluation of the ladder per iteration instead of a sequence of trial steps
+    assert f_vectorized.calls == num_iter
+    assert solver.get_oracle().num_f_evals - num_iter > num_iter
+
+def test_user_executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        _, x_parallel = solve("Armijo", parallel=4, executor=executor)
+    _, x = solve("Armijo")
+    assert np.array_equal(x, x_parallel)
+
+def test_close_shuts_down_own_pool():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for pool in [None, executor]:
+            step_size = ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1., parallel=2, executor=pool)
+            solvers.fo.GradientDescent(f, grad, step_size).solve(x0, 5, 1e-6)
+            own = step_size._executor
+            step_size.close()
+            assert step_size._executor is None
+            if pool is None:
+                with pytest.raises(RuntimeError):
+                    own.submit(abs, -1)
+        # Executor of user is left running
+        assert executor.submit(abs, -1).result() == 1
+
+def test_parallel_wolfe_bracket():
+    solver, x = solve("Wolfe", method=solvers.fo.BFGS, parallel=4)
+    assert np.linalg.norm(grad(x)) < 1e-6
+    assert len(solver.get_convergence()) < 100
+
+def test_f_many_uses_cache_and_fused_oracle():
+    calls = []
+    def f_and_grad(x):
+        calls.append(x)
+        return f(x), grad(x)
+    oracle = Oracle(f_and_grad=f_and_grad, cache_size=8)
+    points = [np.full(n, float(i)) for i in range(3)]
+    oracle.f(points[0])
+    values = oracle.f_many(points + [points[1].copy()])
+    assert values == [f(x) for x in points] + [f(points[1])]
+    assert len(calls) == 3
+    assert oracle.get_stats() == {"f_evals": 3, "grad_evals": 3, "f_saved": 1, "grad_saved": 0}
+    oracle.grad(points[2])
+    assert len(calls) == 3
+
+def rosen(x):
+    return np.sum(100 * (x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2)
+
+def rosen_grad(x):
+    g = np.zeros_like(x)
+    d = x[1:] - x[:-1]**2
+    g[:-1] += -400 * x[:-1] * d - 2 * (1 - x[:-1])
+    g[1:] += 200 * d
+    return g
+
+rosen_x0 = np.tile([-1.2, 1.], 5)
+
+@pytest.mark.parametrize("c2", [0.1, 0.9])
+def test_more_thuente_strong_wolfe(c2):
+    step_size = ss.MoreThuente(c1=1e-4, c2=c2)
+    step_size.assign_function(rosen, rosen_grad, lambda x, alpha, h: x + alpha * h)
+    rng = np.random.RandomState(0)
+    for _ in range(20):
+        x = rosen_x0 + rng.randn(rosen_x0.shape[0])
+        g = rosen_grad(x)
+        h = -g / np.linalg.norm(g)
+        alpha = step_size.get_stepsize(h, x, 1)
+        assert rosen(x + alpha * h) <= rosen(x) + 1e-4 * alpha * g.dot(h)
+        assert abs(rosen_grad(x + alpha * h).dot(h)) <= c2 * abs(g.dot(h))
+
+@pytest.mark.parametrize("method", ["BFGS", "LBFGS", "ConjugateGradientPR"])
+def test_more_thuente_is_default(method):
+    solver = getattr(solvers.fo, method)(rosen, rosen_grad)
+    x = solver.solve(rosen_x0, 1000, 1e-5)
+    assert np.linalg.norm(rosen_grad(x)) < 1e-5
+    num_iter = len(solver.get_convergence()) - 1
+    assert solver.get_oracle().num_f_evals < 3.5 * num_iter
+
+@pytest.mark.parametrize("method", ["GradientDescent", "ConjugateGradientFR"])
+def test_more_thuente_fewer_evaluations_than_bisection(method):
+    wolfe = ss.Backtracking("Wolfe", rho=0.5, beta1=1e-4, beta2=0.1, init_alpha=1.)
+    solver = getattr(solvers.fo, method)(f, grad, wolfe)
+    solver.solve(x0, 1000, 1e-5)
+    solver_mt = getattr(solvers.fo, method)(f, grad, ss.MoreThuente(c2=0.1))
+    solver_mt.solve(x0, 1000, 1e-5)
+    stats, stats_mt = solver.get_oracle().get_stats(), solver_mt.get_oracle().get_stats()
+    assert stats_mt["f_evals"] + stats_mt["grad_evals"] < stats["f_evals"] + stats["grad_evals"]
+
+def test_goldstein_rule():
+    step_size = ss.Backtracking("Goldstein", rho=0.5, beta=0.25, init_alpha=1.)
+    solver = solvers.fo.GradientDescent(f, grad, step_size)
+    x = solver.solve(x0, 500, 1e-6)
+    assert np.linalg.norm(grad(x)) < 1e-6
+    iterates = solver.get_convergence()
+    for x_k, x_next in zip(iterates[:-1], iterates[1:]):
+        h = -grad(x_k)
+        alpha = (x_next - x_k).dot(h) / h.dot(h)
+        assert f(x_k) + 0.75 * alpha * grad(x_k).dot(h) <= f(x_next) <= f(x_k) + 0.25 * alpha * grad(x_k).dot(h)
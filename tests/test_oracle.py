@@ -0,0 +1,107 @@
+import numpy as np
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy.oracle import Oracle
+
+n = 10
+A = np.diag(np.arange(1., n + 1))
+b = np.ones(n)
+
+class Counter(object):
+    def __init__(self, fun):
+        self.fun = fun
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.fun(*args)
+
+def make_functions():
+    f = Counter(lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x))
+    grad = Counter(lambda x: A.dot(x) - b)
+    return f, grad
+
+def test_hits_and_misses():
+    f, grad = make_functions()
+    oracle = Oracle(f, grad, cache_size=2)
+    x = np.ones(n)
+    oracle.f(x)
+    oracle.f(x.copy())
+    oracle.grad(x)
+    oracle.grad(x)
+    assert (f.calls, grad.calls) == (1, 1)
+    assert oracle.get_stats() == {"f_evals": 1, "grad_evals": 1, "f_saved": 1, "grad_saved": 1}
+
+def test_cache_keyed_by_content():
+    f, grad = make_functions()
+    oracle = Oracle(f, grad)
+    x = np.ones(n)
+    f_old = oracle.f(x)
+    x[0] = 2.
+    assert oracle.f(x) != f_old
+    assert f.calls == 2
+
+def test_lru_eviction():
+    f, grad = make_functions()
+    oracle = Oracle(f, grad, cache_size=2)
+    points = [np.full(n, float(i)) for i in range(3)]
+    for x in points:
+        oracle.f(x)
+    oracle.f(points[2])
+    oracle.f(points[1])
+    assert f.calls == 3
+    oracle.f(points[0])
+    assert f.calls == 4
+
+def test_f_and_grad_from_separate_functions():
+    f, grad = make_functions()
+    oracle = Oracle(f, grad)
+    x = np.ones(n)
+    val, g = oracle.f_and_grad(x)
+    assert val == f.fun(x)
+    assert np.array_equal(g, grad.fun(x))
+    oracle.f(x)
+    assert (f.calls, grad.calls) == (1, 1)
+
+def test_solver_reuses_gradient_in_line_search():
+    f, grad = make_functions()
+    solver = solvers.fo.GradientDescent(f, grad, ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.))
+    solver.solve(np.zeros(n), 20, 1e-8)
+    stats = solver.get_oracle().get_stats()
+    # Armijo rule takes the gradient in the current point from the cache
+    assert grad.calls == stats["grad_evals"] == 20
+    assert stats["grad_saved"] == 20
+    assert f.calls == stats["f_evals"]
+
+def wolfe():
+    return ss.Backtracking("Wolfe", rho=0.5, beta1=1e-3, beta2=0.9, init_alpha=1.)
+
+def test_fused_oracle_in_wolfe_rule():
+    f, grad = make_functions()
+    solver = solvers.fo.BFGS(f, grad, wolfe())
+    x_sep = solver.solve(np.zeros(n), 50, 1e-8)
+    f_and_grad = Counter(lambda x: (f.fun(x), grad.fun(x)))
+    solver = solvers.fo.BFGS(Oracle(f_and_grad=f_and_grad), None, wolfe())
+    x_fused = solver.solve(np.zeros(n), 50, 1e-8)
+    assert np.allclose(x_sep, x_fused)
+    # One fused call per trial point instead of separate calls of f and grad
+    assert f_and_grad.calls == f.calls
+    assert f_and_grad.calls < f.calls + grad.calls
+
+def test_separate_f_preferred_over_fused_in_trial_points():
+    f, grad = make_functions()
+    f_and_grad = Counter(lambda x: (f.fun(x), grad.fun(x)))
+    solver = solvers.fo.GradientDescent(Oracle(f, grad, f_and_grad=f_and_grad), None,
+                                        ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.))
+    solver.solve(np.zeros(n), 20, 1e-8)
+    assert f_and_grad.calls == 0
+    assert f.calls > 0
+
+def test_hessvec_oracle_in_inexact_newton():
+    f, grad = make_functions()
+    f_grad_hessvec = Counter(lambda x: (f.fun(x), grad.fun(x), lambda v: A.dot(v)))
+    solver = solvers.so.InexactNewtonMethod(Oracle(f_grad_hessvec=f_grad_hessvec), None, None,
+                                            ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.))
+    x = solver.solve(np.zeros(n), 50, 1e-6)
+    assert np.linalg.norm(grad.fun(x)) < 1e-6
+    assert f_grad_hessvec.calls == solver.get_oracle().num_f_evals
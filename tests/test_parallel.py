@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy.parallel import solve_many
+
+n = 30
+A = np.diag(np.arange(1., n + 1))
+rng = np.random.RandomState(0)
+tasks = [(np.zeros(n), rng.randn(n)) for _ in range(8)]
+
+def build(b, A):
+    if isinstance(A, np.ndarray) and A.flags.writeable:
+        raise ValueError("Shared matrix is writeable")
+    f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x)
+    grad = lambda x: A.dot(x) - b
+    return f, grad, ss.ExactLineSearch4Quad(A, b)
+
+def read_only(a):
+    a = np.array(a)
+    a.flags.writeable = False
+    return a
+
+def solve_all(shared, **kwargs):
+    results = list(solve_many(solvers.fo.GradientDescent, build, tasks, shared=shared, max_iter=500, tol=1e-8, **kwargs))
+    assert sorted(r["index"] for r in results) == list(range(len(tasks)))
+    return sorted(results, key=lambda r: r["index"])
+
+@pytest.mark.parametrize("A_shared", [A, sp.csr_matrix(A)])
+def test_pool_matches_serial(A_shared):
+    serial = solve_all({"A": read_only(A)}, max_workers=0)
+    pooled = solve_all({"A": A_shared}, max_workers=2)
+    for r_serial, r_pooled in zip(serial, pooled):
+        assert "error" not in r_pooled
+        assert np.allclose(r_pooled["x"], r_serial["x"])
+        assert r_pooled["iterations"] == r_serial["iterations"]
+        assert r_pooled["grad_evals"] == r_serial["grad_evals"]
+
+def test_errors_are_reported():
+    # Arrays are passed as they are in the current process, so build fails on the writeable matrix
+    results = list(solve_many(solvers.fo.GradientDescent, build, tasks[:2], shared={"A": np.array(A)}, max_workers=0))
+    assert [r["index"] for r in results] == [0, 1]
+    assert all("Shared matrix is writeable" in r["error"] for r in results)
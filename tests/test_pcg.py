@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+import liboptpy.unconstr_solvers as solvers
+from liboptpy import preconditioners as pc
+
+m = 30
+T = sp.diags([-np.ones(m - 1), 2 * np.ones(m), -np.ones(m - 1)], [-1, 0, 1])
+rng = np.random.default_rng(0)
+d = rng.permutation(np.logspace(0, 3, m * m))
+D = sp.diags(np.sqrt(d))
+# Badly scaled 2D Laplacian
+A = (D @ sp.kronsum(T, T) @ D + sp.diags(1e-3 * d)).tocsr()
+b = np.ones(m * m)
+x_opt = spla.spsolve(A.tocsc(), b)
+
+def solve(precond=None, **kwargs):
+    solver = solvers.fo.ConjugateGradientQuad(A, b, precond=precond, **kwargs)
+    x = solver.solve(np.zeros(m * m), 5000, 1e-8)
+    return solver, x
+
+def num_iter(solver):
+    return len(solver.get_convergence()) - 1
+
+@pytest.mark.parametrize("precond", [None, pc.Jacobi(A), pc.IncompleteCholesky(A), 
+                                     pc.Jacobi(A).__call__, sp.diags(1. / A.diagonal())])
+def test_converges(precond):
+    _, x = solve(precond)
+    assert np.allclose(x, x_opt, rtol=1e-8, atol=1e-10)
+
+def test_preconditioners_save_iterations():
+    plain = num_iter(solve()[0])
+    jacobi = num_iter(solve(pc.Jacobi(A))[0])
+    ic = num_iter(solve(pc.IncompleteCholesky(A))[0])
+    assert ic < jacobi < plain / 5
+
+def test_one_matvec_per_iteration():
+    calls = []
+    def matvec(v):
+        calls.append(1)
+        return A.dot(v)
+    op = spla.LinearOperator(A.shape, matvec=matvec, dtype=float)
+    solver = solvers.fo.ConjugateGradientQuad(op, b, precond=pc.Jacobi(A), residual_refresh=20)
+    solver.solve(np.zeros(m * m), 5000, 1e-8)
+    k = num_iter(solver)
+    # Initial residual, products with directions and refreshed residuals
+    assert len(calls) == 1 + k + (k - 1) // 20
+
+def test_incomplete_cholesky_shift():
+    # Diagonally unbalanced SPD matrix where IC(0) without shift breaks down
+    B = sp.csr_matrix(np.array([[3., -2, 0, 2], [-2, 3, -2, 0], [0, -2, 3, -2], [2, 0, -2, 3]]))
+    assert np.all(np.linalg.eigvalsh(B.toarray()) > 0)
+    ic = pc.IncompleteCholesky(B)
+    assert ic.shift > 0
+    solver = solvers.fo.ConjugateGradientQuad(B, np.ones(4), precond=ic)
+    x = solver.solve(np.zeros(4), 50, 1e-10)
+    assert np.allclose(B.dot(x), np.ones(4))
+
+def test_multiple_right_hand_sides():
+    B = np.stack([b, np.arange(m * m, dtype=float), rng.standard_normal(m * m)])
+    solver = solvers.fo.ConjugateGradientQuad(A, B, precond=pc.IncompleteCholesky(A))
+    X = solver.solve(np.zeros_like(B), 5000, 1e-8)
+    assert np.all(solver.get_converged_rows())
+    for x, rhs in zip(X, B):
+        assert np.allclose(x, spla.spsolve(A.tocsc(), rhs), rtol=1e-8, atol=1e-10)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.constr_solvers as methods
+import liboptpy.step_size as ss
+from liboptpy import prox, lmo
+from liboptpy.utils import rowdot
+
+rng = np.random.RandomState(0)
+n = 30
+U, _ = np.linalg.qr(rng.randn(n, n))
+A = U.dot(np.diag(np.logspace(0, 1, n))).dot(U.T)
+A = 0.5 * (A + A.T)
+b = rng.randn(n)
+x_opt = np.linalg.solve(A, b)
+# Functions computed in float64 would upcast float32 iterates without precision policy
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x)
+grad = lambda x: A.dot(x) - b
+x0 = np.zeros(n)
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+makers = {
+    "GD": lambda **kw: solvers.fo.GradientDescent(f, grad, armijo(), **kw),
+    "GD-exact": lambda **kw: solvers.fo.GradientDescent(f, grad, ss.ExactLineSearch4Quad(A, b), **kw),
+    "AGD": lambda **kw: solvers.fo.AcceleratedGD(f, grad, ss.ConstantStepSize(0.1), **kw),
+    "BB": lambda **kw: solvers.fo.BarzilaiBorweinMethod(f, grad, init_alpha=1e-2, type=1, **kw),
+    "BFGS": lambda **kw: solvers.fo.BFGS(f, grad, armijo(), **kw),
+    "BFGS-factored": lambda **kw: solvers.fo.BFGS(f, grad, armijo(), factored=True, **kw),
+    "DFP": lambda **kw: solvers.fo.DFP(f, grad, **kw),
+    "LBFGS": lambda **kw: solvers.fo.LBFGS(f, grad, **kw),
+    "LBFGS-compact": lambda **kw: solvers.fo.LBFGS(f, grad, compact=True, **kw),
+    "CGQuad": lambda **kw: solvers.fo.ConjugateGradientQuad(A, b, **kw),
+    "Newton": lambda **kw: solvers.so.NewtonMethod(f, grad, lambda x: A, armijo(), **kw),
+    "FISTA": lambda **kw: methods.FISTA(f, grad, prox.Box(-10., 10.), ss.ConstantStepSize(0.1), **kw),
+}
+
+@pytest.mark.parametrize("accumulate", [None, np.float64])
+@pytest.mark.parametrize("name", sorted(makers))
+def test_float32_policy(name, accumulate):
+    solver = makers[name](dtype=np.float32, accumulate=accumulate)
+    x = solver.solve(x0, 300, 1e-3)
+    assert x.dtype == np.float32
+    assert all(xk.dtype == np.float32 for xk in solver.convergence)
+    assert np.linalg.norm(x - x_opt) < 1e-3 * np.linalg.norm(x_opt)
+    for attr in ["_H", "_S", "_Y", "_r"]:
+        value = getattr(solver, attr, None)
+        if isinstance(value, np.ndarray):
+            assert value.dtype == np.float32
+
+def test_float32_input_is_not_upcast():
+    A32, b32 = A.astype(np.float32), b.astype(np.float32)
+    f32 = lambda x: 0.5 * x.dot(A32.dot(x)) - b32.dot(x)
+    grad32 = lambda x: A32.dot(x) - b32
+    for solver in [solvers.fo.DualAveraging(f32, grad32, ss.InvIterStepSize(), ss.ConstantStepSize(1.)),
+                   solvers.fo.BFGS(f32, grad32, armijo()), solvers.fo.DFP(f32, grad32, armijo())]:
+        x = solver.solve(x0.astype(np.float32), 20, 1e-2)
+        assert x.dtype == np.float32
+
+def test_batch_float32():
+    batch_f = lambda X: 0.5 * np.einsum("ij,ij->i", X.dot(A), X) - X.dot(b)
+    batch_grad = lambda X: X.dot(A) - b
+    solver = solvers.fo.GradientDescent(batch_f, batch_grad, armijo(), dtype=np.float32)
+    X = solver.solve(np.zeros((3, n)), 500, 1e-3)
+    assert X.dtype == np.float32
+    assert np.all(solver.get_converged_rows())
+
+def test_frank_wolfe_float32():
+    solver = methods.FrankWolfe(f, grad, lmo.L1Ball(1.), armijo(), variant="away", dtype=np.float32,
+                                accumulate=np.float64)
+    x = solver.solve(x0, 50, 0)
+    assert x.dtype == np.float32
+    assert solver.get_gap().dtype == np.float64
+
+def test_accumulated_dot():
+    a = rng.rand(10**6).astype(np.float32)
+    exact = a.astype(np.float64).dot(a.astype(np.float64))
+    acc = rowdot(a, a, np.float64)
+    assert acc.dtype == np.float64
+    assert abs(acc - exact) <= abs(a.dot(a) - exact)
+    assert abs(acc - exact) < 1e-9 * exact
+    batch = rowdot(a.reshape(10, -1), a.reshape(10, -1), np.float64)
+    assert batch.shape == (10, 1) and batch.dtype == np.float64
@@ -0,0 +1,54 @@
+import numpy as np
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy.profiling import Recorder, profile_solve
+
+n = 10
+A = np.diag(np.arange(1., n + 1))
+b = np.ones(n)
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x)
+grad = lambda x: A.dot(x) - b
+x0 = np.zeros(n)
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+def test_recorder_arrays():
+    recorder = Recorder()
+    solver = solvers.fo.GradientDescent(f, grad, armijo(), callbacks=recorder)
+    solver.solve(x0, 30, 1e-8)
+    data = recorder.get()
+    num_iter = len(solver.get_convergence()) - 1
+    assert all(value.shape == (num_iter,) for value in data.values())
+    iterates = solver.get_convergence()
+    # Function values in the new iterates are known from the line search
+    assert np.allclose(data["f"], [f(x) for x in iterates[1:]])
+    assert np.allclose(data["grad_norm"], [np.linalg.norm(grad(x)) for x in iterates[:-1]])
+    assert np.all(data["ls_trials"] >= 1)
+    assert data["f_evals"][-1] == solver.get_oracle().num_f_evals
+    assert np.all(np.diff(data["grad_evals"]) == 1)
+    timings = recorder.get_timings()
+    assert set(timings) == {"direction", "step_size", "update"}
+    assert all(t >= 0 for t in timings.values())
+
+def test_recorder_reset_and_missing_f():
+    recorder = Recorder(fields=["f", "alpha"])
+    solver = solvers.fo.GradientDescent(f, grad, ss.ConstantStepSize(0.05), callbacks=[recorder])
+    solver.solve(x0, 5, 1e-8)
+    solver.solve(x0, 7, 1e-8)
+    data = recorder.get()
+    assert data["alpha"].shape == (7,)
+    assert np.all(np.isnan(data["f"]))
+    assert solver.get_oracle().num_f_evals == 0
+
+def test_verbose_mode_costs_no_evaluations(capsys):
+    solver = solvers.fo.GradientDescent(f, grad, ss.ConstantStepSize(0.05))
+    solver.solve(x0, 5, 1e-8, disp=2)
+    assert solver.get_oracle().num_f_evals == 1
+    assert "Current function val" in capsys.readouterr().out
+
+def test_profile_solve():
+    solver = solvers.fo.GradientDescent(f, grad, armijo())
+    x, stats = profile_solve(solver, x0, 20, 1e-8)
+    assert np.allclose(x, solver.solve(x0, 20, 1e-8))
+    assert any(func[2] == "get_stepsize" for func in stats.stats)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+
+rng = np.random.RandomState(0)
+n = 50
+U, _ = np.linalg.qr(rng.randn(n, n))
+A = U.dot(np.diag(np.logspace(0, 2, n))).dot(U.T)
+A = 0.5 * (A + A.T)
+b = rng.randn(n)
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x) + 0.01 * np.sum(x**4)
+grad = lambda x: A.dot(x) - b + 0.04 * x**3
+x0 = np.zeros(n)
+
+def armijo():
+    return ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.)
+
+class RecordingLBFGS(solvers.fo.LBFGS):
+    def get_direction(self, x):
+        h = super().get_direction(x)
+        self.directions.append(h)
+        return h
+
+def solve_lbfgs(max_iter=300, **kwargs):
+    solver = RecordingLBFGS(f, grad, armijo(), **kwargs)
+    solver.directions = []
+    x = solver.solve(x0, max_iter, 1e-6)
+    return solver, x
+
+@pytest.mark.parametrize("hist_size", [3, 10])
+def test_compact_lbfgs_matches_two_loop(hist_size):
+    two_loop, x_two_loop = solve_lbfgs(hist_size=hist_size)
+    compact, x_compact = solve_lbfgs(hist_size=hist_size, compact=True)
+    assert np.allclose(x_two_loop, x_compact, atol=1e-8)
+    assert len(two_loop.directions) == len(compact.directions)
+    for h_two_loop, h_compact in zip(two_loop.directions, compact.directions):
+        assert np.allclose(h_two_loop, h_compact, rtol=1e-6, atol=1e-10)
+
+def test_compact_lbfgs_rejects_batch():
+    solver = solvers.fo.LBFGS(lambda X: np.array([f(x) for x in X]), lambda X: np.array([grad(x) for x in X]),
+                              armijo(), compact=True)
+    with pytest.raises(NotImplementedError):
+        solver.solve(np.zeros((2, n)), 10, 1e-6)
+
+def test_two_loop_directions_are_not_reused_buffer():
+    solver, _ = solve_lbfgs(max_iter=5)
+    assert len(solver.directions) == 5
+    for h, h_next in zip(solver.directions[1:], solver.directions[2:]):
+        assert not np.shares_memory(h, h_next)
+        assert not np.array_equal(h, h_next)
+
+@pytest.mark.parametrize("method, kwargs", [("BFGS", {}), ("BFGS", {"H": np.eye(n)}), ("BFGS", {"factored": True}),
+                                            ("DFP", {})])
+def test_quasi_newton_converges(method, kwargs):
+    solver = getattr(solvers.fo, method)(f, grad, armijo(), **kwargs)
+    x = solver.solve(x0, 500, 1e-6)
+    assert np.linalg.norm(grad(x)) < 1e-6
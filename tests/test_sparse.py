@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+
+n = 2000
+# Tridiagonal SPD matrix of the discrete Laplacian with the shifted diagonal
+A = sp.diags([-np.ones(n - 1), 4 * np.ones(n), -np.ones(n - 1)], [-1, 0, 1], format="csr")
+b = np.ones(n)
+x_opt = spla.spsolve(A.tocsc(), b)
+f = lambda x: 0.5 * x.dot(A.dot(x)) - b.dot(x)
+grad = lambda x: A.dot(x) - b
+
+def test_newton_sparse_hessian():
+    solver = solvers.so.NewtonMethod(f, grad, lambda x: A, ss.ConstantStepSize(1.))
+    x = solver.solve(np.zeros(n), 5, 1e-8)
+    assert np.allclose(x, x_opt)
+    # Quadratic is minimized by a single Newton step
+    assert len(solver.get_convergence()) == 2
+
+def test_newton_linear_operator_hessian():
+    op = spla.aslinearoperator(A)
+    solver = solvers.so.NewtonMethod(f, grad, lambda x: op, ss.ConstantStepSize(1.), cg_tol=1e-10)
+    x = solver.solve(np.zeros(n), 5, 1e-6)
+    assert np.allclose(x, x_opt, atol=1e-6)
+
+@pytest.mark.parametrize("A_op", [A, spla.aslinearoperator(A)])
+def test_cg_quad(A_op):
+    solver = solvers.fo.ConjugateGradientQuad(A_op, b)
+    x = solver.solve(np.zeros(n), 100, 1e-8)
+    assert np.allclose(x, x_opt)
+
+def test_exact_line_search_sparse():
+    solver = solvers.fo.GradientDescent(f, grad, ss.ExactLineSearch4Quad(A, b))
+    x = solver.solve(np.zeros(n), 200, 1e-8)
+    assert np.allclose(x, x_opt)
+
+@pytest.mark.parametrize("H", [1. / A.diagonal(), spla.aslinearoperator(sp.diags(1. / A.diagonal()))])
+def test_lbfgs_operator_initial_approximation(H):
+    solver = solvers.fo.LBFGS(f, grad, H=H)
+    x = solver.solve(np.zeros(n), 100, 1e-6)
+    assert np.allclose(x, x_opt)
+    default = solvers.fo.LBFGS(f, grad)
+    default.solve(np.zeros(n), 100, 1e-6)
+    # Inverse of the hessian diagonal is kept as the initial approximation and saves iterations
+    assert len(solver.get_convergence()) < len(default.get_convergence())
+
+def test_lbfgs_compact_rejects_diagonal():
+    solver = solvers.fo.LBFGS(f, grad, H=1. / A.diagonal(), compact=True)
+    with pytest.raises(NotImplementedError):
+        solver.solve(np.zeros(n), 10, 1e-8)
+
+def test_bfgs_sparse_initial_approximation():
+    m = 10
+    A_small = sp.diags(np.arange(1., m + 1))
+    solver = solvers.fo.BFGS(lambda x: 0.5 * x.dot(A_small.dot(x)) - x.sum(),
+                             lambda x: A_small.dot(x) - 1., H=sp.identity(m))
+    x = solver.solve(np.zeros(m), 50, 1e-8)
+    assert np.allclose(x, 1. / np.arange(1., m + 1))
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+import scipy.special as spspec
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy import finite_sum
+from liboptpy.benchmarks import logistic_regression
+
+m, n, lam = 500, 10, 1e-2
+p_ref = logistic_regression(m, n, lam)
+rng = np.random.RandomState(0)
+X = rng.randn(m, n)
+y = np.sign(X.dot(rng.randn(n)) + 0.5 * rng.randn(m))
+problem = finite_sum.logistic_regression(X, y, lam, chunk_size=128)
+# Same objective without the structure of linear model, SAGA keeps the full table of gradients
+general = finite_sum.FiniteSum(problem.f_batch, problem.grad_batch, m, chunk_size=128,
+                               grad_samples=lambda x, idx: (-y[idx] * spspec.expit(-y[idx] * X[idx].dot(x)))[:, None]
+                               * X[idx] + lam * x)
+x0 = np.zeros(n)
+L = np.max(np.sum(X**2, axis=1)) / 4 + lam
+
+def newton_solution():
+    x = np.zeros(n)
+    for _ in range(30):
+        s = spspec.expit(y * X.dot(x))
+        x = x - np.linalg.solve((X.T * (s * (1 - s))).dot(X) / m + lam * np.eye(n), problem.grad(x))
+    return x
+
+x_opt = newton_solution()
+
+def test_finite_sum_oracles():
+    assert np.isclose(problem.f(x_opt), p_ref.f(x_opt))
+    assert np.allclose(problem.grad(x_opt), p_ref.grad(x_opt))
+    assert np.allclose(general.grad(x_opt), p_ref.grad(x_opt))
+    idx = np.array([3, 7, 11])
+    assert np.allclose(general.grad_samples(x_opt, idx).mean(axis=0), problem.grad_batch(x_opt, idx))
+    c, g = problem.full_coef(x_opt)
+    assert c.shape == (m,) and np.allclose(g, problem.grad(x_opt))
+
+@pytest.mark.parametrize("method", ["SVRG", "SAGA"])
+@pytest.mark.parametrize("p", [problem, general], ids=["linear", "general"])
+def test_variance_reduction(method, p):
+    solver = getattr(solvers.fo, method)(p, ss.ConstantStepSize(1 / (3 * L)), seed=0)
+    x = solver.solve(x0, 50 * m, 1e-6)
+    assert np.linalg.norm(problem.grad(x)) < 1e-6
+    assert solver.get_num_epochs() < 50
+    # Convergence is checked in the beginning of epoch
+    assert (len(solver.convergence) - 1) % m == 0
+
+def test_linear_model_saves_gradients():
+    passes = []
+    for p in [problem, general]:
+        solver = solvers.fo.SVRG(p, ss.ConstantStepSize(1 / (3 * L)), seed=0)
+        solver.solve(x0, 5 * m, 0)
+        passes.append(p.get_num_passes())
+    assert passes[0] < passes[1]
+    solver = solvers.fo.SAGA(problem, ss.ConstantStepSize(1 / (3 * L)), table_dtype=np.float32, seed=0)
+    solver.solve(x0, m, 0)
+    assert solver._table.shape == (m,) and solver._table.dtype == np.float32
+
+@pytest.mark.parametrize("name", ["SGD", "MomentumSGD", "Adam"])
+def test_sgd(name):
+    if name == "SGD":
+        solver = solvers.fo.SGD(problem, ss.InvSqrootIterStepSize(), batch_size=10, seed=0)
+    else:
+        solver = getattr(solvers.fo, name)(problem, ss.ConstantStepSize(1e-2), batch_size=10, seed=0)
+    x = solver.solve(x0, 2000, 0, disp=False)
+    assert problem.f(x) - problem.f(x_opt) < 1e-2 * (problem.f(x0) - problem.f(x_opt))
+
+@pytest.mark.parametrize("sampling", ["shuffle", "shuffle_once", "cyclic"])
+def test_sampling_without_replacement(sampling):
+    seen = []
+    p = finite_sum.FiniteSum(problem.f_batch, lambda x, idx: seen.append(np.copy(idx)) or problem.grad_batch(x, idx), m)
+    solvers.fo.SGD(p, ss.ConstantStepSize(0.), batch_size=64, sampling=sampling, epoch_check=None,
+                   seed=0).solve(x0, 2 * 8)
+    epochs = [np.concatenate(seen[:8]), np.concatenate(seen[8:])]
+    for idx in epochs:
+        assert np.array_equal(np.sort(idx), np.arange(m))
+    assert np.array_equal(epochs[0], epochs[1]) == (sampling != "shuffle")
+    assert np.array_equal(epochs[0], np.arange(m)) == (sampling == "cyclic")
+
+def test_epoch_check_by_step():
+    solver = solvers.fo.SAGA(problem, ss.ConstantStepSize(1 / (3 * L)), batch_size=50, sampling="uniform",
+                             epoch_check="step", seed=0)
+    x = solver.solve(x0, 1000 * m, 1e-8)
+    assert np.linalg.norm(x - x_opt) < 1e-6
+    with pytest.raises(ValueError):
+        solvers.fo.SGD(problem, ss.ConstantStepSize(1.), sampling="random")
+
+def test_resume():
+    make = lambda: solvers.fo.SAGA(problem, ss.ConstantStepSize(1 / (3 * L)), batch_size=7, seed=1)
+    x_straight = make().solve(x0, 300, 0)
+    first = make()
+    first.solve(x0, 120, 0)
+    x_resumed = make().resume(first.get_state(), 300, 0)
+    assert np.allclose(x_resumed, x_straight, rtol=1e-12, atol=1e-14)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+import liboptpy.unconstr_solvers as solvers
+import liboptpy.step_size as ss
+from liboptpy import history, subproblems, profiling
+from liboptpy.benchmarks import rosenbrock
+
+rng = np.random.RandomState(0)
+n = 20
+U, _ = np.linalg.qr(rng.randn(n, n))
+B_pd = U.dot(np.diag(np.logspace(0, 2, n))).dot(U.T)
+B_indef = U.dot(np.diag(np.linspace(-1, 10, n))).dot(U.T)
+g = rng.randn(n)
+
+@pytest.mark.parametrize("B", [B_pd, B_indef])
+def test_steihaug_cg(B):
+    p, Bp, num_hessvec = subproblems.steihaug_cg(g, B.dot, 1e-1)
+    assert np.isclose(np.linalg.norm(p), 1e-1)
+    assert np.allclose(Bp, B.dot(p))
+    assert g.dot(p) + 0.5 * p.dot(Bp) < 0
+    assert num_hessvec <= n
+
+def test_steihaug_cg_interior():
+    p, Bp, _ = subproblems.steihaug_cg(g, B_pd.dot, 1e3, tol=1e-12, max_iter=10 * n)
+    assert np.allclose(p, -np.linalg.solve(B_pd, g))
+    assert np.allclose(Bp, B_pd.dot(p))
+    # Indefinite model is unbounded, so the step goes to the boundary of any region
+    p, _, _ = subproblems.steihaug_cg(g, B_indef.dot, 1e3, tol=1e-12)
+    assert np.isclose(np.linalg.norm(p), 1e3)
+
+def test_dogleg():
+    p_newton = -np.linalg.solve(B_pd, g)
+    p, Bp = subproblems.dogleg(g, B_pd, 2 * np.linalg.norm(p_newton))
+    assert np.allclose(p, p_newton) and np.allclose(Bp, -g)
+    p, Bp = subproblems.dogleg(g, B_pd, 1e-4)
+    assert np.allclose(p, -1e-4 * g / np.linalg.norm(g))
+    radius = 0.5 * np.linalg.norm(p_newton)
+    p, Bp = subproblems.dogleg(g, B_pd, radius)
+    assert np.isclose(np.linalg.norm(p), radius)
+    assert np.allclose(Bp, B_pd.dot(p))
+    with pytest.raises(np.linalg.LinAlgError):
+        subproblems.dogleg(g, B_indef, 1.)
+
+# Double well in every coordinate: the hessian is negative definite in the initial point,
+# so Newton direction is the ascent direction
+f_well = lambda x: np.sum(0.25 * x**4 - 0.5 * x**2) + 0.1 * np.sum(x[1:] * x[:-1])
+grad_well = lambda x: x**3 - x + 0.1 * (np.concatenate([x[1:], [0]]) + np.concatenate([[0], x[:-1]]))
+hess_well = lambda x: np.diag(3 * x**2 - 1) + 0.1 * (np.eye(n, k=1) + np.eye(n, k=-1))
+x0_well = 0.1 * np.ones(n)
+
+def trust_region_solvers(f, grad, hess):
+    return {"NewtonCG": solvers.so.TrustRegionNewtonCG(f, grad, hess),
+            "Dogleg": solvers.so.TrustRegionDogleg(f, grad, hess),
+            "SR1": solvers.fo.TrustRegionQuasiNewton(f, grad),
+            "SR1-dogleg": solvers.fo.TrustRegionQuasiNewton(f, grad, subproblem="dogleg"),
+            "BFGS-dogleg": solvers.fo.TrustRegionQuasiNewton(f, grad, update="BFGS", subproblem="dogleg")}
+
+def test_indefinite_hessian():
+    with pytest.raises(ValueError):
+        solvers.so.NewtonMethod(f_well, grad_well, hess_well, ss.Backtracking("Armijo", rho=0.5, beta=0.1,
+                                                                              init_alpha=1.)).solve(x0_well, 100)
+    for name, solver in trust_region_solvers(f_well, grad_well, hess_well).items():
+        x = solver.solve(x0_well, 500, 1e-8)
+        assert np.linalg.norm(grad_well(x)) < 1e-8, name
+        assert np.all(np.linalg.eigvalsh(hess_well(x)) > 0), name
+        assert f_well(x) < f_well(x0_well)
+
+def test_rosenbrock():
+    p = rosenbrock(10)
+    line_search = solvers.so.InexactNewtonMethod(p.f, p.grad, p.hess,
+                                                 ss.Backtracking("Armijo", rho=0.5, beta=0.1, init_alpha=1.))
+    line_search.solve(p.x0, 1000, 1e-6)
+    for name, solver in trust_region_solvers(p.f, p.grad, p.hess).items():
+        x = solver.solve(p.x0, 1000, 1e-6)
+        assert np.linalg.norm(p.grad(x)) < 1e-6, name
+    solver = solvers.so.TrustRegionNewtonCG(p.f, p.grad, p.hess)
+    solver.solve(p.x0, 1000, 1e-6)
+    assert solver.get_oracle().get_stats()["f_evals"] < line_search.get_oracle().get_stats()["f_evals"]
+    assert solver.get_num_hessvec() < line_search.get_num_hessvec()
+
+def test_rejected_steps_reuse_model():
+    hess_calls = []
+    p = rosenbrock(10)
+    def hess(x):
+        hess_calls.append(x)
+        return p.hess(x)
+    solver = solvers.so.TrustRegionDogleg(p.f, p.grad, hess, init_radius=10.)
+    solver.solve(p.x0, 1000, 1e-6)
+    assert solver.get_num_rejected() > 0
+    assert len(hess_calls) == solver.get_num_hess() == len(solver.convergence) - solver.get_num_rejected()
+    # Function is evaluated once per trial step
+    assert solver.get_oracle().get_stats()["f_evals"] == len(solver.convergence)
+
+def test_scalar_trace():
+    trace = history.ScalarTrace()
+    solver = solvers.fo.TrustRegionQuasiNewton(f_well, grad_well, history=trace)
+    solver.solve(x0_well, 500, 1e-8)
+    res = solver.convergence
+    assert np.all(np.diff(res["f"]) <= 0)
+    assert set(np.unique(res["alpha"])) <= {0., 1.}
+
+def test_callbacks_and_unsupported_arguments():
+    recorder = profiling.Recorder()
+    solver = solvers.so.TrustRegionNewtonCG(f_well, grad_well, hess_well, callbacks=recorder)
+    solver.solve(x0_well, 500, 1e-8)
+    events = recorder.get()
+    assert len(events["alpha"]) == len(solver.convergence) - 1
+    assert np.sum(events["alpha"] == 0) == solver.get_num_rejected()
+    assert np.all(np.diff(events["f"]) <= 0)
+    for kwargs in [{"dtype": np.float32}, {"checkpoint": "state.npz"}, {"jit": True}]:
+        with pytest.raises(TypeError):
+            solvers.fo.TrustRegionQuasiNewton(f_well, grad_well, **kwargs)